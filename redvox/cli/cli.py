@@ -364,10 +364,10 @@ def gallery_args(args) -> None:
 
 
 def sort_unstructured(
-    input_dir: str, out_dir: Optional[str] = None, copy: bool = True
+    input_dir: str, out_dir: Optional[str] = None, copy: bool = True, containers: bool = False
 ) -> bool:
     out_dir = out_dir if out_dir is not None else "."
-    io.sort_unstructured_redvox_data(input_dir, out_dir, copy=copy)
+    io.sort_unstructured_redvox_data(input_dir, out_dir, copy=copy, containers=containers)
     return True
 
 
@@ -378,7 +378,9 @@ def sort_unstructured_args(args) -> None:
     if not check_out_dir(args.out_dir):
         determine_exit(False)
 
-    determine_exit(sort_unstructured(args.input_dir, args.out_dir, not args.mv))
+    determine_exit(
+        sort_unstructured(args.input_dir, args.out_dir, not args.mv, args.containers)
+    )
 
 
 def main():
@@ -528,6 +530,12 @@ def main():
         help="When set, file contents will be moved to the structured layout rather than copied.",
         action="store_true",
     )
+    sort_unstructured_parser.add_argument(
+        "--containers",
+        help="When set, the packets of each station are packed into one container file per hour (API 1000) or day "
+        "(API 900) rather than being stored as individual files.",
+        action="store_true",
+    )
     sort_unstructured_parser.set_defaults(func=sort_unstructured_args)
 
     # print rdvxz
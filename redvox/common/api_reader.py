@@ -2,21 +2,50 @@
 Read Redvox data from a single directory
 Data files can be either API 900 or API 1000 data formats
 """
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from datetime import timedelta
+from functools import partial
 import multiprocessing
 import multiprocessing.pool
 
+import lz4.frame
+
 import redvox.api1000.proto.redvox_api_m_pb2 as api_m
+from redvox.api900.wrapped_redvox_packet import WrappedRedvoxPacket
 from redvox.common import offset_model
 from redvox.common import api_conversions as ac
 from redvox.common import io
 from redvox.common import file_statistics as fs
-from redvox.common.parallel_utils import maybe_parallel_map
+from redvox.common import sensor_reader_utils as sdru
+from redvox.common.parallel_utils import maybe_parallel_map, prefetch_map
 from redvox.common.station import Station
+from redvox.common.sensor_data import DtypePolicy, SensorType, SpillPolicy
 from redvox.common.errors import RedVoxExceptions
 
 
+# default maximum number of packets an ApiReader keeps between computing station stats and building stations
+DEFAULT_PACKET_CACHE_SIZE: int = 1024
+# default number of packets read ahead while reading the files of an index
+DEFAULT_READ_PREFETCH: int = 4
+
+
+def _extract_stats_and_packet(entry: io.IndexEntry) -> Tuple[fs.StationStat, bytes]:
+    """
+    reads a file once for both its station stats and the packet its station is built from.  API 1000 stats are
+    extracted without decoding the sensor data, which is decoded once when the station is built
+
+    :param entry: entry of the file to read
+    :return: the station stats of the file and its serialized (decompressed) packet, converted from API 900 if
+                necessary
+    """
+    if entry.api_version == io.ApiVersion.API_900:
+        packet_900 = entry.read_raw()
+        return (fs.StationStat.from_api_900(WrappedRedvoxPacket(packet_900)),
+                ac.convert_api_900_to_1000_raw(packet_900).SerializeToString())
+    serialized: bytes = lz4.frame.decompress(entry.read_compressed())
+    return fs.StationStat.from_api_1000_serialized(serialized), serialized
+
+
 class ApiReader:
     """
     Reads data from api 900 or api 1000 format, converting all data read into RedvoxPacketM for
@@ -29,6 +58,13 @@ class ApiReader:
                         respective api formats.  If False, base_dir only has the data files.  Default False.
         files_index: io.Index of the files that match the filter that are in base_dir
         index_summary: io.IndexSummary of the filtered data
+        use_index_cache: bool, if True, use the persistent index cache of the data directories.  Default False.
+        packet_cache_size: int, the maximum number of packets read while checking station stats that are kept to
+                            build the stations without reading the files again.  Default DEFAULT_PACKET_CACHE_SIZE
+        dtype_policy: DtypePolicy, the types used to store the sensor data of the stations.  Default float64 for all
+                        sensors
+        spill_policy: optional SpillPolicy, if set, the large columns of the stations' sensors are kept in
+                        memory-mapped files instead of in memory.  Default None
         debug: bool, if True, output additional information during function execution.  Default False.
     """
 
@@ -39,6 +75,10 @@ class ApiReader:
         read_filter: io.ReadFilter = None,
         debug: bool = False,
         pool: Optional[multiprocessing.pool.Pool] = None,
+        use_index_cache: bool = False,
+        packet_cache_size: int = DEFAULT_PACKET_CACHE_SIZE,
+        dtype_policy: Optional[DtypePolicy] = None,
+        spill_policy: Optional[SpillPolicy] = None,
     ):
         """
         Initialize the ApiReader object
@@ -48,11 +88,17 @@ class ApiReader:
                                 api formats.  If False, base_dir only has the data files.  Default False.
         :param read_filter: ReadFilter for the data files, if None, get everything.  Default None
         :param debug: if True, output additional statements during function execution.  Default False.
+        :param pool: optional multiprocessing pool.  If None, the SDK's shared pool is used when work is run in
+                        parallel.  Default None
+        :param use_index_cache: if True, load and update the persistent index cache of the data directories instead
+                                of rescanning them.  Default False.
+        :param packet_cache_size: the maximum number of decompressed packets to keep for building stations.  Values less
+                                    than 1 disable the cache, so each file is read again when its station is built
+                                    instead of being held in memory.  Default DEFAULT_PACKET_CACHE_SIZE
+        :param dtype_policy: optional types to store the sensor data of the stations as.  Default None (float64)
+        :param spill_policy: optional policy to keep the large columns of the stations' sensors in memory-mapped
+                                files with.  Default None (kept in memory)
         """
-        _pool: multiprocessing.pool.Pool = (
-            multiprocessing.Pool() if pool is None else pool
-        )
-
         if read_filter:
             self.filter = read_filter
             if self.filter.station_ids:
@@ -62,16 +108,19 @@ class ApiReader:
         self.base_dir = base_dir
         self.structured_dir = structured_dir
         self.debug = debug
+        self.use_index_cache = use_index_cache
+        self.packet_cache_size = packet_cache_size
+        self.dtype_policy = DtypePolicy() if dtype_policy is None else dtype_policy
+        self.spill_policy = spill_policy
+        # serialized packets read while computing station stats, by file path and container offset
+        self._packet_cache: Dict[Tuple[str, Optional[int]], bytes] = {}
         self.errors = RedVoxExceptions("APIReader")
-        self.files_index = self._get_all_files(_pool)
+        self.files_index = self._get_all_files(pool)
         self.index_summary = io.IndexSummary.from_index(self._flatten_files_index())
 
         if debug:
             self.errors.print()
 
-        if pool is None:
-            _pool.close()
-
     def _flatten_files_index(self):
         """
         :return: flattened version of files_index
@@ -89,20 +138,15 @@ class ApiReader:
 
         :return: index with all the files that match the filter
         """
-        _pool: multiprocessing.pool.Pool = (
-            multiprocessing.Pool() if pool is None else pool
-        )
         index: List[io.Index] = []
         # this guarantees that all ids we search for are valid
-        all_index = self._apply_filter(pool=_pool)
-        for station_id in all_index.summarize().station_ids():
-            id_index = all_index.get_index_for_station_id(station_id)
-            checked_index = self._check_station_stats(id_index, pool=_pool)
+        all_index = self._apply_filter(pool=pool)
+        groups = all_index.group_by_station_id()
+        # api 900 stations come before api 1000 stations, like the station ids of the index summary
+        for id_index in sorted(groups.values(), key=lambda g: g.entries[0].api_version != io.ApiVersion.API_900):
+            checked_index = self._check_station_stats(id_index, pool=pool)
             index.extend(checked_index)
 
-        if pool is None:
-            _pool.close()
-
         return index
 
     def _apply_filter(
@@ -116,17 +160,12 @@ class ApiReader:
         :param reader_filter: optional filter; if None, use the reader's filter, default None
         :return: index of the filtered files
         """
-        _pool: multiprocessing.pool.Pool = (
-            multiprocessing.Pool() if pool is None else pool
-        )
         if not reader_filter:
             reader_filter = self.filter
         if self.structured_dir:
-            index = io.index_structured(self.base_dir, reader_filter, pool=_pool)
+            index = io.index_structured(self.base_dir, reader_filter, pool=pool, use_cache=self.use_index_cache)
         else:
-            index = io.index_unstructured(self.base_dir, reader_filter, pool=_pool)
-        if pool is None:
-            _pool.close()
+            index = io.index_unstructured(self.base_dir, reader_filter, pool=pool, use_cache=self.use_index_cache)
         return index
 
     def _check_station_stats(
@@ -143,15 +182,11 @@ class ApiReader:
         :param station_index: index representing the requested information
         :return: List of Indexes that includes as much information as possible that fits the request
         """
-        _pool: multiprocessing.pool.Pool = multiprocessing.Pool() if pool is None else pool
         # if we found nothing, return the index
         if len(station_index.entries) < 1:
             return [station_index]
 
-        stats = fs.extract_stats(station_index, pool=_pool)
-        # Close pool if created here
-        if pool is None:
-            _pool.close()
+        stats = self._extract_stats(station_index, pool=pool)
 
         timing_offsets: Optional[offset_model.TimingOffsets] = offset_model.compute_offsets(stats)
 
@@ -179,7 +214,7 @@ class ApiReader:
                                            .with_end_dt_buf(diff_e))
             if len(new_index.entries) > 0:
                 station_index.append(new_index.entries)
-                stats.extend(fs.extract_stats(new_index))
+                stats.extend(self._extract_stats(new_index, pool=pool))
         if self.filter.end_dt and timing_offsets.adjusted_end < self.filter.end_dt:
             insufficient_str += f" {self.filter.end_dt} (end)"
             # diff_e = self.filter.end_dt_buf + 1.5 * (self.filter.end_dt - timing_offsets.adjusted_end)
@@ -195,7 +230,7 @@ class ApiReader:
                                            .with_end_dt_buf(diff_e))
             if len(new_index.entries) > 0:
                 station_index.append(new_index.entries)
-                stats.extend(fs.extract_stats(new_index))
+                stats.extend(self._extract_stats(new_index, pool=pool))
         if len(insufficient_str) > 0:
             self.errors.append(f"Data for {station_index.summarize().station_ids()} exists, "
                                f"but not at:{insufficient_str}")
@@ -213,11 +248,86 @@ class ApiReader:
 
         return list(results.values())
 
+    def __getstate__(self):
+        # cached packets are passed to the processes that build the stations along with their index
+        state = self.__dict__.copy()
+        state["_packet_cache"] = {}
+        return state
+
+    def _extract_stats(
+            self,
+            index: io.Index,
+            pool: Optional[multiprocessing.pool.Pool] = None,
+    ) -> List[fs.StationStat]:
+        """
+        extract the station stats of the files in the index.  If the packet cache has room for all the files, the
+        decompressed packets are kept so the stations can be built without reading and decompressing the files
+        again.
+
+        :param index: index of the files to extract stats from
+        :param pool: optional multiprocessing pool
+        :return: list of StationStat, one for each file in the index
+        """
+        if len(self._packet_cache) + len(index.entries) > self.packet_cache_size:
+            return fs.extract_stats(index, pool=pool)
+        stats: List[fs.StationStat] = []
+        for entry, (stat, packet) in zip(index.entries,
+                                         maybe_parallel_map(pool, _extract_stats_and_packet, iter(index.entries),
+                                                            lambda: len(index.entries) > 1, chunk_size=8)):
+            stats.append(stat)
+            self._packet_cache[(entry.full_path, entry.container_offset)] = packet
+        return stats
+
+    def _take_cached_packets(self, findex: io.Index) -> Dict[Tuple[str, Optional[int]], bytes]:
+        """
+        :param findex: index of the files to take the cached packets of
+        :return: the cached packets of the files in the index, which are removed from the cache
+        """
+        keys = [(entry.full_path, entry.container_offset) for entry in findex.entries]
+        return {key: self._packet_cache.pop(key) for key in keys if key in self._packet_cache}
+
+    def _read_files_in_index(
+            self, indexf: io.Index, skip_sensors: Optional[Set[str]] = None,
+            cached_packets: Optional[Dict[Tuple[str, Optional[int]], bytes]] = None
+    ) -> List[api_m.RedvoxPacketM]:
+        """
+        read all the files in the index, using the packets read while checking station stats instead of reading
+        their files again
+
+        :param indexf: index of the files to read
+        :param skip_sensors: optional names of the fields of RedvoxPacketM.Sensors to not decode.  Default None
+        :param cached_packets: optional serialized packets of the files, as returned by _take_cached_packets.  If
+                                None, the packets are taken from the cache.  Default None
+        :return: list of RedvoxPacketM, converted from API 900 if necessary
+        """
+        if cached_packets is None:
+            cached_packets = self._take_cached_packets(indexf)
+        if len(cached_packets) < 1:
+            return self.read_files_in_index(indexf, skip_sensors=skip_sensors)
+
+        result: List[api_m.RedvoxPacketM] = []
+        for api_version in [io.ApiVersion.API_900, io.ApiVersion.API_1000]:
+            for entry in indexf.filter(io.ReadFilter.empty().with_api_versions({api_version})).entries:
+                serialized: Optional[bytes] = cached_packets.get((entry.full_path, entry.container_offset))
+                if serialized is not None:
+                    packet: api_m.RedvoxPacketM = io.deserialize_api_1000(serialized, skip_sensors)
+                else:
+                    packet = entry.read_raw(skip_sensors=skip_sensors)
+                    if api_version == io.ApiVersion.API_900:
+                        packet = ac.convert_api_900_to_1000_raw(packet)
+                result.append(packet)
+        return result
+
     @staticmethod
-    def read_files_in_index(indexf: io.Index) -> List[api_m.RedvoxPacketM]:
+    def read_files_in_index(indexf: io.Index, prefetch: int = DEFAULT_READ_PREFETCH,
+                            skip_sensors: Optional[Set[str]] = None) -> List[api_m.RedvoxPacketM]:
         """
         read all the files in the index
 
+        :param indexf: index of the files to read
+        :param prefetch: number of files to read ahead in a thread pool while decoding.  Default DEFAULT_READ_PREFETCH
+        :param skip_sensors: optional names of the fields of RedvoxPacketM.Sensors to not decode from API 1000 files.
+                                Default None
         :return: list of RedvoxPacketM, converted from API 900 if necessary
         """
         result: List[api_m.RedvoxPacketM] = []
@@ -226,7 +336,7 @@ class ApiReader:
         # and convert to API 1000
         # noinspection PyTypeChecker
         for packet_900 in indexf.stream_raw(
-                io.ReadFilter.empty().with_api_versions({io.ApiVersion.API_900})
+                io.ReadFilter.empty().with_api_versions({io.ApiVersion.API_900}), prefetch
         ):
             # noinspection Mypy
             result.append(
@@ -236,7 +346,7 @@ class ApiReader:
         # Grab the API 1000 packets
         # noinspection PyTypeChecker
         for packet in indexf.stream_raw(
-                io.ReadFilter.empty().with_api_versions({io.ApiVersion.API_1000})
+                io.ReadFilter.empty().with_api_versions({io.ApiVersion.API_1000}), prefetch, skip_sensors=skip_sensors
         ):
             # noinspection Mypy
             result.append(packet)
@@ -244,9 +354,11 @@ class ApiReader:
         return result
 
     # noinspection PyTypeChecker
-    def read_files_by_id(self, station_id: str) -> Optional[List[api_m.RedvoxPacketM]]:
+    def read_files_by_id(self, station_id: str,
+                         prefetch: int = DEFAULT_READ_PREFETCH) -> Optional[List[api_m.RedvoxPacketM]]:
         """
         :param station_id: the id to filter on
+        :param prefetch: number of files to read ahead in a thread pool while decoding.  Default DEFAULT_READ_PREFETCH
         :return: the list of packets with the requested id, or None if the id can't be found
         """
 
@@ -257,7 +369,8 @@ class ApiReader:
         for packet_900 in self._flatten_files_index().stream_raw(
             io.ReadFilter.empty()
             .with_api_versions({io.ApiVersion.API_900})
-            .with_station_ids({station_id})
+            .with_station_ids({station_id}),
+            prefetch
         ):
             # noinspection Mypy
             result.append(ac.convert_api_900_to_1000_raw(packet_900))
@@ -266,7 +379,8 @@ class ApiReader:
         for packet in self._flatten_files_index().stream_raw(
             io.ReadFilter.empty()
             .with_api_versions({io.ApiVersion.API_1000})
-            .with_station_ids({station_id})
+            .with_station_ids({station_id}),
+            prefetch
         ):
             # noinspection Mypy
             result.append(packet)
@@ -276,25 +390,66 @@ class ApiReader:
 
         return result
 
-    def _stations_by_index(self, findex: io.Index) -> Station:
+    def _stations_by_index(self, findex: Tuple[io.Index, Dict[Tuple[str, Optional[int]], bytes]],
+                           sensor_types: Optional[Iterable[SensorType]] = None,
+                           lazy: bool = False) -> Station:
         """
-        :param findex: index with files to build a station with
+        :param findex: index with files to build a station with and the cached packets of those files
+        :param sensor_types: optional types of the sensors to load besides audio, default None (all)
+        :param lazy: if True, the sensors other than audio are built when they are first accessed, default False
         :return: Station built from files in findex
         """
-        return Station(self.read_files_in_index(findex))
+        return Station(self._read_files_in_index(findex[0], sdru.skipped_sensor_fields(sensor_types), findex[1]),
+                       dtype_policy=self.dtype_policy, sensor_types=sensor_types, lazy=lazy,
+                       spill_policy=self.spill_policy)
 
-    def get_stations(self, pool: Optional[multiprocessing.pool.Pool] = None) -> List[Station]:
+    def get_stations(self, pool: Optional[multiprocessing.pool.Pool] = None,
+                     sensor_types: Optional[Iterable[SensorType]] = None,
+                     lazy: bool = False) -> List[Station]:
         """
         :param pool: optional multiprocessing pool
+        :param sensor_types: optional types of the sensors to load besides audio.  The other sensors are not decoded
+                                from the files.  Default None (all sensors)
+        :param lazy: if True, the stations keep their packets and build the sensors other than audio when they are
+                        first accessed.  Default False
         :return: List of all stations in the ApiReader
         """
+        if sensor_types is not None:
+            sensor_types = set(sensor_types)
+        # cached packets are only used once
         return list(maybe_parallel_map(pool,
-                                       self._stations_by_index,
-                                       self.files_index,
+                                       partial(self._stations_by_index, sensor_types=sensor_types, lazy=lazy),
+                                       iter([(findex, self._take_cached_packets(findex))
+                                             for findex in self.files_index]),
                                        chunk_size=1
                                        )
                     )
 
+    def iter_stations(self, pool: Optional[multiprocessing.pool.Pool] = None,
+                      prefetch: int = 0,
+                      sensor_types: Optional[Iterable[SensorType]] = None,
+                      lazy: bool = False) -> Iterator[Station]:
+        """
+        Builds the stations of the ApiReader one at a time, in the same order as get_stations.  Unlike get_stations,
+        only the station being consumed and up to prefetch stations built ahead of it are held in memory.
+
+        :param pool: optional thread or process pool to build stations ahead with
+        :param prefetch: number of stations to build ahead of the consumer.  0 builds each station when it is
+                            requested.  Default 0
+        :param sensor_types: optional types of the sensors to load besides audio.  The other sensors are not decoded
+                                from the files.  Default None (all sensors)
+        :param lazy: if True, the stations keep their packets and build the sensors other than audio when they are
+                        first accessed.  Default False
+        :return: iterator over the stations in the ApiReader
+        """
+        if sensor_types is not None:
+            sensor_types = set(sensor_types)
+        # cached packets are only used once, and are taken from the cache as their stations are built
+        for station in prefetch_map(partial(self._stations_by_index, sensor_types=sensor_types, lazy=lazy),
+                                    ((findex, self._take_cached_packets(findex)) for findex in self.files_index),
+                                    prefetch, pool):
+            yield station
+
     def get_station_by_id(self, get_id: str) -> Optional[List[Station]]:
         """
         :param get_id: the id to filter on
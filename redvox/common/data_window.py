@@ -3,7 +3,7 @@ This module creates specific time-bounded segments of data for users
 combines the base data files into a single composite object based on the user parameters
 """
 from pathlib import Path
-from typing import Optional, Set, List, Dict, Iterable
+from typing import Callable, Optional, Set, List, Dict, Iterable
 from datetime import timedelta
 
 import multiprocessing
@@ -16,10 +16,11 @@ from redvox.common import date_time_utils as dtu
 from redvox.common import io
 from redvox.common.parallel_utils import maybe_parallel_map
 from redvox.common.station import Station
-from redvox.common.sensor_data import SensorType, SensorData
+from redvox.common.sensor_data import SensorType, SensorData, DtypePolicy, SpillPolicy
 from redvox.common.api_reader import ApiReader
 from redvox.common.data_window_configuration import DataWindowConfig
 from redvox.common import gap_and_pad_utils as gpu
+from redvox.common import timesync as ts
 from redvox.common.errors import RedVoxExceptions
 
 DEFAULT_START_BUFFER_TD: timedelta = timedelta(minutes=2.0)  # default padding to start time of data
@@ -57,8 +58,21 @@ class DataWindow:
         copy_edge_points: enumeration of DataPointCreationMode.  Determines how new points are created.
                             Valid values are NAN, COPY, and INTERPOLATE.  Default COPY
         debug: bool, if True, outputs additional information during initialization. Default False
+        station_output_dir: optional string, if set, each station is serialized into this directory as soon as it is
+                            processed instead of being kept in stations.  Default None
+        max_loaded_stations: int, the maximum number of stations held in memory at once when stations are streamed
+                                to station_output_dir or a station callback.  Default 1
+        dtype_policy: DtypePolicy, the types used to store the sensor data of the stations.  Default float64 for all
+                        sensors
+        sensor_types: optional set of SensorType, the sensors to load besides audio, which is always loaded.
+                        If None, all sensors are loaded.  Default None
+        spill_policy: optional SpillPolicy, if set, the large columns of the sensors, usually audio and its
+                        timestamps, are kept in memory-mapped files in a scratch directory instead of in memory.
+                        Default None
         errors: DataWindowExceptions, class containing a list of all errors encountered by the data window.
-        stations: list of Stations, the results of reading the data from input_directory
+        stations: list of Stations, the results of reading the data from input_directory.  Empty when the stations
+                    are streamed to station_output_dir or a station callback
+        station_paths: list of Paths, the files the stations were written to if station_output_dir is set
         sdk_version: str, the version of the Redvox SDK used to create the data window
     """
     def __init__(
@@ -77,6 +91,12 @@ class DataWindow:
             copy_edge_points: gpu.DataPointCreationMode = gpu.DataPointCreationMode.COPY,
             debug: bool = False,
             use_model_correction: bool = True,
+            station_callback: Optional[Callable[[Station], None]] = None,
+            station_output_dir: Optional[str] = None,
+            max_loaded_stations: int = 1,
+            dtype_policy: Optional[DtypePolicy] = None,
+            sensor_types: Optional[Iterable[SensorType]] = None,
+            spill_policy: Optional[SpillPolicy] = None,
     ):
         """
         Initialize the DataWindow
@@ -105,6 +125,20 @@ class DataWindow:
         :param use_model_correction: if True, use the offset model's correction functions, otherwise use the best
                                         offset.  Default True
         :param debug: if True, outputs additional information during initialization. Default False
+        :param station_callback: optional function called with each station once it has been corrected and windowed.
+                                    When set, stations are streamed: they are not kept in the data window, and the
+                                    next station is only loaded once the callback returns.  Default None
+        :param station_output_dir: optional directory to serialize each station into once it has been corrected and
+                                    windowed.  When set, stations are streamed like with station_callback.
+                                    Default None
+        :param max_loaded_stations: the maximum number of stations held in memory at once when streaming stations.
+                                    Values less than 1 are converted to 1.  Default 1
+        :param dtype_policy: optional types to store the sensor data of the stations as, for example
+                                DtypePolicy.reduced().  Default None (float64)
+        :param sensor_types: optional types of the sensors to load besides audio.  Other sensors are not decoded from
+                                the files.  Default None (all sensors)
+        :param spill_policy: optional policy to keep the large columns of the sensors in memory-mapped files with,
+                                for windows that do not fit in memory.  Default None (kept in memory)
         """
         self.errors = RedVoxExceptions("DataWindow")
         self.input_directory: str = input_dir
@@ -127,10 +161,18 @@ class DataWindow:
         self.use_model_correction = use_model_correction
         self.sdk_version: str = redvox.VERSION
         self.debug: bool = debug
+        self.station_output_dir: Optional[str] = station_output_dir
+        self.max_loaded_stations: int = max(max_loaded_stations, 1)
+        self.dtype_policy: DtypePolicy = DtypePolicy() if dtype_policy is None else dtype_policy
+        self.sensor_types: Optional[Set[SensorType]] = None if sensor_types is None else set(sensor_types)
+        self.spill_policy: Optional[SpillPolicy] = spill_policy
         self.stations: List[Station] = []
+        self.station_paths: List[Path] = []
         if start_datetime and end_datetime and (end_datetime <= start_datetime):
             self.errors.append("DataWindow will not work when end datetime is before or equal to start datetime.\n"
                                f"Your times: {end_datetime} <= {start_datetime}")
+        elif station_callback is not None or station_output_dir is not None:
+            self.stream_data_window(station_callback)
         else:
             self.create_data_window()
         if debug:
@@ -203,6 +245,10 @@ class DataWindow:
             gpu.DataPointCreationMode[config.edge_points_mode],
             config.debug,
             config.use_model_correction,
+            dtype_policy=DtypePolicy(config.sensor_dtypes or {}, config.audio_dtype, config.audio_scale),
+            sensor_types=None if config.sensor_types is None else [SensorType[s.upper()] for s in config.sensor_types],
+            spill_policy=None if config.scratch_directory is None
+            else SpillPolicy(config.scratch_directory, config.spill_threshold_bytes),
         )
 
     @staticmethod
@@ -348,16 +394,13 @@ class DataWindow:
         self.errors.extend_error(station.errors)
         # set the window start and end if they were specified, otherwise use the bounds of the data
         self.create_window_in_sensors(station, self.start_datetime, self.end_datetime)
+        self.stations.append(station)
 
-    def create_data_window(self, pool: Optional[multiprocessing.pool.Pool] = None):
+    def _read_filter(self) -> io.ReadFilter:
         """
-        updates the data window to contain only the data within the window parameters
-        stations without audio or any data outside the window are removed
+        sets the extensions and api versions of the data window to the defaults if they are not set
+        :return: the filter for the files of the data window
         """
-        # Let's create and manage a single pool of workers that we can utilize throughout
-        # the instantiation of the data window.
-        _pool: multiprocessing.pool.Pool = multiprocessing.Pool() if pool is None else pool
-
         r_f = io.ReadFilter()
         if self.start_datetime:
             r_f.with_start_dt(self.start_datetime)
@@ -375,9 +418,18 @@ class DataWindow:
             self.api_versions = r_f.api_versions
         r_f.with_start_dt_buf(self.start_buffer_td)
         r_f.with_end_dt_buf(self.end_buffer_td)
+        return r_f
 
+    def create_data_window(self, pool: Optional[multiprocessing.pool.Pool] = None):
+        """
+        updates the data window to contain only the data within the window parameters
+        stations without audio or any data outside the window are removed
+        :param pool: optional pool to use throughout the instantiation of the data window.  If None, the SDK's
+                        shared pool is used when work is run in parallel.  Default None
+        """
         # get the data to convert into a window
-        a_r = ApiReader(self.input_directory, self.structured_layout, r_f, pool=_pool)
+        a_r = ApiReader(self.input_directory, self.structured_layout, self._read_filter(), pool=pool,
+                        dtype_policy=self.dtype_policy, spill_policy=self.spill_policy)
 
         self.errors.extend_error(a_r.errors)
 
@@ -385,12 +437,14 @@ class DataWindow:
             self.station_ids = a_r.index_summary.station_ids()
         # Parallel update
         # Apply timing correction in parallel by station
-        sts = a_r.get_stations()
+        sts = a_r.get_stations(sensor_types=self.sensor_types)
         if not self.use_model_correction:
             for tss in sts:
                 tss.use_model_correction = self.use_model_correction
         if self.apply_correction:
-            for st in maybe_parallel_map(_pool, Station.update_timestamps,
+            # fit the offset models of all stations in one batch
+            ts.fit_analysis_offset_models([st.timesync_analysis for st in sts], pool)
+            for st in maybe_parallel_map(pool, Station.update_timestamps,
                                          iter(sts), chunk_size=1):
                 self._add_sensor_to_window(st)
         else:
@@ -409,9 +463,56 @@ class DataWindow:
             self.end_datetime = dtu.datetime_from_epoch_microseconds_utc(
                 np.max([t.last_data_timestamp for t in self.stations]) + 1)
 
-        # If the pool was created by this function, then it needs to managed by this function.
-        if pool is None:
-            _pool.close()
+    def stream_data_window(self, station_callback: Optional[Callable[[Station], None]] = None,
+                           pool: Optional[multiprocessing.pool.Pool] = None):
+        """
+        like create_data_window, but loads, corrects and windows at most max_loaded_stations stations at a time.
+        each station is written to station_output_dir if it is set, then passed to station_callback if it is set,
+        before it is released.  the stations are not kept in the data window.
+        stations without audio or any data outside the window are skipped
+        :param station_callback: optional function to call with each processed station, default None
+        :param pool: optional pool used to load stations ahead, default None
+        """
+        # only the stations being processed are held in memory, so the packets are not cached between reading the
+        # station stats and building the stations
+        a_r = ApiReader(self.input_directory, self.structured_layout, self._read_filter(), pool=pool,
+                        packet_cache_size=0, dtype_policy=self.dtype_policy, spill_policy=self.spill_policy)
+
+        self.errors.extend_error(a_r.errors)
+
+        if not self.station_ids:
+            self.station_ids = a_r.index_summary.station_ids()
+        first_timestamp: Optional[float] = None
+        last_timestamp: Optional[float] = None
+        found_ids: List[str] = []
+        for station in a_r.iter_stations(pool, self.max_loaded_stations - 1, self.sensor_types):
+            if not station.has_audio_sensor():
+                self.station_ids = [s for s in self.station_ids if s != station.id]
+                continue
+            if not self.use_model_correction:
+                station.use_model_correction = self.use_model_correction
+            if self.apply_correction:
+                station.update_timestamps()
+            self.errors.extend_error(station.errors)
+            self.create_window_in_sensors(station, self.start_datetime, self.end_datetime)
+            found_ids.append(station.id)
+            first_timestamp = station.first_data_timestamp if first_timestamp is None \
+                else min(first_timestamp, station.first_data_timestamp)
+            last_timestamp = station.last_data_timestamp if last_timestamp is None \
+                else max(last_timestamp, station.last_data_timestamp)
+            if self.station_output_dir is not None:
+                self.station_paths.append(io.serialize_station(station, self.station_output_dir))
+            if station_callback is not None:
+                station_callback(station)
+
+        self._check_valid_ids(found_ids)
+
+        # update remaining data window values if they're still default
+        if not self.start_datetime and first_timestamp is not None:
+            self.start_datetime = dtu.datetime_from_epoch_microseconds_utc(first_timestamp)
+        # end_datetime is non-inclusive, so it must be greater than our latest timestamp
+        if not self.end_datetime and last_timestamp is not None:
+            self.end_datetime = dtu.datetime_from_epoch_microseconds_utc(last_timestamp + 1)
 
     def _check_for_audio(self):
         """
@@ -425,13 +526,16 @@ class DataWindow:
             self.stations = [s for s in self.stations if s.id not in remove]
             self.station_ids = [s for s in self.station_ids if s not in remove]
 
-    def _check_valid_ids(self):
+    def _check_valid_ids(self, found_ids: Optional[List[str]] = None):
         """
         if there are stations, searches the station_ids for any ids not in the data collected
         and creates an error message for each id requested but has no data
         if there are no stations, creates a single error message declaring no data found
+        :param found_ids: optional ids of the stations collected, default None (the ids of stations)
         """
-        if len(self.stations) < 1:
+        if found_ids is None:
+            found_ids = [i.id for i in self.stations]
+        if len(found_ids) < 1:
             if len(self.station_ids) > 1:
                 add_ids = f"for all stations {self.station_ids} "
             else:
@@ -440,7 +544,7 @@ class DataWindow:
                                f"\nPlease adjust parameters of DataWindow")
         elif len(self.station_ids) > 1:
             for ids in self.station_ids:
-                if ids not in [i.id for i in self.stations] and self.debug:
+                if ids not in found_ids and self.debug:
                     self.errors.append(
                         f"Requested {ids} but there is no data to read for that station"
                     )
@@ -476,7 +580,6 @@ class DataWindow:
         station.packet_metadata = [meta for meta in station.packet_metadata
                                    if meta.packet_start_mach_timestamp < station.last_data_timestamp and
                                    meta.packet_end_mach_timestamp >= station.first_data_timestamp]
-        self.stations.append(station)
 
     def process_sensor(self, sensor: SensorData, station_id: str, start_date_timestamp: float,
                        end_date_timestamp: float):
@@ -489,22 +592,30 @@ class DataWindow:
         """
         if sensor.num_samples() > 0:
             # get only the timestamps between the start and end timestamps
-            before_start = np.where(sensor.data_timestamps() < start_date_timestamp)[0]
-            after_end = np.where(end_date_timestamp <= sensor.data_timestamps())[0]
-            # start_index is inclusive of window start
-            if len(before_start) > 0:
-                last_before_start = before_start[-1]
-                start_index = last_before_start + 1
-            else:
-                last_before_start = None
-                start_index = 0
-            # end_index is non-inclusive of window end
-            if len(after_end) > 0:
-                first_after_end = after_end[0]
-                end_index = first_after_end
+            if sensor.is_sorted():
+                # a binary search does not create arrays the size of the data, which may be memory-mapped
+                timestamps = sensor.data_timestamps()
+                start_index = int(np.searchsorted(timestamps, start_date_timestamp, "left"))
+                end_index = int(np.searchsorted(timestamps, end_date_timestamp, "left"))
+                last_before_start = start_index - 1 if start_index > 0 else None
+                first_after_end = end_index if end_index < sensor.num_samples() else None
             else:
-                first_after_end = None
-                end_index = sensor.num_samples()
+                before_start = np.where(sensor.data_timestamps() < start_date_timestamp)[0]
+                after_end = np.where(end_date_timestamp <= sensor.data_timestamps())[0]
+                # start_index is inclusive of window start
+                if len(before_start) > 0:
+                    last_before_start = before_start[-1]
+                    start_index = last_before_start + 1
+                else:
+                    last_before_start = None
+                    start_index = 0
+                # end_index is non-inclusive of window end
+                if len(after_end) > 0:
+                    first_after_end = after_end[0]
+                    end_index = first_after_end
+                else:
+                    first_after_end = None
+                    end_index = sensor.num_samples()
             # check if all the samples have been cut off
             is_audio = sensor.type == SensorType.AUDIO
             if end_index <= start_index:
@@ -512,24 +623,23 @@ class DataWindow:
                     self.errors.append(f"Data window for {station_id} "
                                        f"Audio sensor has truncated all data points")
                 elif last_before_start is not None and first_after_end is None:
-                    sensor.data_df = sensor.data_df.iloc[[last_before_start]]
-                    sensor.data_df["timestamps"] = [start_date_timestamp]
+                    sensor.take_samples(np.array([last_before_start]))
+                    sensor.set_column("timestamps", np.array([start_date_timestamp], dtype=float))
                 elif last_before_start is None and first_after_end is not None:
-                    sensor.data_df = sensor.data_df.iloc[[first_after_end]]
-                    sensor.data_df["timestamps"] = [end_date_timestamp]
+                    sensor.take_samples(np.array([first_after_end]))
+                    sensor.set_column("timestamps", np.array([end_date_timestamp], dtype=float))
                 elif last_before_start is not None and first_after_end is not None:
-                    sensor.data_df = sensor.interpolate(start_date_timestamp, last_before_start, 1,
-                                                        self.copy_edge_points == gpu.DataPointCreationMode.COPY
-                                                        ).to_frame().T
+                    second_point = None if self.copy_edge_points == gpu.DataPointCreationMode.COPY \
+                        else [last_before_start + 1]
+                    sensor.set_columns(sensor.interpolated_columns([start_date_timestamp], [last_before_start],
+                                                                   second_point), True)
                 else:
                     self.errors.append(
                         f"Data window for {station_id} {sensor.type.name} "
                         f"sensor has truncated all data points"
                     )
             else:
-                sensor.data_df = sensor.data_df.iloc[start_index:end_index].reset_index(
-                    drop=True
-                )
+                sensor.take_samples(slice(start_index, end_index))
                 # if sensor is audio or location, we want nan'd edge points
                 if sensor.type in [SensorType.LOCATION, SensorType.AUDIO]:
                     new_point_mode = gpu.DataPointCreationMode["NAN"]
@@ -555,18 +665,24 @@ class DataWindow:
                                                    / end_sample_interval)
                     else:
                         start_samples_to_add = 0
-                # add to end
-                sensor.data_df = gpu.add_data_points_to_df(dataframe=sensor.data_df,
-                                                           start_index=sensor.num_samples() - 1,
-                                                           sample_interval_micros=end_sample_interval,
-                                                           num_samples_to_add=end_samples_to_add,
-                                                           point_creation_mode=new_point_mode)
-                # add to begin
-                sensor.data_df = gpu.add_data_points_to_df(dataframe=sensor.data_df, start_index=0,
-                                                           sample_interval_micros=start_sample_interval,
-                                                           num_samples_to_add=start_samples_to_add,
-                                                           point_creation_mode=new_point_mode)
-                sensor.data_df.sort_values("timestamps", inplace=True, ignore_index=True)
+                if new_point_mode == gpu.DataPointCreationMode.NAN:
+                    # points without data can be added to the arrays directly
+                    sensor.insert_dataless_timestamps(np.concatenate([
+                        sensor.last_data_timestamp() + np.arange(1, end_samples_to_add + 1) * end_sample_interval,
+                        sensor.first_data_timestamp()
+                        + np.arange(1, start_samples_to_add + 1) * start_sample_interval]))
+                    return
+                # one point is added at each edge of the other sensors, built from the samples at the edges
+                last_index = sensor.num_samples() - 1
+                if new_point_mode == gpu.DataPointCreationMode.COPY:
+                    second_points = None
+                else:
+                    # interpolate mode uses the next sample inside the window
+                    second_points = [max(last_index - 1, 0), min(1, last_index)]
+                sensor.insert_interpolated_points(
+                    np.array([sensor.last_data_timestamp() + end_sample_interval,
+                              sensor.first_data_timestamp() + start_sample_interval]),
+                    [last_index, 0], second_points)
         else:
             self.errors.append(f"Data window for {station_id} {sensor.type.name} "
                                f"sensor has no data points!")
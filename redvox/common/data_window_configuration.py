@@ -4,11 +4,13 @@ This module provide type-safe data window configuration
 
 from dataclasses import dataclass
 from dataclasses_json import dataclass_json
-from typing import Optional, List, MutableMapping
+from typing import Optional, List, MutableMapping, Dict
 
 import pprint
 import toml
 
+from redvox.common.sensor_data import AUDIO_COUNTS_SCALE
+
 
 # defaults for configuration
 DEFAULT_DROP_TIME_S: float = 0.2  # seconds between packets to be considered a gap
@@ -54,6 +56,18 @@ class DataWindowConfig:
         use_model_correction: bool, if True, use the offset model's correction functions, otherwise use the best
                                 offset.  Default True
         debug: bool, if True, output additional information when processing data window.  Default False
+        sensor_dtypes: optional dictionary of sensor type name to the floating point type to store the data of sensors
+                        of that type as, i.e. {ACCELEROMETER = "float32"}.  Default None (float64)
+        audio_dtype: str, type to store the audio samples as; one of float64, float32, int16 or int32.  Audio that
+                        integers cannot hold exactly is stored as floats instead.  Default float64
+        audio_scale: float, value of one count of audio stored as integers.
+                        Default AUDIO_COUNTS_SCALE (one count of 16 bit audio)
+        sensor_types: optional list of strings, the names of the sensor types to load besides audio, i.e. "PRESSURE"
+                        or "LOCATION".  If None, all sensors are loaded.  Default None
+        scratch_directory: optional string, directory to keep the large columns of the sensors in as memory-mapped
+                            files.  If None, all data is kept in memory.  Default None
+        spill_threshold_bytes: int, columns of at least this many bytes are kept in scratch_directory when it is set.
+                                Default 64 MiB
     """
 
     input_directory: str
@@ -80,6 +94,12 @@ class DataWindowConfig:
     edge_points_mode: str = "COPY"
     use_model_correction: bool = True
     debug: bool = False
+    sensor_dtypes: Optional[Dict[str, str]] = None
+    audio_dtype: str = "float64"
+    audio_scale: float = AUDIO_COUNTS_SCALE
+    sensor_types: Optional[List[str]] = None
+    scratch_directory: Optional[str] = None
+    spill_threshold_bytes: int = 2 ** 26
 
     @staticmethod
     def from_path(config_path: str) -> "DataWindowConfig":
@@ -9,8 +9,11 @@ import math
 import multiprocessing
 from multiprocessing.pool import Pool
 
+import lz4.frame
 import numpy as np
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
 
+from redvox.api1000.proto.redvox_api_m_pb2 import RedvoxPacketM
 from redvox.common.timesync import TimeSyncData
 from redvox.common.parallel_utils import maybe_parallel_map
 
@@ -27,6 +30,7 @@ if TYPE_CHECKING:
     )
     from redvox.api1000.wrapped_redvox_packet.wrapped_packet import WrappedRedvoxPacketM
     from redvox.api900.wrapped_redvox_packet import WrappedRedvoxPacket
+    from redvox.api900.lib.api900_pb2 import RedvoxPacket
 
 # noinspection Mypy
 from redvox.common.date_time_utils import datetime_from_epoch_microseconds_utc as us2dt
@@ -153,6 +157,104 @@ def _partition_list(lst: List[Any], chunks: int) -> List[Any]:
     ]
 
 
+def _find_nested(message: descriptor_pb2.DescriptorProto, name: str) -> descriptor_pb2.DescriptorProto:
+    """
+    :param message: message to search
+    :param name: name of the nested message type to find
+    :return: the nested message type
+    """
+    return next(nested for nested in message.nested_type if nested.name == name)
+
+
+def _remove_fields(message: descriptor_pb2.DescriptorProto, keep: Callable[[str], bool]) -> None:
+    """
+    removes the fields of a message type.  Removed fields are skipped over when parsing.
+
+    :param message: message type to remove fields from
+    :param keep: function that returns True if the field with the given name is kept
+    """
+    fields: List[descriptor_pb2.FieldDescriptorProto] = [f for f in message.field if keep(f.name)]
+    del message.field[:]
+    message.field.extend(fields)
+
+
+def _stats_packet_m_type() -> Any:
+    """
+    Builds a variant of RedvoxPacketM that only contains the fields needed for StationStat.
+    Sensors other than audio and location, station metrics, app settings, and event streams are dropped, and the
+    values of SamplePayload are kept as the raw bytes of each packed chunk instead of being decoded.
+    The fields that are kept use the same numbers as RedvoxPacketM.  Values that are not packed do not match the
+    wire type of the chunks and are kept as unknown fields.
+
+    :return: the message class of the trimmed packet
+    """
+    file_proto: descriptor_pb2.FileDescriptorProto = descriptor_pb2.FileDescriptorProto()
+    RedvoxPacketM.DESCRIPTOR.file.CopyToProto(file_proto)
+    file_proto.name = "redvox_api_m_stats.proto"
+
+    packet: descriptor_pb2.DescriptorProto = file_proto.message_type[0]
+    _remove_fields(packet, lambda name: name != "event_streams")
+    _remove_fields(_find_nested(packet, "StationInformation"),
+                   lambda name: name not in {"app_settings", "station_metrics"})
+    _remove_fields(_find_nested(packet, "Sensors"), lambda name: name in {"audio", "location"})
+    sample_payload: descriptor_pb2.DescriptorProto = _find_nested(packet, "SamplePayload")
+    for f in sample_payload.field:
+        if f.name == "values":
+            f.type = descriptor_pb2.FieldDescriptorProto.TYPE_BYTES
+            f.ClearField("options")
+
+    pool: descriptor_pool.DescriptorPool = descriptor_pool.DescriptorPool()
+    pool.AddSerializedFile(file_proto.SerializeToString())
+    descriptor = pool.FindMessageTypeByName(packet.name if not file_proto.package
+                                            else f"{file_proto.package}.{packet.name}")
+    try:
+        return message_factory.GetMessageClass(descriptor)
+    except AttributeError:
+        # protobuf < 4.21
+        return message_factory.MessageFactory(pool).GetPrototype(descriptor)
+
+
+StatsPacketM = _stats_packet_m_type()
+
+
+def read_stats_fields_api_1000(path: str) -> Tuple[RedvoxPacketM, int]:
+    """
+    Reads the fields of an API 1000 file needed for StationStat without decoding the sensor data that
+    is not needed.  The audio samples are counted, but not decoded.
+
+    :param path: path to the API 1000 file to read
+    :return: the packet without the unneeded sensor data and audio samples, and the number of audio samples
+    """
+    with lz4.frame.open(path, "rb") as serialized_in:
+        return _read_stats_fields(serialized_in.read())
+
+
+def _read_stats_fields(serialized: bytes) -> Tuple[RedvoxPacketM, int]:
+    """
+    :param serialized: a serialized (decompressed) API 1000 packet
+    :return: the packet without the unneeded sensor data and audio samples, and the number of audio samples
+    """
+    trimmed = StatsPacketM.FromString(serialized)
+    num_audio_samples: int = 0
+    if trimmed.sensors.HasField("audio"):
+        samples = trimmed.sensors.audio.samples
+        known_samples = type(samples)()
+        known_samples.CopyFrom(samples)
+        known_samples.DiscardUnknownFields()
+        if known_samples.ByteSize() != samples.ByteSize():
+            # some values are not packed; decode them instead
+            packet: RedvoxPacketM = RedvoxPacketM.FromString(serialized)
+            num_audio_samples = len(packet.sensors.audio.samples.values)
+            packet.sensors.audio.ClearField("samples")
+            return packet, num_audio_samples
+        # each packed float takes 4 bytes
+        num_audio_samples = sum(map(len, samples.values)) // 4
+        trimmed.sensors.audio.ClearField("samples")
+    # the dropped fields are kept as unknown fields; discard them so they are not decoded below
+    trimmed.DiscardUnknownFields()
+    return RedvoxPacketM.FromString(trimmed.SerializeToString()), num_audio_samples
+
+
 @dataclass
 class GpsDateTime:
     """
@@ -311,6 +413,53 @@ class StationStat:
             packet.get_packet_duration(),
         )
 
+    @staticmethod
+    def from_api_1000_path(path: str) -> "StationStat":
+        """
+        Extracts the required fields from an API 1000 file, skipping the sensor data that is not needed.
+        This gives the same result as from_api_1000 on the fully decoded packet.
+
+        :param path: path to the API 1000 file to extract fields from.
+        :return: An instance of StationStat.
+        """
+        return StationStat._from_api_1000_stats_fields(*read_stats_fields_api_1000(path))
+
+    @staticmethod
+    def from_api_1000_entry(entry: io.IndexEntry) -> "StationStat":
+        """
+        Like from_api_1000_path, but also reads packets stored within packet containers.
+
+        :param entry: index entry of the API 1000 packet to extract fields from.
+        :return: An instance of StationStat.
+        """
+        if not entry.is_in_container():
+            return StationStat.from_api_1000_path(entry.full_path)
+        return StationStat.from_api_1000_serialized(lz4.frame.decompress(entry.read_compressed()))
+
+    @staticmethod
+    def from_api_1000_serialized(serialized: bytes) -> "StationStat":
+        """
+        Like from_api_1000_path, but reads a serialized (decompressed) API 1000 packet.
+
+        :param serialized: the serialized packet to extract fields from.
+        :return: An instance of StationStat.
+        """
+        return StationStat._from_api_1000_stats_fields(*_read_stats_fields(serialized))
+
+    @staticmethod
+    def _from_api_1000_stats_fields(packet: RedvoxPacketM, num_audio_samples: int) -> "StationStat":
+        """
+        :param packet: packet holding the fields read by read_stats_fields_api_1000
+        :param num_audio_samples: number of audio samples in the packet
+        :return: An instance of StationStat.
+        """
+        from redvox.api1000.wrapped_redvox_packet.wrapped_packet import WrappedRedvoxPacketM
+
+        stat: StationStat = StationStat.from_api_1000(WrappedRedvoxPacketM(packet))
+        if packet.sensors.HasField("audio"):
+            stat.packet_duration = timedelta(seconds=float(num_audio_samples) / packet.sensors.audio.sample_rate)
+        return stat
+
 
 # noinspection PyTypeChecker,DuplicatedCode
 def extract_stats_serial(index: io.Index) -> List[StationStat]:
@@ -327,8 +476,8 @@ def extract_stats_serial(index: io.Index) -> List[StationStat]:
     )
     # noinspection Mypy
     stats_1000: Iterator[StationStat] = map(
-        StationStat.from_api_1000,
-        index.stream(io.ReadFilter(api_versions={io.ApiVersion.API_1000})),
+        StationStat.from_api_1000_entry,
+        index.filter(io.ReadFilter(api_versions={io.ApiVersion.API_1000})).entries,
     )
     return list(stats_900) + list(stats_1000)
 
@@ -396,4 +545,7 @@ def extract_stats(
     :param pool: optional multiprocessing pool.
     :return: A list of StationStat objects.
     """
+    # the native implementation only reads individual files
+    if any(entry.is_in_container() for entry in index.entries):
+        return extract_stats_parallel(index, pool)
     return ExtractStatsFn(index, pool)
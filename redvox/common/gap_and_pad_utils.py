@@ -1,4 +1,4 @@
-from typing import List, Tuple, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Optional, Union
 import enum
 from math import modf
 from dataclasses import dataclass, field
@@ -27,6 +27,66 @@ NON_INTERPOLATED_COLUMNS = ["compressed_audio", "image"]
 # columns that are not numeric but can be interpolated
 NON_NUMERIC_COLUMNS = ["location_provider", "image_codec", "audio_codec",
                        "network_type", "power_state", "cell_service"]
+# values of the enumerated columns for points without data
+DATALESS_ENUM_VALUES = {
+    "location_provider": LocationProvider["UNKNOWN"].value,
+    "image_codec": ImageCodec["UNKNOWN"].value,
+    "audio_codec": AudioCodec["UNKNOWN"].value,
+    "network_type": NetworkType["UNKNOWN_NETWORK"].value,
+    "power_state": PowerState["UNKNOWN_POWER_STATE"].value,
+    "cell_service": CellServiceState["UNKNOWN"].value
+}
+
+
+def missing_integer_value(dtype: np.dtype) -> int:
+    """
+    :param dtype: integer type of the data
+    :return: the value that marks a point without data in integer data; the smallest value of the type
+    """
+    return int(np.iinfo(dtype).min)
+
+
+def encode_scaled_integers(values: np.ndarray, dtype: np.dtype, scale: float) -> np.ndarray:
+    """
+    converts floating point values into integers of the given type that are multiples of scale.  values are
+    rounded to the nearest multiple and clipped to the range of the type; np.nan becomes missing_integer_value
+
+    :param values: the values to convert
+    :param dtype: integer type of the result
+    :param scale: the value of one integer count
+    :return: the values as integer counts of scale
+    """
+    values = np.asarray(values, dtype=float)
+    info = np.iinfo(dtype)
+    result = np.full(len(values), info.min, dtype=dtype)
+    is_valid = ~np.isnan(values)
+    result[is_valid] = np.clip(np.rint(values[is_valid] / scale), info.min + 1, info.max)
+    return result
+
+
+def decode_scaled_integers(values: np.ndarray, scale: float) -> np.ndarray:
+    """
+    converts integer counts created by encode_scaled_integers back into floats
+
+    :param values: the integer counts
+    :param scale: the value of one integer count
+    :return: the values as floats, with np.nan where there is no data
+    """
+    result = values * scale
+    result[values == missing_integer_value(values.dtype)] = np.nan
+    return result
+
+
+def is_exactly_encoded(values: np.ndarray, dtype: np.dtype, scale: float) -> bool:
+    """
+    :param values: the values to check
+    :param dtype: integer type to store the values as
+    :param scale: the value of one integer count
+    :return: True if encode_scaled_integers converts the values without rounding or clipping any of them
+    """
+    values = np.asarray(values, dtype=float)
+    return bool(np.array_equal(decode_scaled_integers(encode_scaled_integers(values, dtype, scale), scale), values,
+                               equal_nan=True))
 
 
 # noinspection Mypy,DuplicatedCode
@@ -48,11 +108,13 @@ class DataPointCreationMode(enum.Enum):
 @dataclass
 class GapPadResult:
     """
-    The result of filling gaps or padding a time series
+    The result of filling gaps or padding a time series; the result is either a dataframe or a dictionary of
+    column name to array
     """
     result_df: Optional[pd.DataFrame] = None
     gaps: List[Tuple[float, float]] = field(default_factory=lambda: [])
     errors: RedVoxExceptions = field(default_factory=lambda: RedVoxExceptions("GapPadResult"))
+    result_columns: Optional[Dict[str, np.ndarray]] = None
 
     def add_error(self, error: str):
         """
@@ -76,38 +138,111 @@ def calc_evenly_sampled_timestamps(
     return start + (np.arange(0, samples) * sample_interval_micros)
 
 
-def check_gap_list(gaps: List[Tuple[float, float]], start_timestamp: float = None,
+class GapIntervals:
+    """
+    Sorted, non-overlapping gaps, stored as arrays of their start and end timestamps in microseconds since epoch UTC.
+    The start and end of a gap are not part of the gap, so gaps that only touch are kept apart.
+    Iterating over GapIntervals yields (start, end) tuples, like a list of gaps.
+    Properties:
+        starts: np.ndarray of the start timestamps of the gaps, in ascending order
+        ends: np.ndarray of the end timestamps of the gaps, in ascending order
+    """
+    def __init__(self, starts: Optional[np.ndarray] = None, ends: Optional[np.ndarray] = None):
+        """
+        :param starts: start timestamps of sorted, non-overlapping gaps, default None (no gaps)
+        :param ends: end timestamps of the gaps, default None (no gaps)
+        """
+        self.starts: np.ndarray = np.array([], dtype=float) if starts is None else np.asarray(starts, dtype=float)
+        self.ends: np.ndarray = np.array([], dtype=float) if ends is None else np.asarray(ends, dtype=float)
+
+    @staticmethod
+    def from_arrays(starts: np.ndarray, ends: np.ndarray, start_timestamp: Optional[float] = None,
+                    end_timestamp: Optional[float] = None) -> "GapIntervals":
+        """
+        clips the gaps to start_timestamp and end_timestamp, removes any gap where end time <= start time, then
+        sorts the gaps and merges the overlapping ones
+
+        :param starts: start timestamps of the gaps, in any order
+        :param ends: end timestamps of the gaps
+        :param start_timestamp: lowest possible timestamp for a gap to start or end at, default None
+        :param end_timestamp: highest possible timestamp for a gap to start or end at, default None
+        :return: the normalized gaps
+        """
+        starts = np.asarray(starts, dtype=float)
+        ends = np.asarray(ends, dtype=float)
+        if start_timestamp is not None:
+            starts, ends = np.maximum(starts, start_timestamp), np.maximum(ends, start_timestamp)
+        if end_timestamp is not None:
+            starts, ends = np.minimum(starts, end_timestamp), np.minimum(ends, end_timestamp)
+        valid = starts < ends
+        order = np.argsort(starts[valid], kind="stable")
+        starts, ends = starts[valid][order], ends[valid][order]
+        if len(starts) < 1:
+            return GapIntervals()
+        # a gap begins a new interval if it starts at or after the end of every gap before it
+        is_first = np.ones(len(starts), dtype=bool)
+        is_first[1:] = starts[1:] >= np.maximum.accumulate(ends)[:-1]
+        first_indices = np.flatnonzero(is_first)
+        return GapIntervals(starts[first_indices], np.maximum.reduceat(ends, first_indices))
+
+    @staticmethod
+    def from_list(gaps: Iterable[Tuple[float, float]], start_timestamp: Optional[float] = None,
+                  end_timestamp: Optional[float] = None) -> "GapIntervals":
+        """
+        :param gaps: the start and end timestamps of the gaps, in any order
+        :param start_timestamp: lowest possible timestamp for a gap to start or end at, default None
+        :param end_timestamp: highest possible timestamp for a gap to start or end at, default None
+        :return: the normalized gaps; see from_arrays
+        """
+        if isinstance(gaps, GapIntervals):
+            return GapIntervals.from_arrays(gaps.starts, gaps.ends, start_timestamp, end_timestamp)
+        gap_array = np.array(list(gaps), dtype=float).reshape(-1, 2)
+        return GapIntervals.from_arrays(gap_array[:, 0], gap_array[:, 1], start_timestamp, end_timestamp)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[Tuple[float, float]]:
+        return iter(self.to_list())
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, GapIntervals) and np.array_equal(self.starts, other.starts) \
+            and np.array_equal(self.ends, other.ends)
+
+    def to_list(self) -> List[Tuple[float, float]]:
+        """
+        :return: the gaps as a list of (start, end) tuples
+        """
+        return list(zip(self.starts.tolist(), self.ends.tolist()))
+
+    def contains(self, timestamps: Union[float, np.ndarray]) -> Union[bool, np.ndarray]:
+        """
+        finds the timestamps that are inside a gap with one binary search per timestamp
+
+        :param timestamps: timestamp or array of timestamps to check
+        :return: True for each timestamp strictly between the start and end of a gap
+        """
+        if len(self) < 1:
+            return np.zeros(np.shape(timestamps), dtype=bool) if np.ndim(timestamps) > 0 else False
+        # the last gap that starts before each timestamp
+        index = np.searchsorted(self.starts, timestamps, "left") - 1
+        result = (index >= 0) & (timestamps < self.ends[np.maximum(index, 0)])
+        return bool(result) if np.ndim(result) == 0 else result
+
+
+def check_gap_list(gaps: Iterable[Tuple[float, float]], start_timestamp: float = None,
                    end_timestamp: float = None) -> List[Tuple[float, float]]:
     """
     removes any gaps where end time <= start time, consolidates overlapping gaps, and ensures that no gap
     starts or ends before start_timestamp and starts or ends after end_timestamp.  All timestamps are in
-    microseconds since epoch UTC
+    microseconds since epoch UTC.  The result is sorted by start time; see GapIntervals.from_arrays
 
     :param gaps: list of gaps to check
     :param start_timestamp: lowest possible timestamp for a gap to start at
     :param end_timestamp: lowest possible timestamp for a gap to end at
     :return: list of correct, valid gaps
     """
-    return_gaps: List[Tuple[float, float]] = []
-    for gap in gaps:
-        if start_timestamp:
-            gap = (np.max([start_timestamp, gap[0]]), np.max([start_timestamp, gap[1]]))
-        if end_timestamp:
-            gap = (np.min([end_timestamp, gap[0]]), np.min([end_timestamp, gap[1]]))
-        if gap[0] < gap[1]:
-            if len(return_gaps) < 1:
-                return_gaps.append(gap)
-            for a, r_g in enumerate(return_gaps):
-                if (gap[0] < r_g[0] and gap[1] < r_g[0]) or (gap[0] > r_g[1] and gap[1] > r_g[1]):
-                    return_gaps.append(gap)
-                    break
-                else:
-                    if gap[0] < r_g[0] < gap[1]:
-                        r_g = (gap[0], r_g[1])
-                    if gap[0] < r_g[1] < gap[1]:
-                        r_g = (r_g[0], gap[1])
-                    return_gaps[a] = r_g
-    return return_gaps
+    return GapIntervals.from_list(gaps, start_timestamp, end_timestamp).to_list()
 
 
 def pad_data(
@@ -158,9 +293,33 @@ def pad_data(
     return result_df.sort_values("timestamps", ignore_index=True)
 
 
+def _gap_edge_indices(timestamps: np.ndarray, gaps: GapIntervals) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    finds the data points around each gap
+
+    :param timestamps: timestamps of the data
+    :param gaps: the gaps to find the data points around
+    :return: for each gap, the index of the last timestamp at or before the gap start (-1 if none) and the index of
+                the first timestamp at or after the gap end (len(timestamps) if none)
+    """
+    if np.all(timestamps[1:] >= timestamps[:-1]):
+        return (np.searchsorted(timestamps, gaps.starts, "right") - 1,
+                np.searchsorted(timestamps, gaps.ends, "left"))
+    before_start = np.full(len(gaps), -1)
+    after_end = np.full(len(gaps), len(timestamps))
+    for i, (gap_start, gap_end) in enumerate(gaps):
+        before = np.flatnonzero(timestamps <= gap_start)
+        after = np.flatnonzero(timestamps >= gap_end)
+        if len(before) > 0:
+            before_start[i] = before[-1]
+        if len(after) > 0:
+            after_end[i] = after[0]
+    return before_start, after_end
+
+
 def fill_gaps(
         data_df: pd.DataFrame,
-        gaps: List[Tuple[float, float]],
+        gaps: Iterable[Tuple[float, float]],
         sample_interval_micros: float,
         copy: bool = False
 ) -> pd.DataFrame:
@@ -168,8 +327,12 @@ def fill_gaps(
     fills gaps in the dataframe with np.nan or interpolated values by interpolating timestamps based on the
     calculated sample interval
 
+    the data points around the gaps are found with binary searches and all new points are created at once, then
+    added to the data with a single concatenation and sort.  in copy mode, one copy of the data point before each gap
+    is added one sample interval after it.
+
     :param data_df: dataframe with timestamps as column "timestamps"
-    :param gaps: list of tuples of known non-inclusive start and end timestamps of the gaps
+    :param gaps: GapIntervals or list of tuples of known non-inclusive start and end timestamps of the gaps
     :param sample_interval_micros: known sample interval of the data points
     :param copy: if True, copy the data points, otherwise interpolate from edges, default False
     :return: dataframe without gaps
@@ -177,43 +340,42 @@ def fill_gaps(
     # extract the necessary information to compute gap size and gap timestamps
     data_time_stamps = data_df["timestamps"].to_numpy()
     if len(data_time_stamps) > 1:
-        result_df = data_df.copy()
+        result_df = data_df
         data_duration = data_time_stamps[-1] - data_time_stamps[0]
         expected_samples = (np.floor(data_duration / sample_interval_micros)
                             + (1 if data_duration % sample_interval_micros >=
                                sample_interval_micros * DEFAULT_GAP_UPPER_LIMIT else 0)) + 1
         if expected_samples > len(data_time_stamps):
+            # make it safe to alter the gap values
+            my_gaps = GapIntervals.from_list(gaps, data_time_stamps[0], data_time_stamps[-1])
+            before_start, after_end = _gap_edge_indices(data_time_stamps, my_gaps)
+            has_before = before_start >= 0
+            has_after = after_end < len(data_time_stamps)
+            # if timestamps are around gaps, the gaps are measured from them
+            gap_start = np.where(has_before, data_time_stamps[np.maximum(before_start, 0)], my_gaps.starts)
+            gap_end = np.where(has_after, data_time_stamps[np.minimum(after_end, len(data_time_stamps) - 1)],
+                               my_gaps.ends)
+            num_new_points = np.trunc((gap_end - gap_start) / sample_interval_micros).astype(int) - 1
+            # new points are counted from the point before the gap, or back from the point after it
+            is_filled = (has_before | has_after) & (num_new_points > 0)
+            origin = np.where(has_before, before_start, after_end)[is_filled]
+            step = np.where(has_before, sample_interval_micros, -sample_interval_micros)[is_filled]
             if copy:
-                pcm = DataPointCreationMode["COPY"]
+                new_df = data_df.iloc[origin].reset_index(drop=True)
+                for column in NON_INTERPOLATED_COLUMNS:
+                    if column in new_df.columns:
+                        new_df[column] = np.nan
+                new_df["timestamps"] = data_time_stamps[origin] + step
             else:
-                pcm = DataPointCreationMode["NAN"]
-            # make it safe to alter the gap values
-            my_gaps = check_gap_list(gaps, data_time_stamps[0], data_time_stamps[-1])
-            for gap in my_gaps:
-                # if timestamps are around gaps, we have to update the values
-                before_start = np.argwhere([t <= gap[0] for t in data_time_stamps])
-                after_end = np.argwhere([t >= gap[1] for t in data_time_stamps])
-                if len(before_start) > 0:
-                    before_start = before_start[-1][0]
-                    # sim = gap[0] - data_time_stamps[before_start]
-                    # result_df = add_data_points_to_df(result_df, before_start, sim, point_creation_mode=pcm)
-                    gap = (data_time_stamps[before_start], gap[1])
-                else:
-                    before_start = None
-                if len(after_end) > 0:
-                    after_end = after_end[0][0]
-                    # sim = gap[1] - data_time_stamps[after_end]
-                    gap = (gap[0], data_time_stamps[after_end])
-                else:
-                    after_end = None
-                num_new_points = int((gap[1] - gap[0]) / sample_interval_micros) - 1
-                if before_start is not None:
-                    result_df = add_data_points_to_df(result_df, before_start, sample_interval_micros,
-                                                      num_new_points, pcm)
-                elif after_end is not None:
-                    result_df = add_data_points_to_df(result_df, after_end, -sample_interval_micros,
-                                                      num_new_points, pcm)
-        return result_df.sort_values("timestamps", ignore_index=True)
+                counts = num_new_points[is_filled]
+                # the position of each new point within its gap, starting at 1
+                positions = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+                new_timestamps = np.repeat(data_time_stamps[origin], counts) + positions * np.repeat(step, counts)
+                new_df = pd.DataFrame(create_dataless_columns(new_timestamps, list(data_df.columns)))
+                new_df["timestamps"] = new_timestamps
+            if len(new_df) > 0:
+                result_df = pd.concat([data_df, new_df], ignore_index=True)
+        return result_df.sort_values("timestamps", kind="mergesort", ignore_index=True)
     return data_df
 
 
@@ -221,7 +383,11 @@ def fill_audio_gaps(
         packet_data: List[Tuple[float, np.array]],
         sample_interval_micros: float,
         gap_upper_limit: float = DEFAULT_GAP_UPPER_LIMIT,
-        gap_lower_limit: float = DEFAULT_GAP_LOWER_LIMIT
+        gap_lower_limit: float = DEFAULT_GAP_LOWER_LIMIT,
+        audio_dtype: np.dtype = np.float64,
+        as_columns: bool = False,
+        audio_scale: float = 1.,
+        allocate: Callable[[int, np.dtype], np.ndarray] = np.empty
 ) -> GapPadResult:
     """
     fills gaps in the dataframe with np.nan by interpolating timestamps based on the expected sample interval
@@ -229,23 +395,43 @@ def fill_audio_gaps(
       * converts gaps with duration greater than or equal to packet length * gap_upper_limit into a multiple of
         packet length
 
+    the size of the result is found before any data is copied, then the timestamps and audio are written into
+    preallocated arrays.  integer audio is stored as counts of audio_scale (see encode_scaled_integers) and gaps are
+    filled with missing_integer_value instead of np.nan.
+
     :param packet_data: list of tuples, each tuple containing two pieces of packet information:
         * packet_start_timestamps: float of packet start timestamp in microseconds
-        * audio_data: array of data points
+        * audio_data: array or sequence of data points
     :param sample_interval_micros: sample interval in microseconds
     :param gap_upper_limit: percentage of packet length required to confirm gap is at least 1 packet,
                             default DEFAULT_GAP_UPPER_LIMIT
     :param gap_lower_limit: percentage of packet length required to disregard gap, default DEFAULT_GAP_LOWER_LIMIT
+    :param audio_dtype: floating point or signed integer type of the audio data, default np.float64
+    :param as_columns: if True, the result is a dictionary of column name to array in result_columns instead of a
+                        dataframe in result_df, default False
+    :param audio_scale: the value of one count of integer audio data; not used for floating point audio, default 1.0
+    :param allocate: function that returns an uninitialized array given its length and type, used to create the
+                        result arrays, for example SpillPolicy.allocate to write them to disk.  default np.empty
     :return: dataframe without gaps and the list of timestamps of the non-inclusive start and end of the gaps
     """
-    result_array = [[], [], []]
+    is_integer: bool = np.issubdtype(audio_dtype, np.signedinteger)
+    if not is_integer and not np.issubdtype(audio_dtype, np.floating):
+        raise ValueError(f"audio_dtype must be a floating point or signed integer type, not {np.dtype(audio_dtype)}")
+    gap_value = missing_integer_value(audio_dtype) if is_integer else np.nan
+    # first pass: the start and number of gap samples before each packet, and the start of each packet
+    layout: List[Tuple[float, int, float, Tuple[float, np.array]]] = []
+    total_samples: int = 0
     last_data_timestamp: Optional[float] = None
     gaps = []
     for packet in packet_data:
         samples_in_packet = len(packet[1])
+        if samples_in_packet < 1:
+            continue
         start_ts = packet[0]
+        gap_start_ts = np.nan
+        num_gap_samples = 0
         packet_length = sample_interval_micros * samples_in_packet
-        if last_data_timestamp:
+        if last_data_timestamp is not None:
             last_data_timestamp += sample_interval_micros
             # check if start_ts is close to the last timestamp in data_timestamps
             last_timestamp_diff = start_ts - last_data_timestamp
@@ -253,28 +439,43 @@ def fill_audio_gaps(
                 fractional_packet, num_packets = modf(last_timestamp_diff /
                                                       (samples_in_packet * sample_interval_micros))
                 if fractional_packet >= gap_upper_limit:
-                    num_samples = samples_in_packet * (num_packets + 1)
+                    num_gap_samples = int(samples_in_packet * (num_packets + 1))
                 else:
-                    num_samples = np.max([np.floor((fractional_packet + num_packets) * samples_in_packet), 1])
-                gap_ts = calc_evenly_sampled_timestamps(last_data_timestamp, num_samples, sample_interval_micros)
-                gap_array = [gap_ts, np.full(len(gap_ts), np.nan)]
-                start_ts = gap_ts[-1] + sample_interval_micros
+                    num_gap_samples = int(np.max([np.floor((fractional_packet + num_packets) * samples_in_packet), 1]))
+                gap_start_ts = last_data_timestamp
+                start_ts = (gap_start_ts + (num_gap_samples - 1) * sample_interval_micros) + sample_interval_micros
                 gaps.append((last_data_timestamp, start_ts))
-                result_array[0].extend(gap_array[0])
-                result_array[1].extend(gap_array[0])
-                result_array[2].extend(gap_array[1])
             elif last_timestamp_diff < -gap_lower_limit * packet_length:
                 result = GapPadResult()
                 result.add_error(f"Packet start timestamp: {dtu.microseconds_to_seconds(start_ts)} "
                                  f"is before last timestamp of previous "
                                  f"packet: {dtu.microseconds_to_seconds(last_data_timestamp)}")
                 return result
-        estimated_ts = calc_evenly_sampled_timestamps(start_ts, samples_in_packet, sample_interval_micros)
-        last_data_timestamp = estimated_ts[-1]
-        result_array[0].extend(estimated_ts)
-        result_array[1].extend(estimated_ts)
-        result_array[2].extend(packet[1])
-    return GapPadResult(pd.DataFrame(np.transpose(result_array), columns=AUDIO_DF_COLUMNS), gaps)
+        layout.append((gap_start_ts, num_gap_samples, start_ts, packet))
+        last_data_timestamp = start_ts + (samples_in_packet - 1) * sample_interval_micros
+        total_samples += num_gap_samples + samples_in_packet
+    # second pass: write the gaps and packets into the result
+    timestamps = allocate(total_samples, np.dtype(np.float64))
+    audio = allocate(total_samples, np.dtype(audio_dtype))
+    # offsets from the first timestamp of a run of samples, keyed by the number of samples in the run
+    offsets: Dict[int, np.ndarray] = {}
+    index = 0
+    for gap_start_ts, num_gap_samples, start_ts, packet in layout:
+        packet_samples = encode_scaled_integers(packet[1], audio_dtype, audio_scale) if is_integer else packet[1]
+        for first_ts, num_samples, samples in ((gap_start_ts, num_gap_samples, gap_value),
+                                               (start_ts, len(packet[1]), packet_samples)):
+            if num_samples > 0:
+                if num_samples not in offsets:
+                    offsets[num_samples] = np.arange(0, num_samples) * sample_interval_micros
+                np.add(first_ts, offsets[num_samples], out=timestamps[index:index + num_samples])
+                audio[index:index + num_samples] = samples
+                index += num_samples
+    unaltered_timestamps = allocate(total_samples, np.dtype(np.float64))
+    unaltered_timestamps[:] = timestamps
+    columns = {AUDIO_DF_COLUMNS[0]: timestamps, AUDIO_DF_COLUMNS[1]: unaltered_timestamps, AUDIO_DF_COLUMNS[2]: audio}
+    if as_columns:
+        return GapPadResult(result_columns=columns, gaps=gaps)
+    return GapPadResult(pd.DataFrame(columns), gaps)
 
 
 def add_data_points_to_df(dataframe: pd.DataFrame,
@@ -406,14 +607,7 @@ def create_dataless_timestamps_df(
     :return: dataframe with timestamps and no data
     """
     empty_df = pd.DataFrame(np.full([num_samples_to_add, len(columns)], np.nan), columns=columns)
-    enum_samples = {
-        "location_provider": LocationProvider["UNKNOWN"].value,
-        "image_codec": ImageCodec["UNKNOWN"].value,
-        "audio_codec": AudioCodec["UNKNOWN"].value,
-        "network_type": NetworkType["UNKNOWN_NETWORK"].value,
-        "power_state": PowerState["UNKNOWN_POWER_STATE"].value,
-        "cell_service": CellServiceState["UNKNOWN"].value
-    }
+    enum_samples = DATALESS_ENUM_VALUES
     if num_samples_to_add > 0:
         if add_to_start:
             sample_interval_micros = -sample_interval_micros
@@ -436,3 +630,33 @@ def create_dataless_timestamps_df(
             # elif column_index == "cell_service":
             #     empty_df[column_index] = [CellServiceState.UNKNOWN for i in range(num_samples_to_add)]
     return empty_df
+
+
+def create_dataless_columns(timestamps: np.ndarray, columns: List[str],
+                            dtypes: Optional[Dict[str, np.dtype]] = None) -> Dict[str, np.ndarray]:
+    """
+    Creates the columns of points without data at the given timestamps; the array equivalent of
+    create_dataless_timestamps_df
+
+    :param timestamps: timestamps in microseconds since epoch UTC of the points
+    :param columns: the names of the columns to create
+    :param dtypes: optional types of the columns to create; columns without a type are floats, default None
+    :return: dictionary of column name to values; timestamps as given, enumerated columns set to their unknown
+                values, integer columns set to missing_integer_value and all other columns set to np.nan
+    """
+    if dtypes is None:
+        dtypes = {}
+    result: Dict[str, np.ndarray] = {}
+    for column in columns:
+        dtype = np.dtype(dtypes.get(column, float))
+        if column == "timestamps":
+            result[column] = np.asarray(timestamps, dtype=float)
+        elif column in DATALESS_ENUM_VALUES:
+            result[column] = np.full(len(timestamps), DATALESS_ENUM_VALUES[column])
+        elif np.issubdtype(dtype, np.signedinteger):
+            result[column] = np.full(len(timestamps), missing_integer_value(dtype), dtype=dtype)
+        elif np.issubdtype(dtype, np.floating):
+            result[column] = np.full(len(timestamps), np.nan, dtype=dtype)
+        else:
+            result[column] = np.full(len(timestamps), np.nan)
+    return result
@@ -4,13 +4,18 @@ This module provides IO primitives for working with cross-API RedVox data.
 from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from functools import partial
 from glob import glob
 import os.path
 import multiprocessing
 import multiprocessing.pool
 from pathlib import Path, PurePath
 import pickle
+import itertools
 import json
+import struct
+import threading
+import time
 from shutil import copy2, move
 from typing import (
     Any,
@@ -19,14 +24,19 @@ from typing import (
     List,
     Optional,
     Set,
+    Tuple,
     Union,
     TYPE_CHECKING,
     Callable,
 )
 
+import lz4.block
 import lz4.frame
+import numpy as np
 
-from redvox.api900.reader import read_rdvxz_file, read_buffer
+from redvox.api900.reader import read_rdvxz_file, read_buffer, wrap
+from redvox.api900.reader_utils import calculate_uncompressed_size
+from redvox.api900.lib.api900_pb2 import RedvoxPacket as RedvoxPacket900
 from redvox.api1000.common.common import check_type
 from redvox.api1000.wrapped_redvox_packet.wrapped_packet import WrappedRedvoxPacketM
 from redvox.api1000.proto.redvox_api_m_pb2 import RedvoxPacketM
@@ -35,14 +45,13 @@ from redvox.common.date_time_utils import (
     datetime_from_epoch_microseconds_utc as dt_us,
     datetime_from_epoch_milliseconds_utc as dt_ms,
     datetime_to_epoch_microseconds_utc as us_dt,
-    truncate_dt_ymd,
-    truncate_dt_ymdh,
 )
-from redvox.common.parallel_utils import maybe_parallel_map
+from redvox.common.parallel_utils import maybe_parallel_map, prefetch_map
 
 if TYPE_CHECKING:
     from redvox.api900.wrapped_redvox_packet import WrappedRedvoxPacket
     from redvox.common.data_window import DataWindow
+    from redvox.common.station import Station
     from redvox.api900.lib.api900_pb2 import RedvoxPacket
 
 
@@ -69,6 +78,35 @@ def _not_none(value: Optional[Any]) -> bool:
     return value is not None
 
 
+# Each thread (and so each pool worker) reuses its own buffer for reading compressed files
+__READ_BUFFERS: threading.local = threading.local()
+
+
+def _read_into_buffer(path: str) -> memoryview:
+    """
+    Reads a file into the calling thread's reusable buffer.  The buffer only grows, so reading many similarly
+    sized files does not allocate a new buffer per file.  The returned view is only valid until the same thread
+    reads another file.
+
+    :param path: Path of the file to read.
+    :return: A view of the file contents within the buffer.
+    """
+    buf: Optional[bytearray] = getattr(__READ_BUFFERS, "buf", None)
+    with open(path, "rb", buffering=0) as file_in:
+        size: int = os.fstat(file_in.fileno()).st_size
+        if buf is None or len(buf) < size:
+            buf = bytearray(size)
+            __READ_BUFFERS.buf = buf
+        view: memoryview = memoryview(buf)[:size]
+        read: int = 0
+        while read < size:
+            n: int = file_in.readinto(view[read:])
+            if not n:
+                break
+            read += n
+    return view[:read]
+
+
 @dataclass
 class IndexEntry:
     """
@@ -81,6 +119,9 @@ class IndexEntry:
     date_time: datetime
     extension: str
     api_version: ApiVersion
+    # Set when the packet is stored within a packet container at full_path rather than in its own file
+    container_offset: Optional[int] = None
+    container_length: Optional[int] = None
 
     @staticmethod
     def from_path(path_str: str, strict: bool = True) -> Optional["IndexEntry"]:
@@ -92,11 +133,16 @@ class IndexEntry:
         :param strict: When set, None is returned if the referenced file DNE.
         :return: Either an IndexEntry or successful parse or None.
         """
-        api_version: ApiVersion = check_version(path_str)
         path: Path = Path(path_str)
         name: str = path.stem
         ext: str = path.suffix
 
+        # Containers hold many packets and are indexed with read_container_entries
+        if ext == CONTAINER_EXTENSION:
+            return None
+
+        api_version: ApiVersion = check_version(path_str)
+
         # Attempt to parse file name parts
         split_name = name.split("_")
         if len(split_name) != 2:
@@ -162,12 +208,30 @@ class IndexEntry:
         )
         return entry
 
+    def is_in_container(self) -> bool:
+        """
+        :return: True if this entry's packet is stored within a packet container.
+        """
+        return self.container_offset is not None
+
+    def read_compressed(self) -> bytes:
+        """
+        :return: The compressed bytes of the packet pointed to by this entry.
+        """
+        with open(self.full_path, "rb") as file_in:
+            if self.is_in_container():
+                file_in.seek(self.container_offset)
+                return file_in.read(self.container_length)
+            return file_in.read()
+
     def read(self) -> Optional[Union[WrappedRedvoxPacketM, "WrappedRedvoxPacket"]]:
         """
         Reads, decompresses, deserializes, and wraps the RedVox file pointed to by this entry.
 
         :return: One of WrappedRedvoxPacket, WrappedRedvoxPacketM, or None.
         """
+        if self.is_in_container():
+            return _wrap_raw(_decompress_packet(self.read_compressed(), self.api_version))
         if self.api_version == ApiVersion.API_900:
             return read_rdvxz_file(self.full_path)
         elif self.api_version == ApiVersion.API_1000:
@@ -175,23 +239,45 @@ class IndexEntry:
         else:
             return None
 
-    def read_raw(self) -> Optional[Union["RedvoxPacket", RedvoxPacketM]]:
+    def read_raw(
+        self, reuse_buffer: bool = False, skip_sensors: Optional[Set[str]] = None
+    ) -> Optional[Union["RedvoxPacket", RedvoxPacketM]]:
         """
         Reads, decompresses, and deserializes the RedVox file pointed to by this entry.
 
+        :param reuse_buffer: When True, the compressed file is read into a buffer that is reused by the calling thread
+                             and decompressed straight into a buffer of its uncompressed size (default=False).
+        :param skip_sensors: Optional names of the fields of RedvoxPacketM.Sensors to leave out of API 1000 packets
+                             without decoding them (default=None).
         :return: One of RedvoxPacket, RedvoxPacketM, or None. Note that these are the raw protobuf types.
         """
+        if self.is_in_container():
+            return _decompress_packet(self.read_compressed(), self.api_version, skip_sensors)
+        if reuse_buffer:
+            return self._read_raw_buffered(skip_sensors)
         if self.api_version == ApiVersion.API_900:
             with open(self.full_path, "rb") as buf_in:
                 return read_buffer(buf_in.read())
         elif self.api_version == ApiVersion.API_1000:
             with lz4.frame.open(self.full_path, "rb") as serialized_in:
-                proto: RedvoxPacketM = RedvoxPacketM()
-                proto.ParseFromString(serialized_in.read())
-                return proto
+                return deserialize_api_1000(serialized_in.read(), skip_sensors)
         else:
             return None
 
+    def _read_raw_buffered(
+        self, skip_sensors: Optional[Set[str]] = None
+    ) -> Optional[Union["RedvoxPacket", RedvoxPacketM]]:
+        """
+        Like read_raw, but reads through the calling thread's reusable buffer.
+
+        :param skip_sensors: Optional names of the fields of RedvoxPacketM.Sensors to leave out of API 1000 packets
+                             without decoding them (default=None).
+        :return: One of RedvoxPacket, RedvoxPacketM, or None. Note that these are the raw protobuf types.
+        """
+        if self.is_in_container():
+            return self.read_raw(skip_sensors=skip_sensors)
+        return _decompress_packet(_read_into_buffer(self.full_path), self.api_version, skip_sensors)
+
     def _into_native(self):
         pass
 
@@ -205,11 +291,353 @@ class IndexEntry:
         :return: True if this full path is less than the other full path.
         """
         if isinstance(other, IndexEntry):
-            return self.full_path == other.full_path
+            return (
+                self.full_path == other.full_path
+                and self.container_offset == other.container_offset
+            )
 
         return False
 
 
+# Field number of RedvoxPacketM.sensors
+_SENSORS_FIELD_NUMBER: int = RedvoxPacketM.DESCRIPTOR.fields_by_name["sensors"].number
+# Field numbers of the fields of RedvoxPacketM.Sensors, by field name
+_SENSOR_FIELD_NUMBERS: Dict[str, int] = {f.name: f.number for f in RedvoxPacketM.Sensors.DESCRIPTOR.fields}
+
+
+def _read_varint(buf: memoryview, pos: int) -> Tuple[int, int]:
+    """
+    :param buf: serialized protobuf message
+    :param pos: position of a varint in buf
+    :return: the value of the varint and the position after it
+    """
+    result: int = 0
+    shift: int = 0
+    while True:
+        byte: int = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _encode_varint(value: int) -> bytes:
+    """
+    :param value: non-negative value to encode
+    :return: the value encoded as a protobuf varint
+    """
+    result: bytearray = bytearray()
+    while value >= 0x80:
+        result.append((value & 0x7F) | 0x80)
+        value >>= 7
+    result.append(value)
+    return bytes(result)
+
+
+def _field_spans(buf: memoryview, start: int, end: int) -> Iterator[Tuple[int, int, int, int]]:
+    """
+    Walks the fields of a serialized protobuf message without decoding their values.
+
+    :param buf: serialized protobuf message
+    :param start: position of the first field of the message in buf
+    :param end: position after the last field of the message in buf
+    :return: iterator over the number, wire type, start (including the tag) and end of each field
+    """
+    pos: int = start
+    while pos < end:
+        field_start: int = pos
+        tag, pos = _read_varint(buf, pos)
+        wire_type: int = tag & 0x7
+        if wire_type == 0:
+            _, pos = _read_varint(buf, pos)
+        elif wire_type == 1:
+            pos += 8
+        elif wire_type == 2:
+            length, pos = _read_varint(buf, pos)
+            pos += length
+        elif wire_type == 5:
+            pos += 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire_type}")
+        yield tag >> 3, wire_type, field_start, pos
+
+
+def _drop_sensors(serialized: Union[bytes, memoryview], skip_sensors: Optional[Set[str]]) -> Union[bytes, memoryview]:
+    """
+    Removes the named sensors from a serialized RedvoxPacketM without decoding the packet, so that parsing the
+    result never decodes the skipped sensors.
+
+    :param serialized: A serialized (decompressed) API 1000 packet.
+    :param skip_sensors: Names of the fields of RedvoxPacketM.Sensors to remove. If empty or None, serialized is
+                         returned as is.
+    :return: The serialized packet without the skipped sensors.
+    """
+    if not skip_sensors:
+        return serialized
+    skip_numbers: Set[int] = {_SENSOR_FIELD_NUMBERS[name] for name in skip_sensors}
+    buf: memoryview = memoryview(serialized)
+    parts: List[Union[bytes, memoryview]] = []
+    copied: int = 0
+    try:
+        for number, wire_type, start, end in _field_spans(buf, 0, len(buf)):
+            if number != _SENSORS_FIELD_NUMBER or wire_type != 2:
+                continue
+            _, value_start = _read_varint(buf, _read_varint(buf, start)[1])
+            kept: bytes = b"".join(buf[s:e] for n, _, s, e in _field_spans(buf, value_start, end)
+                                   if n not in skip_numbers)
+            parts.extend([buf[copied:start], _encode_varint(_SENSORS_FIELD_NUMBER << 3 | 2),
+                          _encode_varint(len(kept)), kept])
+            copied = end
+    except (ValueError, IndexError):
+        # leave anything that cannot be walked to the protobuf parser
+        return serialized
+    if not parts:
+        return serialized
+    parts.append(buf[copied:])
+    return b"".join(parts)
+
+
+def deserialize_api_1000(
+    serialized: Union[bytes, memoryview], skip_sensors: Optional[Set[str]] = None
+) -> RedvoxPacketM:
+    """
+    Deserializes a decompressed API 1000 packet.
+
+    :param serialized: A serialized (decompressed) API 1000 packet.
+    :param skip_sensors: Optional names of the fields of RedvoxPacketM.Sensors to leave out of the packet without
+                         decoding them (default=None).
+    :return: The deserialized packet.
+    """
+    proto: RedvoxPacketM = RedvoxPacketM()
+    proto.ParseFromString(_drop_sensors(serialized, skip_sensors))
+    return proto
+
+
+def _decompress_packet(
+    compressed: Union[bytes, memoryview], api_version: ApiVersion, skip_sensors: Optional[Set[str]] = None
+) -> Optional[Union["RedvoxPacket", RedvoxPacketM]]:
+    """
+    Decompresses and deserializes the compressed bytes of a single packet.
+
+    :param compressed: The compressed bytes of the packet, as stored in a RedVox file.
+    :param api_version: The API version of the packet.
+    :param skip_sensors: Optional names of the fields of RedvoxPacketM.Sensors to leave out of API 1000 packets
+                         without decoding them (default=None).
+    :return: One of RedvoxPacket, RedvoxPacketM, or None. Note that these are the raw protobuf types.
+    """
+    if api_version == ApiVersion.API_900:
+        # API 900 files are prefixed by the 4 byte uncompressed size
+        packet_900: RedvoxPacket900 = RedvoxPacket900()
+        packet_900.ParseFromString(
+            lz4.block.decompress(
+                compressed[4:], uncompressed_size=calculate_uncompressed_size(compressed)
+            )
+        )
+        return packet_900
+    elif api_version == ApiVersion.API_1000:
+        # the LZ4 frame header holds the content size, which sizes the decompressed buffer
+        return deserialize_api_1000(lz4.frame.decompress(compressed), skip_sensors)
+    else:
+        return None
+
+
+def _wrap_raw(
+    packet: Optional[Union["RedvoxPacket", RedvoxPacketM]]
+) -> Optional[Union["WrappedRedvoxPacket", WrappedRedvoxPacketM]]:
+    """
+    :param packet: A raw API 900 or API 1000 packet, or None.
+    :return: The wrapped packet, or None.
+    """
+    if isinstance(packet, RedvoxPacketM):
+        return WrappedRedvoxPacketM(packet)
+    elif packet is not None:
+        return wrap(packet)
+    return None
+
+
+# Packet containers hold many compressed packets of one station followed by nothing else.  The layout is:
+#   header: magic, format version, number of packets, length of the station id, station id (utf-8)
+#   table:  one record per packet of timestamp (microseconds), offset of the packet, length of the packet, API version
+#   data:   the compressed packets, exactly as they are stored in .rdvxz and .rdvxm files, in timestamp order
+CONTAINER_EXTENSION: str = ".rdvxc"
+CONTAINER_MAGIC: bytes = b"RDVC"
+CONTAINER_VERSION: int = 1
+# Upper bound on the bytes read at once when streaming consecutive packets of a container
+CONTAINER_MAX_READ_BYTES: int = 64 * 1024 * 1024
+__CONTAINER_HEADER: struct.Struct = struct.Struct("<4sHIH")
+__CONTAINER_RECORD: struct.Struct = struct.Struct("<qQIH")
+__CONTAINER_API_CODES: Dict[ApiVersion, int] = {ApiVersion.API_900: 900, ApiVersion.API_1000: 1000}
+__CONTAINER_API_VERSIONS: Dict[int, ApiVersion] = {900: ApiVersion.API_900, 1000: ApiVersion.API_1000}
+__CONTAINER_EXTENSIONS: Dict[ApiVersion, str] = {ApiVersion.API_900: ".rdvxz", ApiVersion.API_1000: ".rdvxm"}
+
+
+def read_container_entries(path: str) -> List[IndexEntry]:
+    """
+    Reads the table of a packet container.  Only the header and table are read, not the packets.
+
+    :param path: Path of the container.
+    :return: An IndexEntry for each packet in the container, in timestamp order.
+    """
+    full_path: str = str(Path(path).resolve())
+    with open(full_path, "rb") as file_in:
+        magic, version, count, id_len = __CONTAINER_HEADER.unpack(file_in.read(__CONTAINER_HEADER.size))
+        if magic != CONTAINER_MAGIC or version != CONTAINER_VERSION:
+            raise ValueError(f"{path} is not a version {CONTAINER_VERSION} packet container")
+        station_id: str = file_in.read(id_len).decode("utf-8")
+        table: bytes = file_in.read(__CONTAINER_RECORD.size * count)
+
+    entries: List[IndexEntry] = []
+    for ts_us, offset, length, api_code in __CONTAINER_RECORD.iter_unpack(table):
+        api_version: ApiVersion = __CONTAINER_API_VERSIONS.get(api_code, ApiVersion.UNKNOWN)
+        entries.append(
+            IndexEntry(
+                full_path,
+                station_id,
+                dt_us(ts_us),
+                __CONTAINER_EXTENSIONS.get(api_version, CONTAINER_EXTENSION),
+                api_version,
+                offset,
+                length,
+            )
+        )
+    return entries
+
+
+def write_container(path: str, entries: List[IndexEntry]) -> List[IndexEntry]:
+    """
+    Writes the packets pointed to by the given entries into a single packet container.  If a container already exists
+    at path, its packets are kept unless one of the given entries has the same timestamp.  The container is replaced
+    atomically, so it may also be one of the sources.
+
+    :param path: Path of the container to write.
+    :param entries: Entries of compressed API 900 or API 1000 packets of a single station.
+    :return: The entries of the written container.
+    """
+    by_time: Dict[datetime, IndexEntry] = {}
+    if os.path.isfile(path):
+        by_time.update((entry.date_time, entry) for entry in read_container_entries(path))
+    by_time.update((entry.date_time, entry) for entry in entries)
+
+    station_ids: Set[str] = {entry.station_id for entry in by_time.values()}
+    if len(station_ids) != 1:
+        raise ValueError(f"a packet container holds exactly one station, got {sorted(station_ids)}")
+
+    ordered: List[IndexEntry] = [by_time[date_time] for date_time in sorted(by_time)]
+    packets: List[bytes] = [entry.read_compressed() for entry in ordered]
+    station_id: bytes = station_ids.pop().encode("utf-8")
+
+    offset: int = __CONTAINER_HEADER.size + len(station_id) + __CONTAINER_RECORD.size * len(ordered)
+    table: List[bytes] = []
+    for entry, packet in zip(ordered, packets):
+        table.append(
+            __CONTAINER_RECORD.pack(
+                round(us_dt(entry.date_time)), offset, len(packet), __CONTAINER_API_CODES[entry.api_version]
+            )
+        )
+        offset += len(packet)
+
+    tmp_path: str = f"{path}.tmp"
+    with open(tmp_path, "wb") as file_out:
+        file_out.write(__CONTAINER_HEADER.pack(CONTAINER_MAGIC, CONTAINER_VERSION, len(ordered), len(station_id)))
+        file_out.write(station_id)
+        file_out.writelines(table)
+        file_out.writelines(packets)
+    os.replace(tmp_path, path)
+    return read_container_entries(path)
+
+
+def _container_reads(entries: List[IndexEntry]) -> Iterator[List[IndexEntry]]:
+    """
+    Groups entries into reads.  Each run of consecutive entries from the same container becomes a single read (split
+    so that no read spans more than CONTAINER_MAX_READ_BYTES), every other entry is a read of its own.
+
+    :param entries: The entries to group.
+    :return: An iterator over the groups of entries, in the order of the given entries.
+    """
+    run: List[IndexEntry] = []
+    run_start: int = 0
+    run_end: int = 0
+    for entry in entries:
+        if run:
+            start: int = min(run_start, entry.container_offset or 0)
+            end: int = max(run_end, (entry.container_offset or 0) + (entry.container_length or 0))
+            if (
+                entry.is_in_container()
+                and entry.full_path == run[0].full_path
+                and end - start <= CONTAINER_MAX_READ_BYTES
+            ):
+                run.append(entry)
+                run_start, run_end = start, end
+                continue
+            yield run
+            run = []
+        if entry.is_in_container():
+            run = [entry]
+            run_start = entry.container_offset
+            run_end = entry.container_offset + entry.container_length
+        else:
+            yield [entry]
+    if run:
+        yield run
+
+
+def _read_compressed_run(entries: List[IndexEntry]) -> List[Union[bytes, memoryview]]:
+    """
+    Reads the compressed packets of entries from the same container with one sequential read.
+
+    :param entries: Entries within a single container.
+    :return: The compressed bytes of each entry, in the order of the given entries.
+    """
+    start: int = min(entry.container_offset for entry in entries)
+    end: int = max(entry.container_offset + entry.container_length for entry in entries)
+    with open(entries[0].full_path, "rb") as file_in:
+        file_in.seek(start)
+        view: memoryview = memoryview(file_in.read(end - start))
+    return [
+        view[entry.container_offset - start: entry.container_offset - start + entry.container_length]
+        for entry in entries
+    ]
+
+
+def _read_raw_run(
+    entries: List[IndexEntry], reuse_buffer: bool = False, skip_sensors: Optional[Set[str]] = None
+) -> List[Optional[Union["RedvoxPacket", RedvoxPacketM]]]:
+    """
+    :param entries: A group of entries as produced by _container_reads.
+    :param reuse_buffer: Passed to IndexEntry.read_raw for entries that are not in a container.
+    :param skip_sensors: Optional names of the fields of RedvoxPacketM.Sensors to leave out of API 1000 packets.
+    :return: The raw packets of the entries, in the order of the given entries.
+    """
+    if entries[0].is_in_container():
+        return [
+            _decompress_packet(compressed, entry.api_version, skip_sensors)
+            for entry, compressed in zip(entries, _read_compressed_run(entries))
+        ]
+    return [entry.read_raw(reuse_buffer, skip_sensors) for entry in entries]
+
+
+def _read_raw_run_buffered(
+    entries: List[IndexEntry], skip_sensors: Optional[Set[str]] = None
+) -> List[Optional[Union["RedvoxPacket", RedvoxPacketM]]]:
+    """
+    :param entries: A group of entries as produced by _container_reads.
+    :param skip_sensors: Optional names of the fields of RedvoxPacketM.Sensors to leave out of API 1000 packets.
+    :return: The raw packets of the entries, reading files that are not in a container through a reusable buffer.
+    """
+    return _read_raw_run(entries, True, skip_sensors)
+
+
+def _read_run(entries: List[IndexEntry]) -> List[Optional[Union["WrappedRedvoxPacket", WrappedRedvoxPacketM]]]:
+    """
+    :param entries: A group of entries as produced by _container_reads.
+    :return: The wrapped packets of the entries, in the order of the given entries.
+    """
+    if entries[0].is_in_container():
+        return list(map(_wrap_raw, _read_raw_run(entries)))
+    return [entry.read() for entry in entries]
+
+
 # noinspection DuplicatedCode
 @dataclass
 class ReadFilter:
@@ -380,6 +808,28 @@ class ReadFilter:
 
         return True
 
+    def apply_span(self, span_start: datetime, span_end: datetime) -> bool:
+        """
+        Tests if any datetime within a span of time could pass this filter.
+
+        :param span_start: Start of the span (inclusive)
+        :param span_end: End of the span (exclusive)
+        :return: True if the span overlaps the filter's window including its buffers, False otherwise
+        """
+        start_buf: timedelta = (
+            timedelta(seconds=0) if self.start_dt_buf is None else self.start_dt_buf
+        )
+        if self.start_dt is not None and span_end <= self.start_dt - start_buf:
+            return False
+
+        end_buf: timedelta = (
+            timedelta(seconds=0) if self.end_dt_buf is None else self.end_dt_buf
+        )
+        if self.end_dt is not None and span_start > self.end_dt + end_buf:
+            return False
+
+        return True
+
     def apply(self, entry: IndexEntry) -> bool:
         """
         Applies this filter to the given IndexEntry.
@@ -403,6 +853,122 @@ class ReadFilter:
 
         return True
 
+    def apply_columns(self, columns: "IndexColumns") -> np.ndarray:
+        """
+        Applies this filter to all the entries of a columnar index at once.
+        When the columns are sorted, the time window of each station is found using a binary search.
+
+        :param columns: The columns to test.
+        :return: A boolean mask that is True for each entry accepted by the filter.
+        """
+        check_type(columns, [IndexColumns])
+
+        start_buf: timedelta = (
+            timedelta(seconds=0) if self.start_dt_buf is None else self.start_dt_buf
+        )
+        end_buf: timedelta = (
+            timedelta(seconds=0) if self.end_dt_buf is None else self.end_dt_buf
+        )
+        start: Optional[np.datetime64] = (
+            None if self.start_dt is None else np.datetime64(self.start_dt - start_buf, "us")
+        )
+        end: Optional[np.datetime64] = (
+            None if self.end_dt is None else np.datetime64(self.end_dt + end_buf, "us")
+        )
+
+        mask: np.ndarray
+        if start is None and end is None:
+            mask = np.ones(len(columns), dtype=bool)
+        elif columns.is_sorted:
+            mask = np.zeros(len(columns), dtype=bool)
+            for run_start, run_end in columns.station_runs():
+                run_timestamps: np.ndarray = columns.timestamps[run_start:run_end]
+                lo: int = 0 if start is None else int(np.searchsorted(run_timestamps, start, "left"))
+                hi: int = len(run_timestamps) if end is None else int(np.searchsorted(run_timestamps, end, "right"))
+                mask[run_start + lo:run_start + hi] = True
+        else:
+            mask = np.ones(len(columns), dtype=bool)
+            if start is not None:
+                mask &= columns.timestamps >= start
+            if end is not None:
+                mask &= columns.timestamps <= end
+
+        if self.station_ids is not None:
+            mask &= np.isin(columns.station_ids, list(self.station_ids))
+
+        if self.extensions is not None:
+            mask &= np.isin(columns.extensions, list(self.extensions))
+
+        if self.api_versions is not None:
+            mask &= np.isin(columns.api_versions, [api_version.value for api_version in self.api_versions])
+
+        return mask
+
+
+@dataclass
+class IndexColumns:
+    """
+    A columnar view of the entries of an Index.  Each column holds one field of every entry, in entry order.
+    """
+
+    station_ids: np.ndarray
+    timestamps: np.ndarray
+    api_versions: np.ndarray
+    extensions: np.ndarray
+    is_sorted: bool = False
+
+    @staticmethod
+    def from_entries(entries: List[IndexEntry], is_sorted: bool = False) -> "IndexColumns":
+        """
+        Builds the columns of a list of entries.
+
+        :param entries: Entries to build the columns from.
+        :param is_sorted: True if the entries are sorted by api version, station id and date time (default=False).
+        :return: An instance of IndexColumns.
+        """
+        return IndexColumns(
+            np.array([entry.station_id for entry in entries], dtype=str),
+            np.array([entry.date_time for entry in entries], dtype="datetime64[us]"),
+            np.array([entry.api_version.value for entry in entries], dtype=str),
+            np.array([entry.extension for entry in entries], dtype=str),
+            is_sorted,
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def take(self, indices: np.ndarray, is_sorted: bool = False) -> "IndexColumns":
+        """
+        :param indices: Indices of the entries to keep.
+        :param is_sorted: True if the selected entries are sorted (default=False).
+        :return: The columns of the selected entries.
+        """
+        return IndexColumns(
+            self.station_ids[indices],
+            self.timestamps[indices],
+            self.api_versions[indices],
+            self.extensions[indices],
+            is_sorted,
+        )
+
+    def sort_order(self) -> np.ndarray:
+        """
+        :return: The stable order of the entries sorted by api version, station id, and date time.
+        """
+        return np.lexsort((self.timestamps, self.station_ids, self.api_versions))
+
+    def station_runs(self) -> Iterator[Tuple[int, int]]:
+        """
+        :return: The (start, end) bounds of each run of consecutive entries with the same api version and station id.
+        """
+        if len(self) == 0:
+            return iter([])
+        changes: np.ndarray = (self.station_ids[1:] != self.station_ids[:-1]) | (
+            self.api_versions[1:] != self.api_versions[:-1]
+        )
+        bounds: List[int] = [0] + (np.flatnonzero(changes) + 1).tolist() + [len(self)]
+        return zip(bounds[:-1], bounds[1:])
+
 
 @dataclass
 class IndexStationSummary:
@@ -552,6 +1118,9 @@ class Index:
     """
 
     entries: List[IndexEntry] = field(default_factory=lambda: [])
+    # columnar view of entries, rebuilt whenever entries is replaced or resized
+    _columns: Optional[IndexColumns] = field(default=None, init=False, repr=False, compare=False)
+    _columns_of: Optional[List[IndexEntry]] = field(default=None, init=False, repr=False, compare=False)
 
     @staticmethod
     def from_native(index_native) -> "Index":
@@ -573,14 +1142,47 @@ class Index:
         native_index.entries = list(map(IndexEntry.to_native, self.entries))
         return native_index
 
+    def columns(self) -> IndexColumns:
+        """
+        :return: The columnar view of the entries stored in this index.
+        """
+        if (
+            self._columns is None
+            or self._columns_of is not self.entries
+            or len(self._columns) != len(self.entries)
+        ):
+            self._set_columns(IndexColumns.from_entries(self.entries))
+        return self._columns
+
+    def _set_columns(self, columns: IndexColumns) -> None:
+        """
+        Sets the columnar view of the current entries.
+
+        :param columns: Columns matching the current entries.
+        """
+        self._columns = columns
+        self._columns_of = self.entries
+
+    def _take(self, indices: np.ndarray, is_sorted: bool = False) -> "Index":
+        """
+        :param indices: Indices of the entries to keep.
+        :param is_sorted: True if the selected entries are sorted (default=False).
+        :return: A new index containing only the selected entries, in the order given.
+        """
+        index: Index = Index([self.entries[i] for i in indices])
+        index._set_columns(self.columns().take(indices, is_sorted))
+        return index
+
     def sort(self) -> None:
         """
         Sorts the entries stored in this index.
         """
-        self.entries = sorted(
-            self.entries,
-            key=lambda entry: (entry.api_version, entry.station_id, entry.date_time),
-        )
+        columns: IndexColumns = self.columns()
+        if columns.is_sorted:
+            return
+        order: np.ndarray = columns.sort_order()
+        self.entries = [self.entries[i] for i in order]
+        self._set_columns(columns.take(order, is_sorted=True))
 
     def append(self, entries: Iterator[IndexEntry]) -> None:
         """
@@ -589,6 +1191,15 @@ class Index:
         :param entries: Entries to append.
         """
         self.entries.extend(entries)
+        self._columns = None
+
+    def filter(self, read_filter: ReadFilter) -> "Index":
+        """
+        :param read_filter: Filter to apply to the entries.
+        :return: A new index containing only the entries accepted by the filter, in the same order.
+        """
+        columns: IndexColumns = self.columns()
+        return self._take(np.flatnonzero(read_filter.apply_columns(columns)), columns.is_sorted)
 
     def summarize(self) -> IndexSummary:
         """
@@ -601,33 +1212,78 @@ class Index:
         :param station_id: id to get entries for
         :return: Index containing only the entries for the station requested
         """
-        return Index([en for en in self.entries if en.station_id == station_id])
+        columns: IndexColumns = self.columns()
+        return self._take(np.flatnonzero(columns.station_ids == station_id), columns.is_sorted)
+
+    def group_by_station_id(self) -> Dict[str, "Index"]:
+        """
+        Splits this index by station id in a single pass over the entries.
+
+        :return: Dictionary of station id to an Index containing only the entries of that station, in the same order.
+                    Station ids are in the order they first appear in this index.
+        """
+        columns: IndexColumns = self.columns()
+        station_ids, first, inverse = np.unique(columns.station_ids, return_index=True, return_inverse=True)
+        order: np.ndarray = np.argsort(inverse, kind="stable")
+        bounds: np.ndarray = np.concatenate(([0], np.cumsum(np.bincount(inverse, minlength=len(station_ids)))))
+        return {
+            str(station_ids[i]): self._take(order[bounds[i]:bounds[i + 1]], columns.is_sorted)
+            for i in np.argsort(first)
+        }
 
     def stream_raw(
-        self, read_filter: ReadFilter = ReadFilter()
+        self,
+        read_filter: ReadFilter = ReadFilter(),
+        prefetch: int = 0,
+        pool: Optional[multiprocessing.pool.Pool] = None,
+        reuse_buffers: bool = False,
+        skip_sensors: Optional[Set[str]] = None,
     ) -> Iterator[Union["RedvoxPacket", RedvoxPacketM]]:
         """
         Read, decompress, deserialize, and then stream RedVox data pointed to by this index.
 
         :param read_filter: Additional filtering to specify which data should be streamed.
+        :param prefetch: The number of reads to perform ahead of the consumer. Consecutive packets of the same
+                         container are read together, every other packet is a read of its own. Packets are still
+                         streamed in index order. 0 reads each packet when it is requested (default=0).
+        :param pool: An optional thread or process pool to read ahead with. If None and prefetch is positive, a
+                     thread pool is used.
+        :param reuse_buffers: When True, files are read into a buffer reused by each reading thread or worker instead
+                              of a new buffer per file (default=False).
+        :param skip_sensors: Optional names of the fields of RedvoxPacketM.Sensors to leave out of API 1000 packets.
+                             The skipped sensors are removed before the packets are parsed, so they are never decoded
+                             (default=None).
         :return: An iterator over RedvoxPacket and RedvoxPacketM instances.
         """
-        filtered: Iterator[IndexEntry] = filter(read_filter.apply, self.entries)
+        reads: Iterator[List[IndexEntry]] = _container_reads(self.filter(read_filter).entries)
+        read_fn: Callable[[List[IndexEntry]], List[Optional[Union["RedvoxPacket", RedvoxPacketM]]]] = (
+            _read_raw_run_buffered if reuse_buffers else _read_raw_run
+        )
+        if skip_sensors:
+            read_fn = partial(read_fn, skip_sensors=skip_sensors)
         # noinspection Mypy
-        return map(IndexEntry.read_raw, filtered)
+        return itertools.chain.from_iterable(prefetch_map(read_fn, reads, prefetch, pool))
 
     def stream(
-        self, read_filter: ReadFilter = ReadFilter()
+        self,
+        read_filter: ReadFilter = ReadFilter(),
+        prefetch: int = 0,
+        pool: Optional[multiprocessing.pool.Pool] = None,
     ) -> Iterator[Union["WrappedRedvoxPacket", WrappedRedvoxPacketM]]:
         """
         Read, decompress, deserialize, wrap, and then stream RedVox data pointed to by this index.
 
         :param read_filter: Additional filtering to specify which data should be streamed.
+        :param prefetch: The number of reads to perform ahead of the consumer. Consecutive packets of the same
+                         container are read together, every other packet is a read of its own. Packets are still
+                         streamed in index order. 0 reads each packet when it is requested (default=0).
+        :param pool: An optional thread or process pool to read ahead with. If None and prefetch is positive, a
+                     thread pool is used.
         :return: An iterator over WrappedRedvoxPacket and WrappedRedvoxPacketM instances.
         """
-        filtered: Iterator[IndexEntry] = filter(read_filter.apply, self.entries)
+        reads: Iterator[List[IndexEntry]] = _container_reads(self.filter(read_filter).entries)
         # noinspection Mypy
-        return map(IndexEntry.read, filtered)
+        return itertools.chain.from_iterable(prefetch_map(_read_run, reads, prefetch, pool))
 
     def read_raw(
         self, read_filter: ReadFilter = ReadFilter()
@@ -652,6 +1308,173 @@ class Index:
         return list(self.stream(read_filter))
 
 
+# Name of the sidecar file used to persist the index entries of a single data directory
+INDEX_CACHE_FILE_NAME: str = ".redvox_index_cache.json"
+# Version of the sidecar format; caches written with a different version are ignored
+INDEX_CACHE_VERSION: int = 1
+# Caches written less than this many nanoseconds after the directory was last modified are not trusted, since files
+# added within the same file system timestamp granularity would not change the directory's mtime
+INDEX_CACHE_RACY_NS: int = 2_000_000_000
+
+
+@dataclass
+class DirIndexCache:
+    """
+    A persistent cache of the index entries found in a single data directory.
+    The cache is stored as a sidecar file within the directory and is invalidated by the directory's mtime.
+    Entries that were parsed previously are reused when the directory changes, so only new files are parsed.
+    """
+
+    dir_path: str
+    mtime_ns: int
+    written_ns: int
+    entries: Dict[str, IndexEntry] = field(default_factory=lambda: {})
+    rejected: Set[str] = field(default_factory=lambda: set())
+
+    @staticmethod
+    def cache_path(dir_path: str) -> str:
+        """
+        :param dir_path: the data directory
+        :return: the path to the sidecar cache file of the data directory
+        """
+        return os.path.join(dir_path, INDEX_CACHE_FILE_NAME)
+
+    @staticmethod
+    def load(dir_path: str) -> Optional["DirIndexCache"]:
+        """
+        Loads the cache of a data directory.
+
+        :param dir_path: the data directory
+        :return: The cache, or None if it does not exist, can't be read, or was written for another directory.
+        """
+        try:
+            with open(DirIndexCache.cache_path(dir_path), "r") as cache_in:
+                cache_dict: Dict = json.load(cache_in)
+            if cache_dict["version"] != INDEX_CACHE_VERSION or cache_dict["dir_path"] != os.path.realpath(dir_path):
+                return None
+            entries: Dict[str, IndexEntry] = {
+                name: IndexEntry(full_path, station_id, dt_us(ts_us), ext, ApiVersion(api_version))
+                for name, full_path, station_id, ts_us, ext, api_version in cache_dict["entries"]
+            }
+            return DirIndexCache(cache_dict["dir_path"], cache_dict["mtime_ns"], cache_dict["written_ns"],
+                                 entries, set(cache_dict["rejected"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def is_fresh(self, mtime_ns: int) -> bool:
+        """
+        :param mtime_ns: the current mtime of the data directory in nanoseconds
+        :return: True if the cache can be used without looking at the contents of the data directory
+        """
+        return self.mtime_ns == mtime_ns and self.written_ns - self.mtime_ns >= INDEX_CACHE_RACY_NS
+
+    def write(self) -> bool:
+        """
+        Writes the cache into its data directory.  The sidecar file must already exist, so that writing it does not
+        modify the mtime of the directory.
+
+        :return: True if the cache was written, False otherwise
+        """
+        cache_dict: Dict = {
+            "version": INDEX_CACHE_VERSION,
+            "dir_path": self.dir_path,
+            "mtime_ns": self.mtime_ns,
+            "written_ns": self.written_ns,
+            "entries": [
+                [
+                    name,
+                    entry.full_path,
+                    entry.station_id,
+                    (entry.date_time - dt_us(0)) // timedelta(microseconds=1),
+                    entry.extension,
+                    entry.api_version.value,
+                ]
+                for name, entry in self.entries.items()
+            ],
+            "rejected": sorted(self.rejected),
+        }
+        try:
+            with open(DirIndexCache.cache_path(self.dir_path), "r+") as cache_out:
+                cache_out.truncate()
+                json.dump(cache_dict, cache_out)
+            return True
+        except OSError:
+            return False
+
+
+def _index_dir_cached(
+    base_dir: str,
+    pool: Optional[multiprocessing.pool.Pool] = None,
+) -> List[IndexEntry]:
+    """
+    Returns all the index entries of a directory, using and updating the directory's index cache.
+    When the cache is stale, only the files it does not know about are parsed.
+
+    :param base_dir: Directory containing the data files.
+    :param pool: Pool for multiprocessing
+    :return: All the valid index entries in the directory, unfiltered.
+    """
+    dir_path: str = os.path.realpath(base_dir)
+    cache: Optional[DirIndexCache] = DirIndexCache.load(dir_path)
+    if cache is not None and cache.is_fresh(os.stat(dir_path).st_mtime_ns):
+        return list(cache.entries.values()) + _read_containers(dir_path, cache.rejected)
+
+    # Create the sidecar before taking the mtime, since creating it modifies the directory.
+    try:
+        open(DirIndexCache.cache_path(dir_path), "a").close()
+    except OSError:
+        pass
+    mtime_ns: int = os.stat(dir_path).st_mtime_ns
+
+    if cache is None:
+        cache = DirIndexCache(dir_path, mtime_ns, 0)
+
+    with os.scandir(dir_path) as dir_entries:
+        names: List[str] = [e.name for e in dir_entries if not e.name.startswith(".") and e.is_file()]
+
+    new_names: List[str] = [n for n in names if n not in cache.entries and n not in cache.rejected]
+    new_entries: Iterator[Optional[IndexEntry]] = maybe_parallel_map(
+        pool,
+        IndexEntry.from_path,
+        iter([os.path.join(dir_path, n) for n in new_names]),
+        lambda: len(new_names) > 128,
+        chunk_size=64,
+    )
+
+    updated: DirIndexCache = DirIndexCache(
+        dir_path,
+        mtime_ns,
+        0,
+        {n: cache.entries[n] for n in names if n in cache.entries},
+        {n for n in names if n in cache.rejected},
+    )
+    for name, entry in zip(new_names, new_entries):
+        if entry is None:
+            updated.rejected.add(name)
+        else:
+            updated.entries[name] = entry
+
+    updated.written_ns = time.time_ns()
+    updated.write()
+    return list(updated.entries.values()) + _read_containers(dir_path, updated.rejected)
+
+
+def _read_containers(dir_path: str, names: Iterator[str]) -> List[IndexEntry]:
+    """
+    Packet containers are not parsed by IndexEntry.from_path and their tables are not cached, since they change
+    whenever packets are added to them.
+
+    :param dir_path: Directory containing the files.
+    :param names: Names of files within the directory.
+    :return: The entries of all the packet containers among the named files.
+    """
+    entries: List[IndexEntry] = []
+    for name in sorted(names):
+        if name.endswith(CONTAINER_EXTENSION):
+            entries.extend(read_container_entries(os.path.join(dir_path, name)))
+    return entries
+
+
 # The following constants are used for identifying valid RedVox API 900 and API 1000 structured directory layouts.
 __VALID_YEARS: Set[str] = {f"{i:04}" for i in range(2015, 2031)}
 __VALID_MONTHS: Set[str] = {f"{i:02}" for i in range(1, 13)}
@@ -667,10 +1490,148 @@ def _list_subdirs(base_dir: str, valid_choices: Set[str]) -> Iterator[str]:
     :param valid_choices: A list of valid directory names.
     :return: A list of valid subdirs.
     """
-    subdirs: Iterator[str] = map(
-        lambda p: PurePath(p).name, glob(os.path.join(base_dir, "*", ""))
-    )
-    return filter(valid_choices.__contains__, subdirs)
+    try:
+        with os.scandir(base_dir) as dir_entries:
+            subdirs: List[str] = [e.name for e in dir_entries if e.name in valid_choices and e.is_dir()]
+    except OSError:
+        return iter([])
+    return iter(subdirs)
+
+
+# Number of threads used to walk and index the directories of structured layouts
+STRUCTURED_WALK_THREADS: int = min(32, (os.cpu_count() or 1) + 4)
+
+
+def _dir_span(parts: List[int]) -> Tuple[datetime, datetime]:
+    """
+    :param parts: year and optionally month, day, and hour of a structured directory
+    :return: the span of time covered by the directory as (inclusive start, exclusive end)
+    """
+    if len(parts) == 1:
+        return datetime(parts[0], 1, 1), datetime(parts[0] + 1, 1, 1)
+    if len(parts) == 2:
+        year, month = parts
+        return datetime(year, month, 1), datetime(year + month // 12, month % 12 + 1, 1)
+    start: datetime = datetime(*parts)
+    return start, start + (timedelta(days=1) if len(parts) == 3 else timedelta(hours=1))
+
+
+def _structured_data_dirs(
+    base_dir: str,
+    read_filter: ReadFilter,
+    levels: List[Set[str]],
+    pool: Optional[multiprocessing.pool.Pool] = None,
+) -> List[str]:
+    """
+    Walks a structured directory layout one level at a time, skipping every subtree that is outside the filter's
+    window before listing it.  The directories of each level are listed concurrently.
+
+    :param base_dir: Base directory of the layout (api900 or api1000)
+    :param read_filter: Filter whose window (including buffers) selects the directories
+    :param levels: The valid directory names of each level, starting with years
+    :param pool: Thread pool used to list directories concurrently
+    :return: The paths of the data directories that may contain files accepted by the filter
+    """
+    dirs: List[Tuple[str, List[int]]] = [(base_dir, [])]
+    for valid_choices in levels:
+        listed: Iterator[List[str]] = (
+            map(lambda d: list(_list_subdirs(d[0], valid_choices)), dirs) if pool is None
+            else pool.imap(lambda d: list(_list_subdirs(d[0], valid_choices)), dirs)
+        )
+        next_dirs: List[Tuple[str, List[int]]] = []
+        for (path, parts), names in zip(dirs, listed):
+            for name in names:
+                try:
+                    span_start, span_end = _dir_span(parts + [int(name)])
+                except ValueError:
+                    # not a real date, i.e. 02/31
+                    continue
+                if read_filter.apply_span(span_start, span_end):
+                    next_dirs.append((os.path.join(path, name), parts + [int(name)]))
+        dirs = next_dirs
+    return [path for path, _ in dirs]
+
+
+def _index_structured_dirs(
+    base_dir: str,
+    read_filter: ReadFilter,
+    levels: List[Set[str]],
+    pool: multiprocessing.pool.Pool,
+    use_cache: bool,
+) -> Index:
+    """
+    Indexes the data directories of a structured layout that are within the filter's window using a thread pool.
+
+    :param base_dir: Base directory of the layout (api900 or api1000)
+    :param read_filter: Filter to filter files with
+    :param levels: The valid directory names of each level, starting with years
+    :param pool: Pool for multiprocessing
+    :param use_cache: When True, load and update the persistent index cache of each data directory.
+    :return: An unsorted Index of the files accepted by the filter
+    """
+    index: Index = Index()
+    with multiprocessing.pool.ThreadPool(STRUCTURED_WALK_THREADS) as walk_pool:
+        data_dirs: List[str] = _structured_data_dirs(base_dir, read_filter, levels, walk_pool)
+        dir_index: Index
+        for dir_index in walk_pool.imap(
+            lambda data_dir: index_unstructured_py(data_dir, read_filter, sort=False, pool=pool, use_cache=use_cache),
+            data_dirs,
+        ):
+            index.append(dir_index.entries)
+    return index
+
+
+def _structured_layout_dirs(base_dir: str) -> List[Tuple[str, List[Set[str]]]]:
+    """
+    :param base_dir: The base_dir may either end with api900, api1000, or be a parent directory to one or both of
+                     API 900 and API 1000.
+    :return: The base directory of each structured layout in base_dir and the valid directory names of its levels
+    """
+    levels: Dict[str, List[Set[str]]] = {
+        "api900": [__VALID_YEARS, __VALID_MONTHS, __VALID_DATES],
+        "api1000": [__VALID_YEARS, __VALID_MONTHS, __VALID_DATES, __VALID_HOURS],
+    }
+    name: str = PurePath(base_dir).name
+    if name in levels:
+        return [(base_dir, levels[name])]
+    return [(os.path.join(base_dir, subdir), levels[subdir]) for subdir in sorted(_list_subdirs(base_dir, set(levels)))]
+
+
+def _merge_container_entries(index: Index, data_dirs: List[str], read_filter: ReadFilter, sort: bool) -> Index:
+    """
+    The native indexers do not read packet containers.  Adds the packets of the containers in the data directories
+    that are accepted by the filter to an index made by a native indexer.
+
+    :param index: Index made by a native indexer.
+    :param data_dirs: Directories that may contain packet containers.
+    :param read_filter: Filter to apply to the packets of the containers.
+    :param sort: When True, the index is sorted after packets are added to it.
+    :return: The index with the packets of the containers.
+    """
+    container_paths: List[str] = [
+        path for data_dir in data_dirs for path in sorted(glob(os.path.join(data_dir, f"*{CONTAINER_EXTENSION}")))
+    ]
+    if len(container_paths) > 0:
+        containers: Index = Index(list(itertools.chain(*map(read_container_entries, container_paths))))
+        index.append(containers.filter(read_filter).entries)
+        if sort:
+            index.sort()
+    return index
+
+
+def _structured_container_dirs(base_dir: str, read_filter: ReadFilter) -> List[str]:
+    """
+    :param base_dir: The base_dir may either end with api900, api1000, or be a parent directory to one or both of
+                     API 900 and API 1000.
+    :param read_filter: Filter whose window (including buffers) selects the directories
+    :return: The data directories of the structured layouts in base_dir that are within the filter's window
+    """
+    with multiprocessing.pool.ThreadPool(STRUCTURED_WALK_THREADS) as walk_pool:
+        return [
+            data_dir
+            for layout_dir, levels in _structured_layout_dirs(base_dir)
+            for data_dir in _structured_data_dirs(layout_dir, read_filter, levels, walk_pool)
+        ]
 
 
 # These fields are set at runtime and provide the implementation (either native or pure python) for IO methods
@@ -734,6 +1695,7 @@ def index_unstructured_py(
     read_filter: ReadFilter = ReadFilter(),
     sort: bool = True,
     pool: Optional[multiprocessing.pool.Pool] = None,
+    use_cache: bool = False,
 ) -> Index:
     """
     Returns the list of file paths that match the given filter for unstructured data.
@@ -742,12 +1704,17 @@ def index_unstructured_py(
     :param read_filter: An (optional) ReadFilter for specifying station IDs and time windows.
     :param sort: When True, the resulting Index will be sorted before being returned (default=True).
     :param pool: Pool for multiprocessing
+    :param use_cache: When True, load and update the persistent index cache of base_dir (default=False).
     :return: An iterator of valid paths.
     """
     check_type(base_dir, [str])
     check_type(read_filter, [ReadFilter])
 
-    index: Index = Index()
+    if use_cache:
+        index: Index = Index(_index_dir_cached(base_dir, pool)).filter(read_filter)
+        if sort:
+            index.sort()
+        return index
 
     extensions: Set[str] = (
         read_filter.extensions if read_filter.extensions is not None else {""}
@@ -769,6 +1736,11 @@ def index_unstructured_py(
         chunk_size=64,
     )
 
+    container_paths: List[str] = glob(os.path.join(base_dir, f"*{CONTAINER_EXTENSION}"))
+    all_entries = itertools.chain(
+        all_entries, *map(read_container_entries, sorted(container_paths))
+    )
+
     # if len(all_paths) > 128:
     #     _pool: multiprocessing.pool.Pool = (
     #         multiprocessing.Pool() if pool is None else pool
@@ -779,11 +1751,7 @@ def index_unstructured_py(
     # else:
     #     all_entries = map(IndexEntry.from_path, all_paths)
 
-    entries: Iterator[IndexEntry] = filter(
-        read_filter.apply, filter(_not_none, all_entries)
-    )
-
-    index.append(entries)
+    index = Index(list(filter(_not_none, all_entries))).filter(read_filter)
 
     if sort:
         index.sort()
@@ -796,6 +1764,7 @@ def index_structured_api_900_py(
     read_filter: ReadFilter = ReadFilter(),
     sort: bool = True,
     pool: Optional[multiprocessing.pool.Pool] = None,
+    use_cache: bool = False,
 ) -> Index:
     """
     This parses a structured API 900 directory structure and identifies files that match the provided filter.
@@ -804,34 +1773,13 @@ def index_structured_api_900_py(
     :param read_filter: Filter to filter files with
     :param sort: When True, the resulting Index will be sorted before being returned (default=True).
     :param pool: Pool for multiprocessing
+    :param use_cache: When True, load and update the persistent index cache of each day directory (default=False).
     :return: A list of wrapped packets on an empty list if none match the filter or none are found
     """
-    index: Index = Index()
-
-    _pool: multiprocessing.pool.Pool = multiprocessing.Pool() if pool is None else pool
-
-    for year in _list_subdirs(base_dir, __VALID_YEARS):
-        for month in _list_subdirs(os.path.join(base_dir, year), __VALID_MONTHS):
-            for day in _list_subdirs(
-                os.path.join(base_dir, year, month), __VALID_DATES
-            ):
-                # Before scanning for *.rdvxz files, let's see if the current year, month, day, are in the
-                # filter's range. If not, we can short circuit and skip getting the *.rdvxz files.
-                if not read_filter.apply_dt(
-                    datetime(int(year), int(month), int(day)), dt_fn=truncate_dt_ymd
-                ):
-                    continue
-
-                data_dir: str = os.path.join(base_dir, year, month, day)
-                entries: Iterator[IndexEntry] = iter(
-                    index_unstructured_py(
-                        data_dir, read_filter, sort=False, pool=_pool
-                    ).entries
-                )
-                index.append(entries)
-
-    if pool is None:
-        _pool.close()
+    # Year, month, and day directories outside the filter's range are skipped without being listed.
+    index: Index = _index_structured_dirs(
+        base_dir, read_filter, [__VALID_YEARS, __VALID_MONTHS, __VALID_DATES], pool, use_cache
+    )
 
     if sort:
         index.sort()
@@ -843,6 +1791,7 @@ def index_structured_api_1000_py(
     read_filter: ReadFilter = ReadFilter(),
     sort: bool = True,
     pool: Optional[multiprocessing.pool.Pool] = None,
+    use_cache: bool = False,
 ) -> Index:
     """
     This parses a structured API M directory structure and identifies files that match the provided filter.
@@ -851,38 +1800,13 @@ def index_structured_api_1000_py(
     :param read_filter: Filter to filter files with
     :param sort: When True, the resulting Index will be sorted before being returned (default=True).
     :param pool: Pool for multiprocessing
+    :param use_cache: When True, load and update the persistent index cache of each hour directory (default=False).
     :return: A list of wrapped packets on an empty list if none match the filter or none are found
     """
-    index: Index = Index()
-
-    _pool: multiprocessing.pool.Pool = multiprocessing.Pool() if pool is None else pool
-
-    for year in _list_subdirs(base_dir, __VALID_YEARS):
-        for month in _list_subdirs(os.path.join(base_dir, year), __VALID_MONTHS):
-            for day in _list_subdirs(
-                os.path.join(base_dir, year, month), __VALID_DATES
-            ):
-                for hour in _list_subdirs(
-                    os.path.join(base_dir, year, month, day), __VALID_HOURS
-                ):
-                    # Before scanning for *.rdvxm files, let's see if the current year, month, day, hour are in the
-                    # filter's range. If not, we can short circuit and skip getting the *.rdvxm files.
-                    if not read_filter.apply_dt(
-                        datetime(int(year), int(month), int(day), int(hour)),
-                        dt_fn=truncate_dt_ymdh,
-                    ):
-                        continue
-
-                    data_dir: str = os.path.join(base_dir, year, month, day, hour)
-                    entries: Iterator[IndexEntry] = iter(
-                        index_unstructured_py(
-                            data_dir, read_filter, sort=False, pool=_pool
-                        ).entries
-                    )
-                    index.append(entries)
-
-    if pool is None:
-        _pool.close()
+    # Year, month, day, and hour directories outside the filter's range are skipped without being listed.
+    index: Index = _index_structured_dirs(
+        base_dir, read_filter, [__VALID_YEARS, __VALID_MONTHS, __VALID_DATES, __VALID_HOURS], pool, use_cache
+    )
 
     if sort:
         index.sort()
@@ -893,6 +1817,7 @@ def index_structured_py(
     base_dir: str,
     read_filter: ReadFilter = ReadFilter(),
     pool: Optional[multiprocessing.pool.Pool] = None,
+    use_cache: bool = False,
 ) -> Index:
     """
     Indexes both API 900 and API 1000 structured directory layouts.
@@ -901,18 +1826,17 @@ def index_structured_py(
                      API 900 and API 1000.
     :param read_filter: Filter to further filter results.
     :param pool: Pool for multiprocessing
+    :param use_cache: When True, load and update the persistent index cache of each data directory (default=False).
     :return: An Index of RedVox files.
     """
     base_path: PurePath = PurePath(base_dir)
 
-    _pool: multiprocessing.pool.Pool = multiprocessing.Pool() if pool is None else pool
-
     # API 900
     if base_path.name == "api900":
-        return index_structured_api_900_py(base_dir, read_filter, pool=_pool)
+        return index_structured_api_900_py(base_dir, read_filter, pool=pool, use_cache=use_cache)
     # API 1000
     elif base_path.name == "api1000":
-        return index_structured_api_1000_py(base_dir, read_filter, pool=_pool)
+        return index_structured_api_1000_py(base_dir, read_filter, pool=pool, use_cache=use_cache)
     # Maybe parent to one or both?
     else:
         index: Index = Index()
@@ -924,7 +1848,8 @@ def index_structured_py(
                         str(base_path.joinpath("api900")),
                         read_filter,
                         sort=False,
-                        pool=_pool,
+                        pool=pool,
+                        use_cache=use_cache,
                     ).entries
                 )
             )
@@ -936,14 +1861,12 @@ def index_structured_py(
                         str(base_path.joinpath("api1000")),
                         read_filter,
                         sort=False,
-                        pool=_pool,
+                        pool=pool,
+                        use_cache=use_cache,
                     ).entries
                 )
             )
 
-        if pool is None:
-            _pool.close()
-
         index.sort()
         return index
 
@@ -1068,6 +1991,7 @@ def index_unstructured(
     read_filter: ReadFilter = ReadFilter(),
     sort: bool = True,
     pool: Optional[multiprocessing.pool.Pool] = None,
+    use_cache: bool = False,
 ) -> Index:
     """
     Returns the list of file paths that match the given filter for unstructured data.
@@ -1076,9 +2000,15 @@ def index_unstructured(
     :param read_filter: An (optional) ReadFilter for specifying station IDs and time windows.
     :param sort: When True, the resulting Index will be sorted before being returned (default=True).
     :param pool: Pool for multiprocessing
+    :param use_cache: When True, load and update the persistent index cache stored in base_dir.  The cache is
+                      maintained by the pure Python implementation (default=False).
     :return: An iterator of valid paths.
     """
-    return __INDEX_UNSTRUCTURED_FN(base_dir, read_filter, sort, pool)
+    if use_cache or __INDEX_UNSTRUCTURED_FN is index_unstructured_py:
+        return index_unstructured_py(base_dir, read_filter, sort, pool, use_cache=use_cache)
+    return _merge_container_entries(
+        __INDEX_UNSTRUCTURED_FN(base_dir, read_filter, sort, pool), [base_dir], read_filter, sort
+    )
 
 
 def index_structured_api_900(
@@ -1086,6 +2016,7 @@ def index_structured_api_900(
     read_filter: ReadFilter = ReadFilter(),
     sort: bool = True,
     pool: Optional[multiprocessing.pool.Pool] = None,
+    use_cache: bool = False,
 ) -> Index:
     """
     This parses a structured API 900 directory structure and identifies files that match the provided filter.
@@ -1094,9 +2025,18 @@ def index_structured_api_900(
     :param read_filter: Filter to filter files with
     :param sort: When True, the resulting Index will be sorted before being returned (default=True).
     :param pool: Pool for multiprocessing
+    :param use_cache: When True, load and update the persistent index cache of each day directory.  The cache is
+                      maintained by the pure Python implementation (default=False).
     :return: A list of wrapped packets on an empty list if none match the filter or none are found
     """
-    return __INDEX_STRUCTURED_900_FN(base_dir, read_filter, sort, pool)
+    if use_cache or __INDEX_STRUCTURED_900_FN is index_structured_api_900_py:
+        return index_structured_api_900_py(base_dir, read_filter, sort, pool, use_cache=use_cache)
+    return _merge_container_entries(
+        __INDEX_STRUCTURED_900_FN(base_dir, read_filter, sort, pool),
+        _structured_container_dirs(base_dir, read_filter),
+        read_filter,
+        sort,
+    )
 
 
 def index_structured_api_1000(
@@ -1104,6 +2044,7 @@ def index_structured_api_1000(
     read_filter: ReadFilter = ReadFilter(),
     sort: bool = True,
     pool: Optional[multiprocessing.pool.Pool] = None,
+    use_cache: bool = False,
 ) -> Index:
     """
     This parses a structured API M directory structure and identifies files that match the provided filter.
@@ -1112,15 +2053,25 @@ def index_structured_api_1000(
     :param read_filter: Filter to filter files with
     :param sort: When True, the resulting Index will be sorted before being returned (default=True).
     :param pool: Pool for multiprocessing
+    :param use_cache: When True, load and update the persistent index cache of each hour directory.  The cache is
+                      maintained by the pure Python implementation (default=False).
     :return: A list of wrapped packets on an empty list if none match the filter or none are found
     """
-    return __INDEX_STRUCTURED_1000_FN(base_dir, read_filter, sort, pool)
+    if use_cache or __INDEX_STRUCTURED_1000_FN is index_structured_api_1000_py:
+        return index_structured_api_1000_py(base_dir, read_filter, sort, pool, use_cache=use_cache)
+    return _merge_container_entries(
+        __INDEX_STRUCTURED_1000_FN(base_dir, read_filter, sort, pool),
+        _structured_container_dirs(base_dir, read_filter),
+        read_filter,
+        sort,
+    )
 
 
 def index_structured(
     base_dir: str,
     read_filter: ReadFilter = ReadFilter(),
     pool: Optional[multiprocessing.pool.Pool] = None,
+    use_cache: bool = False,
 ) -> Index:
     """
     Indexes both API 900 and API 1000 structured directory layouts.
@@ -1129,9 +2080,18 @@ def index_structured(
                      API 900 and API 1000.
     :param read_filter: Filter to further filter results.
     :param pool: Pool for multiprocessing
+    :param use_cache: When True, load and update the persistent index cache of each data directory.  The cache is
+                      maintained by the pure Python implementation (default=False).
     :return: An Index of RedVox files.
     """
-    return __INDEX_STRUCTURED_FN(base_dir, read_filter, pool)
+    if use_cache or __INDEX_STRUCTURED_FN is index_structured_py:
+        return index_structured_py(base_dir, read_filter, pool, use_cache=use_cache)
+    return _merge_container_entries(
+        __INDEX_STRUCTURED_FN(base_dir, read_filter, pool),
+        _structured_container_dirs(base_dir, read_filter),
+        read_filter,
+        True,
+    )
 
 
 def sort_unstructured_redvox_data(
@@ -1139,6 +2099,7 @@ def sort_unstructured_redvox_data(
     output_dir: Optional[str] = None,
     read_filter: ReadFilter = ReadFilter(),
     copy: bool = True,
+    containers: bool = False,
 ) -> bool:
     """
     takes all redvox files in input_dir and sorts them into appropriate sub-directories
@@ -1148,6 +2109,9 @@ def sort_unstructured_redvox_data(
     :param read_filter: optional ReadFilter to limit which files to sort, default empty filter (sort everything)
     :param copy: optional value that when set ensures the file contents are copied into the new structure. When this
                  is set to False, the files will instead by moved.
+    :param containers: optional value that when set packs the compressed packets of each station into one packet
+                       container per sub-directory (hour for API 1000, day for API 900) instead of copying or moving
+                       the files.  Packets are merged into containers that already exist.  Default False.
 
     :return: True if success, False if failure
     """
@@ -1185,6 +2149,7 @@ def sort_unstructured_redvox_data(
         )
         return False
 
+    container_entries: Dict[Tuple[str, str], List[IndexEntry]] = defaultdict(list)
     for value in index.entries:
         api_version = value.api_version
         if api_version == ApiVersion.API_1000:
@@ -1213,11 +2178,25 @@ def sort_unstructured_redvox_data(
             return False
         os.makedirs(file_out_dir, exist_ok=True)
 
-        if copy:
+        if containers and value.extension in __CONTAINER_EXTENSIONS.values():
+            container_entries[(file_out_dir, value.station_id)].append(value)
+        elif copy:
             copy2(value.full_path, file_out_dir)
         else:
             move(value.full_path, file_out_dir)
 
+    for (file_out_dir, station_id), entries in container_entries.items():
+        dir_start: datetime = entries[0].date_time.replace(minute=0, second=0, microsecond=0)
+        if entries[0].api_version == ApiVersion.API_900:
+            dir_start = dir_start.replace(hour=0)
+        write_container(
+            os.path.join(file_out_dir, f"{station_id}_{round(us_dt(dir_start))}{CONTAINER_EXTENSION}"),
+            entries,
+        )
+        if not copy:
+            for entry in entries:
+                os.remove(entry.full_path)
+
     return True
 
 
@@ -1285,6 +2264,50 @@ def deserialize_data_window(path: str) -> "DataWindow":
         return pickle.load(compressed_in)
 
 
+def serialize_station(
+        station: "Station",
+        base_dir: str = ".",
+        file_name: Optional[str] = None,
+        compression_factor: int = 4,
+) -> Path:
+    """
+    Serializes and compresses a Station to a file.
+
+    :param station: The station to serialize and compress.
+    :param base_dir: The base directory to write the serialized file to (default=.).
+    :param file_name: The optional file name. If None, a default filename with the following format is used:
+                      [station_id]_[first_data_timestamp].pkl.lz4
+    :param compression_factor: A value between 1 and 12. Higher values provide better compression, but take longer.
+                               (default=4).
+    :return: The path to the written file.
+    """
+    _file_name: str = (
+        file_name
+        if file_name is not None
+        else f"{station.id}_{int(station.first_data_timestamp)}.pkl.lz4"
+    )
+
+    file_path: Path = Path(base_dir).joinpath(_file_name)
+
+    with lz4.frame.open(
+            file_path, "wb", compression_level=compression_factor
+    ) as compressed_out:
+        pickle.dump(station, compressed_out)
+        compressed_out.flush()
+        return file_path.resolve(False)
+
+
+def deserialize_station(path: str) -> "Station":
+    """
+    Decompresses and deserializes a Station written to disk.
+
+    :param path: Path to the serialized and compressed station.
+    :return: An instance of a Station.
+    """
+    with lz4.frame.open(path, "rb") as compressed_in:
+        return pickle.load(compressed_in)
+
+
 def json_file_to_data_window(base_dir: str, file_name: str) -> Dict:
     """
     load a data window from json written to disk
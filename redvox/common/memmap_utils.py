@@ -0,0 +1,77 @@
+"""
+Module that contains utilities for keeping large arrays in memory-mapped .npy files instead of in memory.
+"""
+
+import os
+import tempfile
+from typing import List, Optional
+
+import numpy as np
+
+
+def new_memmap(length: int, dtype: np.dtype, directory: Optional[str] = None) -> np.memmap:
+    """
+    creates a writable memory-mapped array backed by a new .npy file in directory.  where the platform allows it, the
+    file is removed as soon as it is mapped, so its space is released when the last array using it is released.
+    otherwise the file is left in the directory.
+
+    :param length: number of values in the array
+    :param dtype: type of the values in the array
+    :param directory: directory to create the file in, default None (the system's temporary directory)
+    :return: an uninitialized memory-mapped array
+    """
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=".npy", prefix="redvox_", dir=directory)
+    os.close(fd)
+    values = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(length,))
+    try:
+        os.remove(path)
+    except OSError:
+        # windows cannot remove a file while it is mapped
+        pass
+    return values
+
+
+def memmap_directory(values: np.ndarray) -> Optional[str]:
+    """
+    :param values: array to check
+    :return: the directory of the file backing values if it is memory-mapped, None otherwise
+    """
+    filename = getattr(values, "filename", None) if isinstance(values, np.memmap) else None
+    return None if filename is None else os.path.dirname(filename)
+
+
+def spill_array(values: np.ndarray, directory: Optional[str] = None) -> np.ndarray:
+    """
+    copies values into a memory-mapped array.  arrays that are already memory-mapped and arrays of python objects,
+    which cannot be memory-mapped, are returned as they are.
+
+    :param values: array to copy
+    :param directory: directory to create the file in, default None (the system's temporary directory)
+    :return: memory-mapped copy of values
+    """
+    if values.dtype.hasobject or memmap_directory(values) is not None:
+        return values
+    result = new_memmap(len(values), values.dtype, directory)
+    result[:] = values
+    return result
+
+
+def concatenate(arrays: List[np.ndarray]) -> np.ndarray:
+    """
+    joins one dimensional arrays.  if any of the arrays is memory-mapped, the result is written to a new
+    memory-mapped array in the same directory instead of being created in memory.
+
+    :param arrays: arrays to join
+    :return: the joined array
+    """
+    directory = next((d for d in map(memmap_directory, arrays) if d is not None), None)
+    if directory is None:
+        return np.concatenate(arrays)
+    dtype = np.result_type(*arrays)
+    if dtype.hasobject:
+        return np.concatenate(arrays)
+    result = new_memmap(sum(len(a) for a in arrays), dtype, directory)
+    np.concatenate(arrays, out=result)
+    return result
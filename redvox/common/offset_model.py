@@ -1,5 +1,8 @@
+import bisect
 from datetime import timedelta, datetime
-from typing import Tuple, Optional, List, TYPE_CHECKING
+from functools import partial
+from multiprocessing.pool import Pool
+from typing import Dict, Tuple, Optional, List, TYPE_CHECKING
 
 import numpy as np
 import pandas as pd
@@ -9,6 +12,7 @@ if TYPE_CHECKING:
     from redvox.common.file_statistics import StationStat
 
 import redvox.common.date_time_utils as dt_utils
+from redvox.common.parallel_utils import maybe_parallel_map
 
 from sklearn.linear_model import LinearRegression
 
@@ -19,6 +23,7 @@ MIN_SAMPLES = 3  # minimum number of samples per 5 minutes for reliable data
 MIN_TIMESYNC_DURATION_MIN = (
     5  # minimum number of minutes of data required to produce reliable results
 )
+TIMESTAMP_BLOCK_SIZE = 2**16  # number of timestamps updated at a time by OffsetModel.update_timestamps_in_place
 
 
 class OffsetModel:
@@ -27,7 +32,8 @@ class OffsetModel:
     Computes and returns the slope and intercept for the offset function (offset = slope * time + intercept)
     Invalidates latencies that are below our recognition threshold MIN_VALID_LATENCY_MICROS
     The data is binned by k_bins in equally spaced times; in each bin the n_samples best latencies are taken to get
-    the weighted linear regression.
+    the weighted linear regression.  With fixed_bins, the data is binned into the 5 minute bins of get_5min_bin_times
+    instead, the same bins IncrementalOffsetModel uses.
     Properties:
         start_time: float, start timestamp of model in microseconds since epoch UTC
         end_time: float, end timestamp of model in microseconds since epoch UTC
@@ -50,6 +56,8 @@ class OffsetModel:
             end_time: float,
             n_samples: int = DEFAULT_SAMPLES,
             debug: bool = False,
+            binned_indices: Optional[np.ndarray] = None,
+            fixed_bins: bool = False,
     ):
         """
         Create an OffsetModel
@@ -60,27 +68,35 @@ class OffsetModel:
         :param end_time: model's end timestamp in microseconds since epoch utc
         :param n_samples: number of samples per bin, default 3
         :param debug: boolean for additional output when running OffsetModel, default False
+        :param binned_indices: optional indices of the data to use in each bin, as returned by get_binned_indices with
+                                the model's bins.  If None, the data is binned by the model.  Default None
+        :param fixed_bins: if True, bin the data into 5 minute bins starting at start_time (see get_5min_bin_times)
+                            instead of k_bins equally spaced bins.  Default False
         """
         self.start_time = start_time
         self.end_time = end_time
         self.k_bins = get_bins_per_5min(start_time, end_time)
+        if fixed_bins:
+            bin_times = get_5min_bin_times(start_time, end_time)
+            self.k_bins = len(bin_times) - 1
+        else:
+            # Get the index for the separations (add +1 to k_bins so that there would be k_bins bins)
+            bin_times = np.linspace(start_time, end_time, self.k_bins + 1)
         self.n_samples = n_samples
         self.debug = debug
         latencies = np.where(latencies < MIN_VALID_LATENCY_MICROS, np.nan, latencies)
         use_model = timesync_quality_check(latencies, start_time, end_time, self.debug)
         if use_model:
-            # Organize the data into a data frame
-            full_df = pd.DataFrame(data=times, columns=["times"])
-            full_df["latencies"] = latencies
-            full_df["offsets"] = offsets
-
-            # Get the index for the separations (add +1 to k_bins so that there would be k_bins bins)
-            bin_times = np.linspace(start_time, end_time, self.k_bins + 1)
+            if binned_indices is None:
+                binned_indices = get_binned_indices(times, latencies, bin_times, n_samples)
 
             # Make the dataframe with the data with n_samples per bins
-            binned_df = get_binned_df(
-                full_df=full_df, bin_times=bin_times, n_samples=n_samples
-            )
+            times = np.asarray(times)
+            offsets = np.asarray(offsets)
+            binned_df = pd.DataFrame(
+                {"times": times[binned_indices], "latencies": latencies[binned_indices],
+                 "offsets": offsets[binned_indices]}, index=binned_indices
+            ).sort_values(by=["times"])
 
             # Compute the weighted linear regression
             self.slope, zero_intercept, self.score = offset_weighted_linear_regression(
@@ -141,16 +157,244 @@ class OffsetModel:
         """
         return new_time + (self.get_offset_at_new_time(new_time) if use_model_function else self.intercept)
 
-    def update_timestamps(self, timestamps: np.array, use_model_function: bool = True) -> np.array:
+    def update_timestamps(self, timestamps: np.ndarray, use_model_function: bool = True) -> np.ndarray:
         """
-        updates a list of timestamps
+        updates an array of timestamps.  each value is computed the same way as update_time computes it
+
         :param timestamps: timestamps to update
         :param use_model_function: if True, use the slope of the model if it's not 0.  default True
-        :return: updated list of timestamps
+        :return: new array of updated timestamps
+        """
+        timestamps = np.asarray(timestamps, dtype=float)
+        if use_model_function and self.slope != 0.0:
+            return timestamps + (self.slope * (timestamps - self.start_time) + self.intercept)
+        return timestamps + self.intercept
+
+    def update_timestamps_in_place(self, timestamps: np.ndarray, use_model_function: bool = True) -> np.ndarray:
+        """
+        updates an array of float timestamps in place, with the same results as update_timestamps.
+        the array is updated in blocks of TIMESTAMP_BLOCK_SIZE values, so large (or memory-mapped) arrays never need
+        a temporary array of their full length
+
+        :param timestamps: writable array of float timestamps to update
+        :param use_model_function: if True, use the slope of the model if it's not 0.  default True
+        :return: the updated timestamps
         """
         if use_model_function and self.slope != 0.0:
-            return [self.update_time(t) for t in timestamps]
-        return [t + self.intercept for t in timestamps]
+            for i in range(0, len(timestamps), TIMESTAMP_BLOCK_SIZE):
+                block = timestamps[i:i + TIMESTAMP_BLOCK_SIZE]
+                block += self.slope * (block - self.start_time) + self.intercept
+        else:
+            timestamps += self.intercept
+        return timestamps
+
+
+class IncrementalOffsetModel:
+    """
+    Offset model that is updated as timesync data is received instead of being fit again from all of the data.
+    The data is binned into 5 minute bins starting at start_time (see get_5min_bin_times), so the bins do not change
+    as end_time grows.  The n_samples best latencies of each bin are kept in per-bin reservoirs that new data is merged
+    into, and the sums the weighted linear regression needs are kept for each reservoir, so each update only touches
+    the new data and the bins it changes.  The model is the same as an OffsetModel fit to all the data added so far
+    with fixed_bins=True, up to floating point rounding.
+    Properties:
+        start_time: float, start timestamp of model in microseconds since epoch UTC
+        end_time: float, end timestamp of model in microseconds since epoch UTC
+        n_samples: int, the number of samples per data bin; default is 3
+        debug: boolean, if True, output additional information when fitting the model, default False
+    """
+
+    def __init__(self, start_time: float, n_samples: int = DEFAULT_SAMPLES, debug: bool = False):
+        """
+        Create an IncrementalOffsetModel without data
+        :param start_time: model's start timestamp in microseconds since epoch utc
+        :param n_samples: number of samples per bin, default 3
+        :param debug: boolean for additional output when fitting the model, default False
+        """
+        self.start_time: float = start_time
+        self.end_time: float = start_time
+        self.n_samples: int = n_samples
+        self.debug: bool = debug
+        self._size: int = 0
+        # the reservoirs hold (latency, index, time - start_time, offset - _offset_origin) of the best latencies;
+        # times and offsets are kept relative to a point in the data so the sums do not lose precision
+        self._offset_origin: Optional[float] = None
+        self._reservoirs: Dict[int, List[Tuple[float, int, float, float]]] = {}
+        self._bin_sums: Dict[int, np.ndarray] = {}
+        self._bin_weight_ranges: Dict[int, Tuple[float, float]] = {}
+        self._sums: np.ndarray = np.zeros(_NUM_REGRESSION_SUMS)
+        # smallest and largest weight in the reservoirs, None if it has to be found again
+        self._weight_range: Optional[Tuple[float, float]] = (np.inf, -np.inf)
+        # valid latencies of all the data, used when the data fails the quality check
+        self._num_valid: int = 0
+        self._latency_sums: Tuple[float, float] = (0.0, 0.0)
+        self._has_invalid: bool = False
+        self._best_latency: Tuple[float, float] = (np.inf, 0.0)
+        self._model: Optional[OffsetModel] = None
+
+    def __len__(self) -> int:
+        """
+        :return: the number of data points added to the model
+        """
+        return self._size
+
+    def add(
+            self, latencies: np.ndarray, offsets: np.ndarray, times: np.ndarray, end_time: float
+    ) -> "IncrementalOffsetModel":
+        """
+        adds data to the model
+        :param latencies: new latencies
+        :param offsets: offsets that correspond to the new latencies
+        :param times: timestamps that correspond to the new latencies
+        :param end_time: new end timestamp of the model in microseconds since epoch utc, usually the end of the newest
+                            data.  must be after start_time
+        :return: the updated model
+        """
+        if end_time <= self.start_time:
+            raise ValueError(f"end_time {end_time} of the offset model must be after its start_time {self.start_time}")
+        latencies = np.asarray(latencies, dtype=float)
+        latencies = np.where(latencies < MIN_VALID_LATENCY_MICROS, np.nan, latencies)
+        offsets = np.asarray(offsets, dtype=float)
+        times = np.asarray(times, dtype=float)
+        first = self._size
+        self._size += len(latencies)
+        self.end_time = end_time
+        self._model = None
+        valid = ~np.isnan(latencies)
+        if not np.all(valid):
+            self._has_invalid = True
+        if not np.any(valid):
+            return self
+        self._num_valid += int(np.count_nonzero(valid))
+        self._latency_sums = (self._latency_sums[0] + np.sum(latencies[valid]),
+                              self._latency_sums[1] + np.sum(latencies[valid] ** 2))
+        best = int(np.nanargmin(latencies))
+        if latencies[best] < self._best_latency[0]:
+            self._best_latency = (latencies[best], offsets[best])
+        if self._offset_origin is None:
+            self._offset_origin = offsets[best]
+        self._add_to_reservoirs(latencies, offsets, times, first)
+        return self
+
+    def _add_to_reservoirs(self, latencies: np.ndarray, offsets: np.ndarray, times: np.ndarray, first: int):
+        """
+        merges new data into the reservoirs of the bins and updates the sums of the bins that changed
+        :param latencies: new latencies, invalid latencies are nan
+        :param offsets: offsets that correspond to the new latencies
+        :param times: timestamps that correspond to the new latencies
+        :param first: index of the first new data point
+        """
+        # the bins are fixed, so data after end_time is kept in case end_time grows past it
+        bin_times = get_5min_bin_times(self.start_time, max(self.end_time, np.nanmax(times)))
+        bins = np.searchsorted(bin_times, times, side="left") - 1
+        changed = set()
+        for i in np.flatnonzero((bins >= 0) & (bins < len(bin_times) - 1) & ~np.isnan(latencies)):
+            if times[i] < bin_times[bins[i] + 1]:
+                reservoir = self._reservoirs.setdefault(int(bins[i]), [])
+                entry = (latencies[i], first + int(i), times[i] - self.start_time, offsets[i] - self._offset_origin)
+                if len(reservoir) < self.n_samples or entry < reservoir[-1]:
+                    bisect.insort(reservoir, entry)
+                    del reservoir[self.n_samples:]
+                    changed.add(int(bins[i]))
+        for b in changed:
+            sums, weight_range = _regression_sums(self._reservoirs[b])
+            if b in self._bin_sums:
+                self._sums -= self._bin_sums[b]
+                old_range = self._bin_weight_ranges[b]
+                if self._weight_range is not None and (
+                        (old_range[0] == self._weight_range[0] and weight_range[0] > old_range[0])
+                        or (old_range[1] == self._weight_range[1] and weight_range[1] < old_range[1])):
+                    # the bin held the smallest or largest weight and lost it
+                    self._weight_range = None
+            self._sums += sums
+            self._bin_sums[b] = sums
+            self._bin_weight_ranges[b] = weight_range
+            if self._weight_range is not None:
+                self._weight_range = (min(self._weight_range[0], weight_range[0]),
+                                      max(self._weight_range[1], weight_range[1]))
+
+    def model(self) -> OffsetModel:
+        """
+        :return: the OffsetModel of all the data added so far
+        """
+        if self._size < 1:
+            raise ValueError("cannot fit an offset model without data; add data to the model first")
+        if self._model is None:
+            self._model = self._fit()
+        return self._model
+
+    def _fit(self) -> OffsetModel:
+        """
+        :return: the OffsetModel of the reservoirs of the bins up to end_time
+        """
+        num_bins = len(get_5min_bin_times(self.start_time, self.end_time)) - 1
+        result = OffsetModel.empty_model()
+        result.start_time = self.start_time
+        result.end_time = self.end_time
+        result.k_bins = num_bins
+        result.n_samples = self.n_samples
+        result.debug = self.debug
+        use_model = _passes_quality_check(self._num_valid, self.start_time, self.end_time, self.debug)
+        if use_model:
+            sums = self._sums
+            later_bins = [b for b in self._bin_sums if b >= num_bins]
+            if later_bins:
+                # data after end_time is not in the model yet
+                sums = sums - np.sum([self._bin_sums[b] for b in later_bins], axis=0)
+                weight_range = _combine_weight_ranges(
+                    [r for b, r in self._bin_weight_ranges.items() if b < num_bins])
+            else:
+                if self._weight_range is None:
+                    self._weight_range = _combine_weight_ranges(list(self._bin_weight_ranges.values()))
+                weight_range = self._weight_range
+            if sums[0] > 0:
+                (result.slope, result.intercept, result.score, result.mean_latency,
+                 result.std_dev_latency) = _weighted_linear_regression_from_sums(
+                    sums, weight_range[0], self.start_time, self._offset_origin)
+            use_model = sums[0] > 0 and result.slope != 0.0
+        if not use_model:
+            result.score = 0.0
+            result.slope = 0.0
+            if self._num_valid < 1:
+                result.intercept = 0.0
+                result.mean_latency = 0.0
+                result.std_dev_latency = 0.0
+            else:
+                result.intercept = self._best_latency[1]
+                # the batch model takes the mean and standard deviation of all latencies, which are nan if any is
+                mean = self._latency_sums[0] / self._num_valid
+                result.mean_latency = np.nan if self._has_invalid else mean
+                result.std_dev_latency = np.nan if self._has_invalid else np.sqrt(
+                    max(self._latency_sums[1] / self._num_valid - mean ** 2, 0.0))
+        return result
+
+
+def _fit_offset_model(model_input: Tuple[np.ndarray, np.ndarray, np.ndarray, float, float],
+                      n_samples: int) -> OffsetModel:
+    """
+    :param model_input: latencies, offsets, times, start time and end time of the model
+    :param n_samples: number of samples per bin
+    :return: the OffsetModel of the input
+    """
+    return OffsetModel(*model_input, n_samples=n_samples)
+
+
+def fit_offset_models(
+        model_inputs: List[Tuple[np.ndarray, np.ndarray, np.ndarray, float, float]],
+        n_samples: int = DEFAULT_SAMPLES,
+        pool: Optional[Pool] = None,
+) -> List[OffsetModel]:
+    """
+    Fits an OffsetModel for each set of inputs, such as one per station.  The models are fit in parallel when
+    parallelism is enabled and there is more than one model to fit.
+    :param model_inputs: the latencies, offsets, times, start time and end time of each model
+    :param n_samples: number of samples per bin, default 3
+    :param pool: optional pool to fit the models with.  If None, the SDK's shared pool is used when the models are
+                    fit in parallel.  Default None
+    :return: the OffsetModel of each set of inputs, in the same order as model_inputs
+    """
+    return list(maybe_parallel_map(pool, partial(_fit_offset_model, n_samples=n_samples), iter(model_inputs),
+                                   lambda: len(model_inputs) > 1, chunk_size=1))
 
 
 # Method to get number of bins
@@ -167,6 +411,74 @@ def get_bins_per_5min(start_time: float, end_time: float) -> int:
     return int((end_time - start_time) / (1e6 * 300) + 1)
 
 
+def get_5min_bin_times(start_time: float, end_time: float) -> np.ndarray:
+    """
+    Returns the edges of 5 minute bins starting at start_time that cover start_time to end_time.  Unlike the bins of
+    OffsetModel, the edges do not move as end_time changes; only the number of bins does.
+    :param start_time: the time of the first edge
+    :param end_time: the time the bins must reach; the last edge is at or after it
+    :return: array of bin edge times
+    """
+    num_bins = max(int(np.ceil((end_time - start_time) / (1e6 * 300))), 1)
+    return start_time + np.arange(num_bins + 1) * (1e6 * 300)
+
+
+# number of sums kept by _regression_sums
+_NUM_REGRESSION_SUMS = 14
+
+
+def _regression_sums(reservoir: List[Tuple[float, int, float, float]]) -> Tuple[np.ndarray, Tuple[float, float]]:
+    """
+    Returns the sums offset_weighted_linear_regression needs for the data of a reservoir.  The sums are of 1, x, y,
+    x**2, x*y, y**2, latency and latency**2, then of the first six times the weight (latency in ms ** -2).  Together
+    with the smallest weight of all the data they give the sums weighted by the min-max scaled weights, up to the
+    scale, which does not change the regression.
+    :param reservoir: list of latency, index, time (x) and offset (y) of each data point
+    :return: the sums and the smallest and largest weight of the data
+    """
+    latencies, _, x, y = np.array(reservoir, dtype=float).T
+    weights = (latencies / 1e3) ** -2
+    terms = np.array([np.ones_like(x), x, y, x * x, x * y, y * y, latencies, latencies * latencies])
+    return np.concatenate([terms.sum(axis=1), (terms[:6] * weights).sum(axis=1)]), (weights.min(), weights.max())
+
+
+def _combine_weight_ranges(weight_ranges: List[Tuple[float, float]]) -> Tuple[float, float]:
+    """
+    :param weight_ranges: list of smallest and largest weights
+    :return: the smallest and largest of all the weights
+    """
+    return min((r[0] for r in weight_ranges), default=np.inf), max((r[1] for r in weight_ranges), default=-np.inf)
+
+
+def _weighted_linear_regression_from_sums(
+        sums: np.ndarray, min_weight: float, start_time: float, offset_origin: float
+) -> Tuple[float, float, float, float, float]:
+    """
+    Computes the results of offset_weighted_linear_regression from the sums of _regression_sums, with times relative
+    to start_time and offsets relative to offset_origin.
+    :param sums: the sums of the data, see _regression_sums
+    :param min_weight: the smallest weight of the data
+    :param start_time: the time the times are relative to
+    :param offset_origin: the offset the offsets are relative to
+    :return: slope, offset at start_time, score, mean latency and latency standard deviation
+    """
+    count = sums[0]
+    # weighting by the weight minus the smallest weight is the same as weighting by the min-max scaled weight
+    w, wx, wy, wxx, wxy, wyy = sums[8:14] - min_weight * sums[:6]
+    slope = (w * wxy - wx * wy) / (w * wxx - wx * wx)
+    intercept = (wy - slope * wx) / w
+    # get_wlr_score scores the model's prediction from its own predicted offsets: slope ** 2 * x + score_intercept
+    zero_intercept = intercept + offset_origin - slope * start_time
+    score_slope = slope * slope
+    score_intercept = (slope + 1) * zero_intercept + score_slope * start_time - offset_origin
+    residual = (wyy - 2 * score_slope * wxy - 2 * score_intercept * wy + score_slope ** 2 * wxx
+                + 2 * score_slope * score_intercept * wx + score_intercept ** 2 * w)
+    score = max(1 - residual / (wyy - wy * wy / w), 0.0)
+    mean_latency = sums[6] / count
+    std_dev_latency = np.sqrt(max(sums[7] / count - mean_latency ** 2, 0.0))
+    return slope, intercept + offset_origin, score, mean_latency, std_dev_latency
+
+
 # min max scaling for the weights
 def minmax_scale(data: np.ndarray) -> np.ndarray:
     """
@@ -258,6 +570,37 @@ def get_offset_at_new_time(
     return new_offset
 
 
+# Function to get the indices of the data to do the weighted linear regression with
+def get_binned_indices(
+        times: np.ndarray, latencies: np.ndarray, bin_times: np.ndarray, n_samples: int
+) -> np.ndarray:
+    """
+    Returns the indices of the n_samples smallest latencies with times strictly between the edges of each bin,
+    ordered by bin, then by latency.  Equal latencies are ordered by index.
+    nan latencies values will be ignored.
+    :param times: array of times
+    :param latencies: array of latencies that correspond to the times
+    :param bin_times: array of increasing edge times for each bin
+    :param n_samples: number of samples to take per bin
+    :return: array of indices into times and latencies
+    """
+    times = np.asarray(times, dtype=float)
+    latencies = np.asarray(latencies, dtype=float)
+    if len(bin_times) < 2:
+        return np.array([], dtype=int)
+    # the bin of each time is the last edge before it; times on an edge are not in any bin
+    bins = np.searchsorted(bin_times, times, side="left") - 1
+    inside = (bins >= 0) & (bins < len(bin_times) - 1) & ~np.isnan(latencies)
+    inside[inside] = times[inside] < bin_times[bins[inside] + 1]
+    candidates = np.flatnonzero(inside)
+    order = candidates[np.lexsort((candidates, latencies[candidates], bins[candidates]))]
+    # rank of each candidate within its bin
+    sorted_bins = bins[order]
+    group_start = np.flatnonzero(np.r_[True, sorted_bins[1:] != sorted_bins[:-1]])
+    ranks = np.arange(len(order)) - np.repeat(group_start, np.diff(np.r_[group_start, len(order)]))
+    return order[ranks < n_samples]
+
+
 # Function to get the subset data frame to do the weighted linear regression
 def get_binned_df(
         full_df: pd.DataFrame, bin_times: np.ndarray, n_samples: float
@@ -270,26 +613,10 @@ def get_binned_df(
     :param n_samples: number of samples to take per bin
     :return: binned_df
     """
-
-    # Initialize the data frame
-    binned_df = pd.DataFrame()
-
-    # Loop through each bin and get the n smallest samples
-    for i in range(len(bin_times) - 1):
-        # select the time range
-        select_df = full_df[full_df["times"] < bin_times[i + 1]]
-        select_df = select_df[select_df["times"] > bin_times[i]]
-
-        # select n_samples smallest values (ignores nan values)
-        n_smallest = select_df.nsmallest(n_samples, "latencies")
-
-        # append the n_smallest entries
-        binned_df = binned_df.append(n_smallest)
+    indices = get_binned_indices(full_df["times"].to_numpy(), full_df["latencies"].to_numpy(), bin_times, n_samples)
 
     # Sort the binned_df by time
-    binned_df = binned_df.sort_values(by=["times"])
-
-    return binned_df
+    return full_df.iloc[indices].sort_values(by=["times"])
 
 
 def timesync_quality_check(
@@ -308,6 +635,18 @@ def timesync_quality_check(
     :return: True if timesync data passes all quality checks, False otherwise
     """
 
+    return _passes_quality_check(np.count_nonzero(~np.isnan(latencies)), start_time, end_time, debug)
+
+
+def _passes_quality_check(num_latencies: int, start_time: float, end_time: float, debug: bool = False) -> bool:
+    """
+    The quality check of timesync_quality_check, from the number of non-nan latencies.
+    :param num_latencies: number of non-nan latencies
+    :param start_time: the time used to compute the intercept (offset) and time bins; use start time of first packet
+    :param end_time: the time used to compute the time bins; use start time of last packet + packet duration
+    :param debug: if True, reason for failing quality check is printed, default False
+    :return: True if timesync data passes all quality checks, False otherwise
+    """
     # Check the Duration of the signal of interest
     duration_min = (end_time - start_time) / (1e6 * 60)
 
@@ -317,7 +656,7 @@ def timesync_quality_check(
         return False
 
     # Check average number of points per 5 min (pretty arbitrary, but maybe 3 points per 5 min)
-    points_per_5min = 5 * np.count_nonzero(~np.isnan(latencies)) / duration_min
+    points_per_5min = 5 * num_latencies / duration_min
 
     if points_per_5min < MIN_SAMPLES:
         if debug:
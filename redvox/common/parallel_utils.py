@@ -2,10 +2,14 @@
 Module that contains utilities for working with data in parallel.
 """
 
+import atexit
+from collections import deque
 from enum import Enum
 import multiprocessing
-from multiprocessing.pool import Pool
-from typing import Callable, Iterator, List, Optional, TypeVar
+from multiprocessing.pool import AsyncResult, Pool, ThreadPool
+import os
+import threading
+from typing import Callable, Deque, Iterator, List, Optional, Tuple, TypeVar
 
 import redvox.settings as settings
 
@@ -19,6 +23,96 @@ class MappingType(Enum):
     Serial: str = "Serial"
 
 
+class PoolManager:
+    """
+    Lazily creates a single worker pool that is reused across calls.  The pool is configured by the pool size, start
+    method, and pool type of redvox.settings; when those settings change, the pool is replaced the next time it is
+    requested.  Can be used as a context manager, in which case the pool is closed on exit if it was created within
+    the context.
+    """
+
+    def __init__(self):
+        self._pool: Optional[Pool] = None
+        self._config: Optional[Tuple[int, str, Optional[str], int]] = None
+        self._lock: threading.Lock = threading.Lock()
+        self._close_on_exit: List[bool] = []
+
+    @staticmethod
+    def _current_config() -> Tuple[int, str, Optional[str], int]:
+        # pools are not shared with processes forked after their creation
+        return settings.get_pool_size(), settings.get_pool_type(), settings.get_pool_start_method(), os.getpid()
+
+    def get(self) -> Pool:
+        """
+        :return: The shared pool, created if it does not exist yet.
+        """
+        config: Tuple[int, str, Optional[str], int] = self._current_config()
+        with self._lock:
+            if self._pool is not None and self._config != config:
+                self._close_pool(self._config[3] == config[3])
+            if self._pool is None:
+                size, pool_type, start_method, _ = config
+                if pool_type == settings.POOL_TYPE_THREAD:
+                    self._pool = ThreadPool(size)
+                else:
+                    self._pool = multiprocessing.get_context(start_method).Pool(size)
+                self._config = config
+            return self._pool
+
+    def is_active(self) -> bool:
+        """
+        :return: True if the shared pool exists.
+        """
+        return self._pool is not None
+
+    def _close_pool(self, wait: bool) -> None:
+        """
+        Closes the shared pool.  Must be called while holding the lock.
+
+        :param wait: When True, waits for the workers to finish the submitted work.
+        """
+        if wait:
+            self._pool.close()
+            self._pool.join()
+        self._pool = None
+        self._config = None
+
+    def close(self) -> None:
+        """
+        Closes the shared pool if it exists, waiting for the submitted work to finish.  The next call to get creates a
+        new pool.
+        """
+        with self._lock:
+            if self._pool is not None:
+                self._close_pool(self._config[3] == os.getpid())
+
+    def __enter__(self) -> Pool:
+        self._close_on_exit.append(not self.is_active())
+        return self.get()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._close_on_exit.pop():
+            self.close()
+
+
+__POOL_MANAGER: PoolManager = PoolManager()
+atexit.register(__POOL_MANAGER.close)
+
+
+def pool_manager() -> PoolManager:
+    """
+    :return: The SDK's shared pool manager.
+    """
+    return __POOL_MANAGER
+
+
+def shared_pool() -> Pool:
+    """
+    :return: The SDK's shared pool, created on first use.
+    """
+    return __POOL_MANAGER.get()
+
+
 def maybe_parallel_map(pool: Optional[Pool],
                        map_fn: Callable[[T], R],
                        iterator: Iterator[T],
@@ -30,7 +124,7 @@ def maybe_parallel_map(pool: Optional[Pool],
     of redvox.settings.
 
     :param pool: An optional pool. If a pool is provided, the user is responsible for closing the pool. If the pool
-                 is not provided, one is created by this process and then closed at the end of this process.
+                 is not provided, the SDK's shared pool is used.
     :param map_fn: A function that maps each value in the provided iterator.
     :param iterator: An iterator of elements to be mapped.
     :param condition: An optional condition, that when provided, will be checked and if the condition passes, this
@@ -50,14 +144,12 @@ def maybe_parallel_map(pool: Optional[Pool],
     _condition: bool = True if condition is None else condition()
     res: R
     if settings.is_parallelism_enabled() and _condition:
-        _pool: Pool = multiprocessing.Pool() if pool is None else pool
+        _pool: Pool = shared_pool() if pool is None else pool
         for res in _pool.imap(map_fn, iterator, chunksize=chunk_size):
             yield res
 
-        # If we're managing this pool, close it.
         if pool is None:
             __usage_out(MappingType.ParallelManaged)
-            _pool.close()
         else:
             __usage_out(MappingType.ParallelUnmanaged)
     else:
@@ -65,3 +157,38 @@ def maybe_parallel_map(pool: Optional[Pool],
         __usage_out(MappingType.Serial)
         for res in map(map_fn, iterator):
             yield res
+
+
+def prefetch_map(map_fn: Callable[[T], R],
+                 iterator: Iterator[T],
+                 prefetch: int,
+                 pool: Optional[Pool] = None) -> Iterator[R]:
+    """
+    Maps a function over a set of values while computing up to prefetch results ahead of the consumer.
+    Results are yielded in the same order as the values.
+
+    :param map_fn: A function that maps each value in the provided iterator.
+    :param iterator: An iterator of elements to be mapped.
+    :param prefetch: The maximum number of results computed ahead of the consumer. Values less than 1 map serially.
+    :param pool: An optional thread or process pool. If a pool is provided, the user is responsible for closing the
+                 pool. If the pool is not provided, a ThreadPool with prefetch workers is created and closed when the
+                 returned iterator is exhausted or closed.
+    :return: A transformed iterator.
+    """
+    if prefetch < 1:
+        yield from map(map_fn, iterator)
+        return
+
+    _pool: Pool = ThreadPool(prefetch) if pool is None else pool
+    pending: Deque[AsyncResult] = deque()
+    try:
+        for value in iterator:
+            pending.append(_pool.apply_async(map_fn, (value,)))
+            if len(pending) > prefetch:
+                yield pending.popleft().get()
+        while len(pending) > 0:
+            yield pending.popleft().get()
+    finally:
+        # If we're managing this pool, close it.
+        if pool is None:
+            _pool.terminate()
@@ -3,15 +3,24 @@ Defines generic sensor data and data for API-independent analysis
 all timestamps are integers in microseconds unless otherwise stated
 """
 import enum
-from typing import List, Union
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
+from dataclasses_json import dataclass_json
 import numpy as np
 import pandas as pd
 
 import redvox.common.date_time_utils as dtu
 from redvox.common import offset_model as om
+from redvox.common import memmap_utils as mu
 from redvox.common.errors import RedVoxExceptions
-from redvox.common.gap_and_pad_utils import calc_evenly_sampled_timestamps
+from redvox.common.gap_and_pad_utils import (
+    calc_evenly_sampled_timestamps,
+    create_dataless_columns,
+    encode_scaled_integers,
+    decode_scaled_integers,
+    is_exactly_encoded,
+)
 from redvox.api1000.wrapped_redvox_packet.station_information import (
     NetworkType,
     PowerState,
@@ -26,6 +35,10 @@ NON_INTERPOLATED_COLUMNS = ["compressed_audio", "image"]
 # columns that are not numeric but can be interpolated
 NON_NUMERIC_COLUMNS = ["location_provider", "image_codec", "audio_codec",
                        "network_type", "power_state", "cell_service"]
+# columns that are never converted to another storage type
+NON_CHANNEL_COLUMNS = ["timestamps", "unaltered_timestamps"] + NON_INTERPOLATED_COLUMNS + NON_NUMERIC_COLUMNS
+# value of one count of 16 bit audio; audio recorded as 16 bit counts is a multiple of it
+AUDIO_COUNTS_SCALE: float = 2. ** -15
 
 
 class SensorType(enum.Enum):
@@ -112,9 +125,23 @@ class SensorType(enum.Enum):
             return SensorType.UNKNOWN_SENSOR
 
 
+def _read_only(values: np.ndarray) -> np.ndarray:
+    """
+    :param values: array to protect
+    :return: a read-only view of values
+    """
+    view: np.ndarray = values.view()
+    view.flags.writeable = False
+    return view
+
+
 class SensorData:
     """
     Generic SensorData class for API-independent analysis
+    The data is stored as one contiguous numpy array per column.  The data_df dataframe is a read-only view of the
+    columns that is built when it is requested.
+    Appended data is kept as a list of chunks that are joined to the columns the next time the data is read.
+    Large columns can be kept in memory-mapped files instead of in memory; see spill_to_disk.
     Properties:
         name: string, name of sensor
         type: SensorType, enumerated type of sensor
@@ -126,26 +153,32 @@ class SensorData:
         is_sample_rate_fixed: bool, True if sample rate is constant, default False
         timestamps_altered: bool, True if timestamps in the sensor have been altered from their original values
                             default False
+        channel_scales: dictionary of channel name to the value of one count of the channel, for channels stored as
+                        integers.  the accessors return those channels as floats.  default empty dictionary
+        spill_policy: optional SpillPolicy, if set, the columns large enough to be kept in memory-mapped files by the
+                        policy are written to disk whenever the data changes.  default None
     """
 
     def __init__(
             self,
             sensor_name: str,
-            sensor_data: pd.DataFrame,
+            sensor_data: Union[pd.DataFrame, Dict[str, np.ndarray]],
             sensor_type: SensorType = SensorType.UNKNOWN_SENSOR,
             sample_rate_hz: float = np.nan,
             sample_interval_s: float = np.nan,
             sample_interval_std_s: float = np.nan,
             is_sample_rate_fixed: bool = False,
             are_timestamps_altered: bool = False,
-            calculate_stats: bool = False
+            calculate_stats: bool = False,
+            channel_scales: Optional[Dict[str, float]] = None
     ):
         """
         initialize the sensor data with params
         :param sensor_name: name of the sensor
         :param sensor_type: enumerated type of the sensor, default SensorType.UNKNOWN_SENSOR
-        :param sensor_data: dataframe with the timestamps and sensor data; first column is always the timestamps,
-                            the other columns are the data channels in the sensor
+        :param sensor_data: dataframe or dictionary of column name to array with the timestamps and sensor data;
+                            first column is always the timestamps, the other columns are the data channels in the
+                            sensor
         :param sample_rate_hz: sample rate in hz of the data
         :param sample_interval_s: sample interval in seconds of the data
         :param sample_interval_std_s: std dev of sample interval in seconds of the data
@@ -154,14 +187,30 @@ class SensorData:
                                         original values, default False
         :param calculate_stats: if True, calculate sample_rate, sample_interval_s, and sample_interval_std_s
                                 default False
+        :param channel_scales: optional dictionary of channel name to the value of one count of the channel, for
+                                channels of sensor_data stored as integers, default None
         """
-        if "timestamps" not in sensor_data.columns:
+        if "timestamps" not in (sensor_data.columns if isinstance(sensor_data, pd.DataFrame) else sensor_data):
             raise AttributeError(
                 'SensorData requires the data frame to contain a column titled "timestamps"'
             )
         self.name: str = sensor_name
         self.type: SensorType = sensor_type
-        self.data_df: pd.DataFrame = sensor_data.infer_objects()
+        self._columns: Dict[str, np.ndarray] = {}
+        # read-only views handed out by the accessors, cleared whenever the data changes
+        self._views: Dict[str, np.ndarray] = {}
+        # None when it is not known if the timestamps are in ascending order
+        self._is_sorted: Optional[bool] = None
+        # appended columns and their channel scales, not yet joined to the data
+        self._pending: List[Tuple[Dict[str, np.ndarray], Dict[str, float]]] = []
+        self.channel_scales: Dict[str, float] = {}
+        self.spill_policy: Optional[SpillPolicy] = None
+        if isinstance(sensor_data, pd.DataFrame):
+            self.data_df = sensor_data.infer_objects()
+        else:
+            self.set_columns(sensor_data)
+        if channel_scales:
+            self.channel_scales = dict(channel_scales)
         self.sample_rate_hz: float = sample_rate_hz
         self.sample_interval_s: float = sample_interval_s
         self.sample_interval_std_s: float = sample_interval_std_s
@@ -173,6 +222,306 @@ class SensorData:
         else:
             self.sort_by_data_timestamps()
 
+    @property
+    def data_df(self) -> pd.DataFrame:
+        """
+        :return: a view of the data as a dataframe.  the columns are not copied, except for channels stored as
+                    integers, which are converted to floats.  the columns are read-only; to change the data, set
+                    data_df or use set_column
+        """
+        return pd.DataFrame({name: _read_only(self._decoded(name)) if name in self.channel_scales else self._view(name)
+                             for name in self._get_columns()}, copy=False)
+
+    @data_df.setter
+    def data_df(self, data_df: pd.DataFrame):
+        """
+        :param data_df: the dataframe to replace the data with; its columns are stored as arrays
+        """
+        self.set_columns({name: data_df[name].to_numpy() for name in data_df.columns})
+        self.channel_scales = {}
+
+    def _stored_columns(self) -> Dict[str, np.ndarray]:
+        """
+        :return: the arrays of each column of the data without the appended chunks
+        """
+        return self._columns
+
+    def _get_columns(self) -> Dict[str, np.ndarray]:
+        """
+        :return: the arrays of each column of the data
+        """
+        self._join_pending()
+        return self._stored_columns()
+
+    def _join_pending(self):
+        """
+        joins the appended chunks to the columns.  the columns of all chunks are kept, and chunks without a column
+        get points without data in it.  each column keeps the type and scale of the first chunk with data in it
+        """
+        if not self._pending:
+            return
+        chunks = [(self._stored_columns(), self.channel_scales)] + self._pending
+        names: List[str] = []
+        for columns, _ in chunks:
+            names.extend(name for name in columns if name not in names)
+        joined: Dict[str, np.ndarray] = {}
+        scales: Dict[str, float] = {}
+        for name in names:
+            having = [(columns[name], chunk_scales.get(name)) for columns, chunk_scales in chunks if name in columns]
+            dtype, scale = next(((v.dtype, sc) for v, sc in having if len(v) > 0), (having[0][0].dtype, having[0][1]))
+            parts = []
+            for columns, chunk_scales in chunks:
+                if name not in columns:
+                    parts.append(create_dataless_columns(columns["timestamps"], [name], {name: dtype})[name])
+                    continue
+                values, chunk_scale = columns[name], chunk_scales.get(name)
+                if len(values) < 1 or (values.dtype == dtype and chunk_scale == scale):
+                    parts.append(values)
+                    continue
+                if chunk_scale is not None:
+                    values = decode_scaled_integers(values, chunk_scale)
+                if scale is not None:
+                    values = encode_scaled_integers(values, dtype, scale)
+                elif np.issubdtype(dtype, np.floating) and np.issubdtype(values.dtype, np.floating):
+                    values = values.astype(dtype)
+                parts.append(values)
+            # empty parts are left out so they do not change the type of the result
+            non_empty = [v for v in parts if len(v) > 0]
+            joined[name] = mu.concatenate(non_empty) if non_empty else parts[0]
+            if scale is not None:
+                scales[name] = scale
+        self._pending = []
+        self.set_columns(joined)
+        self.channel_scales = scales
+
+    def _timestamp_chunks(self) -> Iterator[np.ndarray]:
+        """
+        :return: the timestamps of the data, then of each appended chunk, without joining the chunks
+        """
+        yield self._stored_columns()["timestamps"]
+        for columns, _ in self._pending:
+            yield columns["timestamps"]
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        :return: read-only arrays of each column of the data, keyed by column name
+        """
+        return {name: self._view(name) for name in self._get_columns()}
+
+    def set_columns(self, columns: Dict[str, np.ndarray], is_sorted: Optional[bool] = None):
+        """
+        replaces the data with the given columns.  the arrays are used as given, not copied, unless spill_policy
+        copies them to disk.  channel_scales is kept
+        :param columns: arrays of equal length keyed by column name; must include "timestamps"
+        :param is_sorted: True if the timestamps are known to be in ascending order, default None (unknown)
+        """
+        self._columns = {name: np.asanyarray(values) for name, values in columns.items()}
+        if self.spill_policy is not None:
+            self._columns = {name: self.spill_policy.spill(values) for name, values in self._columns.items()}
+        self._pending = []
+        self._views = {}
+        self._is_sorted = is_sorted
+
+    def set_column(self, name: str, values: np.ndarray):
+        """
+        replaces or adds a single column of the data.  the array is used as given, not copied.
+        :param name: name of the column
+        :param values: the values of the column; must have one value per sample
+        """
+        columns = self._get_columns()
+        columns[name] = np.asanyarray(values)
+        self.set_columns(columns, None if name == "timestamps" else self._is_sorted)
+
+    def _view(self, name: str) -> np.ndarray:
+        """
+        :param name: name of the column
+        :return: a cached read-only view of the column
+        """
+        if name not in self._views:
+            self._views[name] = _read_only(self._get_columns()[name])
+        return self._views[name]
+
+    def _decoded(self, name: str) -> np.ndarray:
+        """
+        :param name: name of the column
+        :return: the column, converted to floats if it is stored as integers
+        """
+        values = self._get_columns()[name]
+        if name in self.channel_scales:
+            return decode_scaled_integers(values, self.channel_scales[name])
+        return values
+
+    def set_channel_dtype(self, dtype: Union[str, np.dtype], scale: float = 1.):
+        """
+        converts the numeric data channels to the given type; timestamps and enumerated channels are not changed.
+        channels converted to integers are stored as counts of scale, with the smallest value of the type marking
+        points without data.
+        :param dtype: floating point or signed integer type to store the data channels as
+        :param scale: the value of one count of integer channels; not used for floating point types, default 1.0
+        """
+        dtype = np.dtype(dtype)
+        is_integer: bool = np.issubdtype(dtype, np.signedinteger)
+        if not is_integer and not np.issubdtype(dtype, np.floating):
+            raise ValueError(f"data channels must be a floating point or signed integer type, not {dtype}")
+        columns = dict(self._get_columns())
+        scales: Dict[str, float] = {}
+        for name, values in columns.items():
+            if name in NON_CHANNEL_COLUMNS or not np.issubdtype(values.dtype, np.number):
+                continue
+            if values.dtype == dtype and self.channel_scales.get(name) == (scale if is_integer else None):
+                if is_integer:
+                    scales[name] = scale
+                continue
+            values = self._decoded(name)
+            if is_integer:
+                columns[name] = encode_scaled_integers(values, dtype, scale)
+                scales[name] = scale
+            else:
+                columns[name] = values.astype(dtype)
+        self.set_columns(columns, self._is_sorted)
+        self.channel_scales = scales
+
+    def spill_to_disk(self, spill_policy: "SpillPolicy") -> "SensorData":
+        """
+        keeps the columns that are large enough for spill_policy in memory-mapped .npy files, now and whenever the
+        data changes.  slices of the columns taken through the accessors and take_samples are not copied into memory
+        :param spill_policy: the policy that decides which columns are written to disk and where
+        :return: updated version of self
+        """
+        self.spill_policy = spill_policy
+        self.set_columns(self._get_columns(), self._is_sorted)
+        return self
+
+    def spilled_columns(self) -> List[str]:
+        """
+        :return: the names of the columns kept in memory-mapped files
+        """
+        return [name for name, values in self._get_columns().items() if mu.memmap_directory(values) is not None]
+
+    def __setstate__(self, state: Dict):
+        """
+        memory-mapped columns are copied into memory when a sensor is pickled; they are written to disk again when it
+        is unpickled
+        :param state: the attributes of the sensor
+        """
+        self.__dict__.update(state)
+        if self.spill_policy is not None and self._columns is not None:
+            self.set_columns(self._columns, self._is_sorted)
+
+    def _float_view(self, name: str) -> np.ndarray:
+        """
+        :param name: name of the column
+        :return: a cached read-only view of the column as floats
+        """
+        key: str = f"float:{name}"
+        if key not in self._views:
+            self._views[key] = _read_only(self._get_columns()[name].astype(float, copy=False))
+        return self._views[key]
+
+    def take_samples(self, indices: Union[slice, np.ndarray]):
+        """
+        keeps only the selected samples
+        :param indices: a slice or array of the indices of the samples to keep, in the order to keep them in
+        """
+        is_sorted = self._is_sorted if isinstance(indices, slice) and indices.step is None else None
+        self.set_columns({name: values[indices] for name, values in self._get_columns().items()}, is_sorted)
+
+    def insert_dataless_timestamps(self, timestamps: np.ndarray):
+        """
+        adds points without data at the given timestamps, then sorts the data by timestamps.  enumerated columns
+        are set to their unknown values, integer channels to the smallest value of their type and all other columns
+        are set to np.nan
+        :param timestamps: the timestamps of the points to add
+        """
+        if len(timestamps) < 1:
+            return
+        columns = self._get_columns()
+        timestamps = np.sort(np.asarray(timestamps, dtype=float))
+        was_sorted: bool = self.is_sorted()
+        split: int = np.searchsorted(timestamps, columns["timestamps"][0]) if was_sorted and self.num_samples() > 0 \
+            else 0
+        before, after = timestamps[:split], timestamps[split:]
+        dtypes = {name: values.dtype for name, values in columns.items()}
+        new_before = create_dataless_columns(before, list(columns.keys()), dtypes)
+        new_after = create_dataless_columns(after, list(columns.keys()), dtypes)
+        # the result is only known to be sorted if the new points are all before or after the data
+        is_sorted: Optional[bool] = True if was_sorted and (
+            self.num_samples() < 1 or len(after) < 1 or after[0] > columns["timestamps"][-1]) else None
+        self.set_columns({name: mu.concatenate([new_before[name], values, new_after[name]])
+                          for name, values in columns.items()}, is_sorted)
+        self.sort_by_data_timestamps()
+
+    def interpolated_columns(self, timestamps: np.ndarray, first_indices: np.ndarray,
+                             second_indices: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        creates points whose values are interpolated between pairs of samples, in the types the columns are stored
+        as.  image and compressed audio columns are set to no data, enumerated columns and integer columns without a
+        scale take the value of the sample closer to the new point
+        :param timestamps: the timestamps of the new points
+        :param first_indices: the index of the first sample of each new point
+        :param second_indices: optional index of the second sample of each new point.  if None, the new points are
+                                copies of the first samples, default None
+        :return: dictionary of column name to the values of the new points
+        """
+        columns = self._get_columns()
+        timestamps = np.asarray(timestamps, dtype=float)
+        first_indices = np.asarray(first_indices, dtype=int)
+        second_indices = first_indices if second_indices is None else np.asarray(second_indices, dtype=int)
+        first_times = columns["timestamps"][first_indices]
+        second_times = columns["timestamps"][second_indices]
+        span = second_times - first_times
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weights = np.where(span != 0, (timestamps - first_times) / span, 0.)
+        closer = np.where(np.abs(first_times - timestamps) <= np.abs(second_times - timestamps),
+                          first_indices, second_indices)
+        dtypes = {name: values.dtype for name, values in columns.items()}
+        result = create_dataless_columns(timestamps, ["timestamps"] + [n for n in columns
+                                                                       if n in NON_INTERPOLATED_COLUMNS], dtypes)
+        for name, values in columns.items():
+            if name in result:
+                continue
+            is_scaled = name in self.channel_scales
+            if name in NON_NUMERIC_COLUMNS or not (is_scaled or np.issubdtype(values.dtype, np.floating)):
+                result[name] = values[closer]
+                continue
+            if is_scaled:
+                first = decode_scaled_integers(values[first_indices], self.channel_scales[name])
+                second = decode_scaled_integers(values[second_indices], self.channel_scales[name])
+            else:
+                first = values[first_indices].astype(float)
+                second = values[second_indices].astype(float)
+            with np.errstate(invalid="ignore"):
+                interpolated = np.where(first_indices == second_indices, first, first + (second - first) * weights)
+            result[name] = encode_scaled_integers(interpolated, values.dtype, self.channel_scales[name]) \
+                if is_scaled else interpolated.astype(values.dtype)
+        return result
+
+    def insert_interpolated_points(self, timestamps: np.ndarray, first_indices: np.ndarray,
+                                   second_indices: Optional[np.ndarray] = None):
+        """
+        adds points whose values are interpolated between pairs of samples, then sorts the data by timestamps.  the
+        columns keep their types; see interpolated_columns
+        :param timestamps: the timestamps of the new points
+        :param first_indices: the index of the first sample of each new point
+        :param second_indices: optional index of the second sample of each new point.  if None, the new points are
+                                copies of the first samples, default None
+        """
+        if len(timestamps) < 1:
+            return
+        new_points = self.interpolated_columns(timestamps, first_indices, second_indices)
+        self.set_columns({name: mu.concatenate([values, new_points[name]])
+                          for name, values in self._get_columns().items()})
+        self.sort_by_data_timestamps()
+
+    def is_sorted(self) -> bool:
+        """
+        :return: True if the timestamps are in ascending order
+        """
+        if self._is_sorted is None:
+            timestamps = self._get_columns()["timestamps"]
+            self._is_sorted = bool(np.all(timestamps[1:] >= timestamps[:-1]))
+        return self._is_sorted
+
     def print_errors(self):
         """
         prints errors to screen
@@ -214,17 +563,26 @@ class SensorData:
         return self
 
     def append_data(
-            self, new_data: pd.DataFrame, recalculate_stats: bool = False
+            self, new_data: Union[pd.DataFrame, "SensorData"], recalculate_stats: bool = False
     ) -> "SensorData":
         """
-        append the new data to the dataframe, update the sensor's stats on demand if it doesn't have a fixed
-            sample rate, then return the updated SensorData object
-        :param new_data: Dataframe containing data to add to the sensor's dataframe
+        append the new data to the sensor, update the sensor's stats on demand if it doesn't have a fixed
+            sample rate, then return the updated SensorData object.  the new data is kept as a chunk until the data
+            is read, so appending many times does not copy the data each time
+        :param new_data: Dataframe or SensorData containing data to add to the sensor's data
         :param recalculate_stats: if True and the sensor does not have a fixed sample rate, sort the timestamps,
                                     recalculate the sample rate, interval, and interval std dev, default False
         :return: the updated SensorData object
         """
-        self.data_df = self.data_df.append(new_data, ignore_index=True)
+        if isinstance(new_data, SensorData):
+            self._pending.append((new_data._get_columns(), dict(new_data.channel_scales)))
+        else:
+            if "timestamps" not in new_data.columns:
+                raise AttributeError('SensorData requires the data frame to contain a column titled "timestamps"')
+            new_data = new_data.infer_objects()
+            self._pending.append(({name: new_data[name].to_numpy(copy=True) for name in new_data.columns}, {}))
+        self._views = {}
+        self._is_sorted = None
         if recalculate_stats and not self.is_sample_rate_fixed:
             self.organize_and_update_stats()
         return self
@@ -239,33 +597,43 @@ class SensorData:
     def samples(self) -> np.ndarray:
         """
         gets the samples of dataframe
-        :return: the data values of the dataframe as a numpy ndarray
-        """
-        return self.data_df.iloc[:, 2:].T.to_numpy()
+        :return: the data values of the dataframe as a read-only numpy ndarray with one row per data channel
+        """
+        if "samples" in self._views:
+            return self._views["samples"]
+        channels = [self._decoded(name) for name in list(self._get_columns().keys())[2:]]
+        samples = _read_only(np.vstack(channels) if len(channels) > 0 else np.empty((0, self.num_samples())))
+        # channels stored as integers are not kept as floats as well
+        if not self.channel_scales:
+            self._views["samples"] = samples
+        return samples
 
     def get_data_channel(self, channel_name: str) -> Union[np.array, List[str]]:
         """
         gets the data channel specified, raises an error and lists valid fields if channel_name is not in the dataframe
         :param channel_name: the name of the channel to get data for
-        :return: the data values of the channel as a numpy array or list of strings for enumerated channels
+        :return: the data values of the channel as a read-only numpy array or list of strings for enumerated channels
         """
-        if channel_name not in self.data_df.columns:
+        columns = self._get_columns()
+        if channel_name not in columns:
             raise ValueError(
                 f"WARNING: {channel_name} does not exist; try one of {self.data_channels()}"
             )
         if channel_name == "location_provider":
-            return [LocationProvider(c).name for c in self.data_df[channel_name]]
+            return [LocationProvider(c).name for c in columns[channel_name]]
         elif channel_name == "image_codec":
-            return [ImageCodec(c).name for c in self.data_df[channel_name]]
+            return [ImageCodec(c).name for c in columns[channel_name]]
         elif channel_name == "audio_codec":
-            return [AudioCodec(c).name for c in self.data_df[channel_name]]
+            return [AudioCodec(c).name for c in columns[channel_name]]
         elif channel_name == "network_type":
-            return [NetworkType(c).name for c in self.data_df[channel_name]]
+            return [NetworkType(c).name for c in columns[channel_name]]
         elif channel_name == "power_state":
-            return [PowerState(c).name for c in self.data_df[channel_name]]
+            return [PowerState(c).name for c in columns[channel_name]]
         elif channel_name == "cell_service":
-            return [CellServiceState(c).name for c in self.data_df[channel_name]]
-        return self.data_df[channel_name].to_numpy()
+            return [CellServiceState(c).name for c in columns[channel_name]]
+        elif channel_name in self.channel_scales:
+            return _read_only(self._decoded(channel_name))
+        return self._view(channel_name)
 
     def get_valid_data_channel_values(self, channel_name: str) -> np.array:
         """
@@ -278,58 +646,76 @@ class SensorData:
 
     def data_timestamps(self) -> np.array:
         """
-        :return: the timestamps as a numpy array
+        :return: the timestamps as a read-only numpy array
         """
-        return self.data_df["timestamps"].to_numpy(dtype=float)
+        return self._float_view("timestamps")
 
     def unaltered_data_timestamps(self) -> np.array:
         """
-        :return: the unaltered timestamps as a numpy array
+        :return: the unaltered timestamps as a read-only numpy array
         """
-        return self.data_df["unaltered_timestamps"].to_numpy(dtype=float)
+        return self._float_view("unaltered_timestamps")
 
     def first_data_timestamp(self) -> float:
         """
         :return: timestamp of the first data point
         """
-        return self.data_df["timestamps"].iloc[0]
+        # appended chunks are not joined to find the first or last timestamp
+        for timestamps in self._timestamp_chunks():
+            if len(timestamps) > 0:
+                return timestamps[0]
+        return self._get_columns()["timestamps"][0]
 
     def last_data_timestamp(self) -> float:
         """
         :return: timestamp of the last data point
         """
-        return self.data_df["timestamps"].iloc[-1]
+        for timestamps in reversed(list(self._timestamp_chunks())):
+            if len(timestamps) > 0:
+                return timestamps[-1]
+        return self._get_columns()["timestamps"][-1]
 
     def num_samples(self) -> int:
         """
         :return: the number of rows (samples) in the dataframe
         """
-        return self.data_df.shape[0]
+        return sum(len(timestamps) for timestamps in self._timestamp_chunks())
 
     def data_channels(self) -> List[str]:
         """
         :return: a list of the names of the columns (data channels) of the dataframe
         """
-        return self.data_df.columns.to_list()
+        return list(self._get_columns().keys())
 
-    def update_data_timestamps(self, offset_model: om.OffsetModel, use_model_function: bool = True):
+    def update_data_timestamps(self, offset_model: om.OffsetModel, use_model_function: bool = True,
+                               in_place: bool = False):
         """
         updates the timestamps of the data points
         :param offset_model: model used to update the timestamps
         :param use_model_function: if True, use the offset model's correction function to correct time,
                                     otherwise use best offset (model's intercept value).  default True
+        :param in_place: if True, overwrite the stored timestamps instead of creating a new array when they are
+                            writable floats.  arrays and dataframes taken from the sensor before the update share the
+                            stored timestamps and see the change.  default False
         """
         slope = dtu.seconds_to_microseconds(self.sample_interval_s) * (1 + offset_model.slope) \
             if use_model_function else dtu.seconds_to_microseconds(self.sample_interval_s)
+        timestamps = self._get_columns()["timestamps"]
+        in_place = in_place and timestamps.flags.writeable and timestamps.dtype == np.float64
         if self.type == SensorType.AUDIO:
             # use the model to update the first timestamp or add the best offset (model's intercept value)
-            self.data_df["timestamps"] = \
-                calc_evenly_sampled_timestamps(offset_model.update_time(self.first_data_timestamp(),
-                                                                        use_model_function),
-                                               self.num_samples(),
-                                               slope)
+            first_timestamp = offset_model.update_time(self.first_data_timestamp(), use_model_function)
+            if in_place:
+                for i in range(0, len(timestamps), om.TIMESTAMP_BLOCK_SIZE):
+                    block = timestamps[i:i + om.TIMESTAMP_BLOCK_SIZE]
+                    block[:] = first_timestamp + (np.arange(i, i + len(block)) * slope)
+            else:
+                timestamps = calc_evenly_sampled_timestamps(first_timestamp, self.num_samples(), slope)
+        elif in_place:
+            offset_model.update_timestamps_in_place(timestamps, use_model_function)
         else:
-            self.data_df["timestamps"] = offset_model.update_timestamps(self.data_timestamps(), use_model_function)
+            timestamps = offset_model.update_timestamps(timestamps, use_model_function)
+        self.set_column("timestamps", timestamps)
         time_diffs = np.floor(np.diff(self.data_timestamps()))
         if len(time_diffs) > 1:
             self.sample_interval_s = dtu.microseconds_to_seconds(slope)
@@ -340,10 +726,14 @@ class SensorData:
 
     def sort_by_data_timestamps(self, ascending: bool = True):
         """
-        sorts the data based on timestamps
+        sorts the data based on timestamps; data that is already in ascending order is not reordered
         :param ascending: if True, timestamps are sorted in ascending order
         """
-        self.data_df = self.data_df.sort_values("timestamps", ascending=ascending)
+        if ascending and self.is_sorted():
+            return
+        order = np.argsort(self._get_columns()["timestamps"], kind="stable")
+        self.take_samples(order if ascending else order[::-1])
+        self._is_sorted = ascending or self.num_samples() < 2
 
     def interpolate(self, interpolate_timestamp: float, first_point: int, second_point: int = 0,
                     copy: bool = True) -> pd.Series:
@@ -355,15 +745,16 @@ class SensorData:
         :param copy: if True, copies the values of the first point, default True
         :return: pd.Series of interpolated points
         """
-        start_point = self.data_df.iloc[first_point]
-        numeric_start = start_point[[col for col in self.data_df.columns
+        data_df = self.data_df
+        start_point = data_df.iloc[first_point]
+        numeric_start = start_point[[col for col in data_df.columns
                                      if col not in NON_INTERPOLATED_COLUMNS + NON_NUMERIC_COLUMNS]]
-        non_numeric_start = start_point[[col for col in self.data_df.columns if col in NON_NUMERIC_COLUMNS]]
+        non_numeric_start = start_point[[col for col in data_df.columns if col in NON_NUMERIC_COLUMNS]]
         if not copy and second_point:
-            end_point = self.data_df.iloc[first_point + second_point]
-            numeric_end = end_point[[col for col in self.data_df.columns
+            end_point = data_df.iloc[first_point + second_point]
+            numeric_end = end_point[[col for col in data_df.columns
                                      if col not in NON_INTERPOLATED_COLUMNS + NON_NUMERIC_COLUMNS]]
-            non_numeric_end = end_point[[col for col in self.data_df.columns if col in NON_NUMERIC_COLUMNS]]
+            non_numeric_end = end_point[[col for col in data_df.columns if col in NON_NUMERIC_COLUMNS]]
             first_closer = \
                 np.abs(start_point["timestamps"] - interpolate_timestamp) \
                 <= np.abs(end_point["timestamps"] - interpolate_timestamp)
@@ -386,3 +777,148 @@ class SensorData:
             non_numeric_diff = non_numeric_start
         numeric_diff["timestamps"] = interpolate_timestamp
         return pd.concat([numeric_diff, non_numeric_diff])
+
+
+@dataclass_json
+@dataclass
+class DtypePolicy:
+    """
+    The types used to store the data channels of sensors.  Timestamps are always stored as float64 microseconds and
+    enumerated, image and compressed audio channels are never converted.
+    Properties:
+        sensor_dtypes: dictionary of sensor type name to the floating point type of the data channels of sensors of
+                        that type.  sensors without an entry use float64.  default empty dictionary
+        audio_dtype: type of the audio samples; one of float64, float32, int16 or int32.  integer types are only
+                        used for audio whose samples are all multiples of audio_scale within the range of the type;
+                        other audio is stored as float32, or float64 if float32 cannot hold it exactly.
+                        default float64
+        audio_scale: value of one count of integer audio samples; the samples are stored as multiples of it.
+                        default AUDIO_COUNTS_SCALE
+    """
+    sensor_dtypes: Dict[str, str] = field(default_factory=lambda: {})
+    audio_dtype: str = "float64"
+    audio_scale: float = AUDIO_COUNTS_SCALE
+
+    def __post_init__(self):
+        for name, dtype in self.sensor_dtypes.items():
+            if SensorType[name] == SensorType.AUDIO:
+                raise ValueError("set the type of audio samples using audio_dtype")
+            if not np.issubdtype(np.dtype(dtype), np.floating):
+                raise ValueError(f"{name} data channels must be a floating point type, not {dtype}")
+        if not np.issubdtype(np.dtype(self.audio_dtype), np.floating) \
+                and not np.issubdtype(np.dtype(self.audio_dtype), np.signedinteger):
+            raise ValueError(f"audio samples must be a floating point or signed integer type, not {self.audio_dtype}")
+
+    @staticmethod
+    def reduced() -> "DtypePolicy":
+        """
+        :return: policy that stores the data channels of the three component and single value sensors as float32
+                    and the audio samples as int16 counts when that loses nothing
+        """
+        return DtypePolicy(
+            {s.name: "float32" for s in [SensorType.ACCELEROMETER, SensorType.GYROSCOPE, SensorType.MAGNETOMETER,
+                                         SensorType.GRAVITY, SensorType.LINEAR_ACCELERATION, SensorType.ORIENTATION,
+                                         SensorType.ROTATION_VECTOR, SensorType.PRESSURE, SensorType.LIGHT,
+                                         SensorType.PROXIMITY, SensorType.AMBIENT_TEMPERATURE,
+                                         SensorType.RELATIVE_HUMIDITY]},
+            "int16",
+        )
+
+    def dtype_for(self, sensor_type: SensorType) -> np.dtype:
+        """
+        :param sensor_type: type of the sensor
+        :return: the type to store the data channels of sensors of sensor_type as
+        """
+        if sensor_type == SensorType.AUDIO:
+            return np.dtype(self.audio_dtype)
+        return np.dtype(self.sensor_dtypes.get(sensor_type.name, "float64"))
+
+    def audio_dtype_for(self, samples: List[np.ndarray]) -> np.dtype:
+        """
+        :param samples: the audio samples to store, as one or more arrays
+        :return: the type to store the samples as; audio_dtype unless it is an integer type that cannot hold the
+                    samples exactly
+        """
+        dtype = np.dtype(self.audio_dtype)
+        if not np.issubdtype(dtype, np.signedinteger) \
+                or all(is_exactly_encoded(values, dtype, self.audio_scale) for values in samples):
+            return dtype
+        if all(np.array_equal(np.asarray(values, dtype=np.float32), np.asarray(values, dtype=float), equal_nan=True)
+               for values in samples):
+            return np.dtype(np.float32)
+        return np.dtype(np.float64)
+
+    def audio_fallback_error(self, dtype: np.dtype) -> Optional[str]:
+        """
+        :param dtype: the type returned by audio_dtype_for
+        :return: a message explaining why the audio is not stored as audio_dtype, or None if it is
+        """
+        if dtype == np.dtype(self.audio_dtype):
+            return None
+        return f"audio samples are not multiples of {self.audio_scale} within the range of {self.audio_dtype}; " \
+               f"they are stored as {dtype} instead"
+
+    def apply(self, sensor: SensorData) -> SensorData:
+        """
+        converts the data channels of the sensor to the types of the policy
+        :param sensor: the sensor to convert
+        :return: the updated sensor
+        """
+        if sensor.type == SensorType.AUDIO:
+            channels = [name for name in sensor.data_channels() if name not in NON_CHANNEL_COLUMNS]
+            dtype = self.audio_dtype_for([sensor.get_data_channel(name) for name in channels])
+            error = self.audio_fallback_error(dtype)
+            # audio loaded with the policy already has the error and the fallback type
+            if error is not None and any(sensor.columns()[name].dtype != dtype for name in channels):
+                sensor.errors.append(error)
+            sensor.set_channel_dtype(dtype, self.audio_scale)
+        else:
+            sensor.set_channel_dtype(self.dtype_for(sensor.type))
+        return sensor
+
+
+@dataclass_json
+@dataclass
+class SpillPolicy:
+    """
+    Which columns of sensors are kept in memory-mapped .npy files instead of in memory.  The files are created in a
+    scratch directory and removed as soon as they are mapped where the platform allows it, so the disk space is
+    released with the arrays.
+    Properties:
+        scratch_dir: optional directory to create the files in.  default None (the system's temporary directory)
+        threshold_bytes: columns of at least this many bytes are written to disk, smaller columns are kept in memory.
+                            default 64 MiB
+    """
+    scratch_dir: Optional[str] = None
+    threshold_bytes: int = 2 ** 26
+
+    def __post_init__(self):
+        if self.threshold_bytes < 0:
+            raise ValueError(f"threshold_bytes must be at least 0, not {self.threshold_bytes}")
+
+    def allocate(self, length: int, dtype: np.dtype) -> np.ndarray:
+        """
+        :param length: number of values in the array
+        :param dtype: type of the values in the array
+        :return: an uninitialized array, memory-mapped if it is at least threshold_bytes
+        """
+        if length * np.dtype(dtype).itemsize >= self.threshold_bytes and not np.dtype(dtype).hasobject:
+            return mu.new_memmap(length, dtype, self.scratch_dir)
+        return np.empty(length, dtype)
+
+    def spill(self, values: np.ndarray) -> np.ndarray:
+        """
+        :param values: array to check
+        :return: a memory-mapped copy of values if it is at least threshold_bytes, otherwise values
+        """
+        if values.nbytes >= self.threshold_bytes:
+            return mu.spill_array(values, self.scratch_dir)
+        return values
+
+    def apply(self, sensor: SensorData) -> SensorData:
+        """
+        keeps the large columns of the sensor in memory-mapped files
+        :param sensor: the sensor to update
+        :return: the updated sensor
+        """
+        return sensor.spill_to_disk(self)
@@ -2,7 +2,7 @@
 This module loads sensor data from Redvox packets
 """
 
-from typing import Callable, Dict, List, Optional, Tuple, Union
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 import numpy as np
 
@@ -20,7 +20,7 @@ from redvox.api1000.wrapped_redvox_packet.station_information import (
 from redvox.common.stats_helper import StatsContainer
 from redvox.common import date_time_utils as dtu
 from redvox.common import gap_and_pad_utils as gpu
-from redvox.common.sensor_data import SensorType, SensorData
+from redvox.common.sensor_data import SensorType, SensorData, DtypePolicy, SpillPolicy
 
 # Dataframe column definitions
 COMPRESSED_AUDIO_COLUMNS: List[str] = [
@@ -155,22 +155,21 @@ __SENSOR_TYPE_TO_SENSOR_FN: Dict[
 }
 
 
-def __fill_data_array(input_array: List, num_expected_values: int,
-                      default_value: Union[float, int] = np.nan) -> np.array:
+def __padded_array(values, num_samples: int, default_value: float = np.nan) -> np.ndarray:
     """
-    creates a new array filled with [default value] to replace missing values from input_array
-    or returns the first [num_expected_values] from input_array
+    converts a repeated field to an array of num_samples floats.  values past num_samples are dropped and missing
+    values are replaced with default_value
 
-    :param input_array: array of values to take from
-    :param num_expected_values: number of expected values to take
-    :param default_value: value to use if input_array is shorter than expected
-    :return: array of num_expected_values in length
+    :param values: repeated field of values to convert
+    :param num_samples: number of values expected
+    :param default_value: value to use if values is shorter than expected, default np.nan
+    :return: array of num_samples in length
     """
-    if len(input_array) < 1:
-        return np.full(num_expected_values, default_value)
-    elif len(input_array) != num_expected_values:
-        return [default_value if len(input_array) < i + 1 else input_array[i] for i in range(num_expected_values)]
-    return input_array
+    result = np.full(num_samples, default_value, dtype=float)
+    num_values = min(len(values), num_samples)
+    if num_values > 0:
+        result[:num_values] = values[:num_values]
+    return result
 
 
 def __has_sensor(
@@ -238,6 +237,93 @@ def __stats_for_sensor_per_packet_per_second(num_packets: int,
     return sample_rate, sample_interval, sample_interval_std
 
 
+class _SensorBuffer:
+    """
+    Column buffers for one sensor type, filled while walking a list of packets and turned into SensorData once
+    every packet has been read.
+
+    Properties:
+        sensor_type: SensorType, the type of sensor being read
+
+        field_name: Optional str, name of the field in packet.sensors; None if read from the station metrics
+
+        description: Optional str, the description of the first sensor found, default None
+
+        data_list: List of Lists, one per column read from the packets
+
+        stats: StatsContainer, the sample interval statistics of each packet read
+
+        add_fn: Callable, appends the sensor values of one packet to the buffer
+
+        build_fn: Callable, creates the SensorData from the buffer
+    """
+    def __init__(
+            self,
+            sensor_type: SensorType,
+            field_name: Optional[str],
+            num_columns: int,
+            add_fn: Callable[["_SensorBuffer", api_m.RedvoxPacketM, Sensor], None],
+            build_fn: Callable[
+                ["_SensorBuffer", List[api_m.RedvoxPacketM], Iterable[Tuple[float, float]]], Optional[SensorData]
+            ],
+    ):
+        """
+        :param sensor_type: the SensorType of the sensor being read
+        :param field_name: name of the field in packet.sensors; None if read from the station metrics
+        :param num_columns: the number of columns to read from the packets
+        :param add_fn: function that appends the sensor values of one packet to the buffer
+        :param build_fn: function that creates the SensorData from the buffer
+        """
+        self.sensor_type: SensorType = sensor_type
+        self.field_name: Optional[str] = field_name
+        self.description: Optional[str] = None
+        self.data_list: List[List] = [[] for _ in range(num_columns)]
+        self.stats: StatsContainer = StatsContainer(f"{sensor_type.name.lower()}_sensor")
+        self.add_fn = add_fn
+        self.build_fn = build_fn
+
+    def add(self, packet: api_m.RedvoxPacketM):
+        """
+        append the sensor values of a packet that contains the sensor to the buffer
+
+        :param packet: the packet to read from
+        """
+        if self.field_name is None:
+            self.add_fn(self, packet, packet.station_information.station_metrics)
+        else:
+            sensor = getattr(packet.sensors, self.field_name)
+            if self.description is None:
+                self.description = sensor.sensor_description
+            self.add_fn(self, packet, sensor)
+
+    def build(
+            self, packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
+    ) -> Optional[SensorData]:
+        """
+        :param packets: the packets that were read into the buffer
+        :param gaps: the list of non-inclusive start and end times of the gaps in the packets
+        :return: the sensor data in the buffer or None if no data was read
+        """
+        return self.build_fn(self, packets, gaps)
+
+
+def __load_from_list(
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]], buffer: _SensorBuffer
+) -> Optional[SensorData]:
+    """
+    read a single sensor from a list of packets
+
+    :param packets: packets with data to load
+    :param gaps: the list of non-inclusive start and end times of the gaps in the packets
+    :param buffer: the buffer of the sensor to read
+    :return: the sensor data if it exists, None otherwise
+    """
+    for packet in packets:
+        if buffer.field_name is None or __has_sensor(packet, buffer.field_name):
+            buffer.add(packet)
+    return buffer.build(packets, gaps)
+
+
 def get_empty_sensor_data(
         name: str, sensor_type: SensorType = SensorType.UNKNOWN_SENSOR
 ) -> SensorData:
@@ -344,7 +430,7 @@ def read_apim_xyz_sensor(
 def load_apim_xyz_sensor_from_list(
         sensor_type: SensorType,
         data: List[List[float]],
-        gaps: List[Tuple[float, float]],
+        gaps: Iterable[Tuple[float, float]],
         column_name: str,
         description: str,
         sample_interval_micros: float,
@@ -406,7 +492,7 @@ def load_apim_single_sensor_from_list(
         sensor_type: SensorType,
         timestamps: List[float],
         data: List[float],
-        gaps: List[Tuple[float, float]],
+        gaps: Iterable[Tuple[float, float]],
         column_name: str,
         description: str,
         sample_interval_micros: float,
@@ -437,11 +523,14 @@ def load_apim_single_sensor_from_list(
     return None
 
 
-def load_apim_audio(packet: api_m.RedvoxPacketM) -> Optional[SensorData]:
+def load_apim_audio(
+        packet: api_m.RedvoxPacketM, dtype_policy: Optional[DtypePolicy] = None
+) -> Optional[SensorData]:
     """
     load audio data from a single redvox packet
 
     :param packet: packet with data to load
+    :param dtype_policy: optional types to store the audio samples as, default None (float64)
     :return: audio sensor data if it exists, None otherwise
     """
     if __has_sensor(packet, __AUDIO_FIELD_NAME):
@@ -453,7 +542,7 @@ def load_apim_audio(packet: api_m.RedvoxPacketM) -> Optional[SensorData]:
             dtu.seconds_to_microseconds(1.0 / audio_sensor.sample_rate),
         )
 
-        return SensorData(
+        sensor_data = SensorData(
             audio_sensor.sensor_description,
             pd.DataFrame(
                 np.transpose(
@@ -467,18 +556,23 @@ def load_apim_audio(packet: api_m.RedvoxPacketM) -> Optional[SensorData]:
             0.0,
             True,
             )
+        return sensor_data if dtype_policy is None else dtype_policy.apply(sensor_data)
 
     return None
 
 
 def load_apim_audio_from_list(
-        packets: List[api_m.RedvoxPacketM],
+        packets: List[api_m.RedvoxPacketM], dtype_policy: Optional[DtypePolicy] = None,
+        spill_policy: Optional[SpillPolicy] = None
 ) -> Tuple[Optional[SensorData], List[Tuple[float, float]]]:
     """
     load audio data from a list of redvox packets
     NOTE: This only works because audio sensors in the list should all have the same number of data points.
 
     :param packets: packets with data to load
+    :param dtype_policy: optional types to store the audio samples as, default None (float64)
+    :param spill_policy: optional policy to write large audio columns straight to memory-mapped files with,
+                            default None (kept in memory)
     :return: audio sensor data if it exists, None otherwise
     """
     if len(packets) > 0:
@@ -489,22 +583,37 @@ def load_apim_audio_from_list(
             packet_info = [
                 (
                     p.sensors.audio.first_sample_timestamp,
-                    np.array(p.sensors.audio.samples.values),
+                    p.sensors.audio.samples.values,
                 )
                 for p in packets
             ]
+            if dtype_policy is None:
+                dtype_policy = DtypePolicy()
+            audio_dtype = dtype_policy.audio_dtype_for([p[1] for p in packet_info])
+            # the samples are written straight into the storage type
             gp_result = gpu.fill_audio_gaps(
-                packet_info, dtu.seconds_to_microseconds(1 / sample_rate_hz)
+                packet_info, dtu.seconds_to_microseconds(1 / sample_rate_hz), audio_dtype=audio_dtype,
+                as_columns=True, audio_scale=dtype_policy.audio_scale,
+                allocate=np.empty if spill_policy is None else spill_policy.allocate
             )
+            if gp_result.result_columns is None:
+                gp_result.result_columns = {c: np.array([], dtype=float) for c in gpu.AUDIO_DF_COLUMNS}
+                gp_result.result_columns[gpu.AUDIO_DF_COLUMNS[2]] = np.array([], dtype=audio_dtype)
             sensor_data = SensorData(
                 get_sensor_description_list(packets, SensorType.AUDIO),
-                gp_result.result_df,
+                gp_result.result_columns,
                 SensorType.AUDIO,
                 sample_rate_hz,
                 1 / sample_rate_hz,
                 0.0,
                 True,
+                channel_scales={gpu.AUDIO_DF_COLUMNS[2]: dtype_policy.audio_scale}
+                if np.issubdtype(audio_dtype, np.integer) else None
                 )
+            if spill_policy is not None:
+                sensor_data.spill_to_disk(spill_policy)
+            if dtype_policy.audio_fallback_error(audio_dtype) is not None:
+                sensor_data.errors.append(dtype_policy.audio_fallback_error(audio_dtype))
             if len(gp_result.errors.get()) > 0:
                 sensor_data.errors.extend_error(gp_result.errors)
 
@@ -550,7 +659,7 @@ def load_apim_compressed_audio(packet: api_m.RedvoxPacketM) -> Optional[SensorDa
 
 
 def load_apim_compressed_audio_from_list(
-        packets: List[api_m.RedvoxPacketM], gaps: List[Tuple[float, float]]
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
 ) -> Optional[SensorData]:
     """
     load compressed audio data from a list of redvox packets
@@ -559,14 +668,23 @@ def load_apim_compressed_audio_from_list(
     :param gaps: the list of non-inclusive start and end times of the gaps in the packets
     :return: compressed audio sensor data if it exists, None otherwise
     """
-    data_list = [[], [], []]
-    for packet in packets:
-        if __has_sensor(packet, __COMPRESSED_AUDIO_FIELD_NAME):
-            comp_audio = packet.sensors.compressed_audio
-            data_list[0].append(comp_audio.first_sample_timestamp)
-            data_list[1].append(comp_audio.audio_bytes)
-            data_list[2].append(comp_audio.audio_codec)
+    return __load_from_list(packets, gaps, _new_sensor_buffer(SensorType.COMPRESSED_AUDIO))
+
+
+def __add_compressed_audio(
+        buffer: _SensorBuffer,
+        packet: api_m.RedvoxPacketM,
+        comp_audio: api_m.RedvoxPacketM.Sensors.CompressedAudio
+):
+    buffer.data_list[0].append(comp_audio.first_sample_timestamp)
+    buffer.data_list[1].append(comp_audio.audio_bytes)
+    buffer.data_list[2].append(comp_audio.audio_codec)
+
 
+def __build_compressed_audio(
+        buffer: _SensorBuffer, packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
+) -> Optional[SensorData]:
+    data_list = buffer.data_list
     if len(data_list[0]) > 0:
         data_df = gpu.fill_gaps(
             pd.DataFrame(
@@ -580,7 +698,7 @@ def load_apim_compressed_audio_from_list(
         data_df["audio_codec"] = [d for d in data_df["audio_codec"]]
         sample_rate_hz = packets[0].sensors.compressed_audio.sample_rate
         return SensorData(
-            get_sensor_description_list(packets, SensorType.COMPRESSED_AUDIO),
+            buffer.description,
             data_df,
             SensorType.COMPRESSED_AUDIO,
             sample_rate_hz,
@@ -624,7 +742,7 @@ def load_apim_image(packet: api_m.RedvoxPacketM) -> Optional[SensorData]:
 
 
 def load_apim_image_from_list(
-        packets: List[api_m.RedvoxPacketM], gaps: List[Tuple[float, float]]
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
 ) -> Optional[SensorData]:
     """
     load image data from a list of redvox packets
@@ -633,19 +751,26 @@ def load_apim_image_from_list(
     :param gaps: the list of non-inclusive start and end times of the gaps in the packets
     :return: image sensor data if it exists, None otherwise
     """
-    data_list: List[List[float]] = [[], [], []]
-    for packet in packets:
-        if __has_sensor(packet, __IMAGE_FIELD_NAME):
-            image_sensor = packet.sensors.image
+    return __load_from_list(packets, gaps, _new_sensor_buffer(SensorType.IMAGE))
 
-            data_list[0].extend(image_sensor.timestamps.timestamps)
-            data_list[1].extend(image_sensor.samples)
-            data_list[2].extend(
-                [
-                    image_sensor.image_codec
-                    for i in range(len(image_sensor.timestamps.timestamps))
-                ]
-            )
+
+def __add_image(
+        buffer: _SensorBuffer, packet: api_m.RedvoxPacketM, image_sensor: api_m.RedvoxPacketM.Sensors.Image
+):
+    buffer.data_list[0].extend(image_sensor.timestamps.timestamps)
+    buffer.data_list[1].extend(image_sensor.samples)
+    buffer.data_list[2].extend(
+        [
+            image_sensor.image_codec
+            for i in range(len(image_sensor.timestamps.timestamps))
+        ]
+    )
+
+
+def __build_image(
+        buffer: _SensorBuffer, packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
+) -> Optional[SensorData]:
+    data_list = buffer.data_list
     if len(data_list[0]) > 0:
         # image is collected 1 per packet or 1 per second
         sample_rate, sample_interval, sample_interval_std = __stats_for_sensor_per_packet_per_second(
@@ -661,7 +786,7 @@ def load_apim_image_from_list(
         df["unaltered_timestamps"] = df["unaltered_timestamps"].astype(float)
         df["image_codec"] = df["image_codec"].astype(float)
         return SensorData(
-            get_sensor_description_list(packets, SensorType.IMAGE),
+            buffer.description,
             gpu.fill_gaps(
                 df,
                 gaps,
@@ -732,7 +857,7 @@ def load_apim_best_location(packet: api_m.RedvoxPacketM) -> Optional[SensorData]
 
 
 def load_apim_best_location_from_list(
-        packets: List[api_m.RedvoxPacketM], gaps: List[Tuple[float, float]]
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
 ) -> Optional[SensorData]:
     """
     load best location data from a list of redvox packets
@@ -741,38 +866,48 @@ def load_apim_best_location_from_list(
     :param gaps: the list of non-inclusive start and end times of the gaps in the packets
     :return: best location sensor data if it exists, None otherwise
     """
-    data_list: List[List[float]] = [[], [], [], [], [], [], [], [], [], [], [], [], []]
-    loc_stats = StatsContainer("location_sensor")
-    for packet in packets:
-        if __has_sensor(packet, __LOCATION_FIELD_NAME):
-            loc: api_m.RedvoxPacketM.Sensors.Location = packet.sensors.location
-            if loc.HasField("last_best_location") or loc.HasField("overall_best_location"):
-                best_loc: api_m.RedvoxPacketM.Sensors.Location.BestLocation
-                if loc.HasField("last_best_location"):
-                    best_loc = loc.last_best_location
-                else:
-                    best_loc = loc.overall_best_location
-                data_list[0].append(packet.timing_information.packet_start_mach_timestamp)
-                data_list[1].append(best_loc.latitude_longitude_timestamp.mach)
-                data_list[2].append(best_loc.latitude_longitude_timestamp.gps)
-                data_list[3].append(best_loc.latitude)
-                data_list[4].append(best_loc.longitude)
-                data_list[5].append(best_loc.altitude)
-                data_list[6].append(best_loc.speed)
-                data_list[7].append(best_loc.bearing)
-                data_list[8].append(best_loc.horizontal_accuracy)
-                data_list[9].append(best_loc.vertical_accuracy)
-                data_list[10].append(best_loc.speed_accuracy)
-                data_list[11].append(best_loc.bearing_accuracy)
-                data_list[12].append(best_loc.location_provider)
-                loc_stats.add(__packet_duration_us(packet), 0, 1)
+    return __load_from_list(packets, gaps, _new_sensor_buffer(SensorType.BEST_LOCATION))
+
+
+def __add_best_location(
+        buffer: _SensorBuffer, packet: api_m.RedvoxPacketM, loc: api_m.RedvoxPacketM.Sensors.Location
+):
+    if loc.HasField("last_best_location") or loc.HasField("overall_best_location"):
+        best_loc: api_m.RedvoxPacketM.Sensors.Location.BestLocation
+        if loc.HasField("last_best_location"):
+            best_loc = loc.last_best_location
+        else:
+            best_loc = loc.overall_best_location
+        data_list = buffer.data_list
+        data_list[0].append(packet.timing_information.packet_start_mach_timestamp)
+        data_list[1].append(best_loc.latitude_longitude_timestamp.mach)
+        data_list[2].append(best_loc.latitude_longitude_timestamp.gps)
+        data_list[3].append(best_loc.latitude)
+        data_list[4].append(best_loc.longitude)
+        data_list[5].append(best_loc.altitude)
+        data_list[6].append(best_loc.speed)
+        data_list[7].append(best_loc.bearing)
+        data_list[8].append(best_loc.horizontal_accuracy)
+        data_list[9].append(best_loc.vertical_accuracy)
+        data_list[10].append(best_loc.speed_accuracy)
+        data_list[11].append(best_loc.bearing_accuracy)
+        data_list[12].append(best_loc.location_provider)
+        buffer.stats.add(__packet_duration_us(packet), 0, 1)
+
+
+def __build_best_location(
+        buffer: _SensorBuffer, packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
+) -> Optional[SensorData]:
+    data_list = buffer.data_list
     if len(data_list[0]) > 0:
         return SensorData(
-            get_sensor_description_list(packets, SensorType.BEST_LOCATION),
+            buffer.description,
             gpu.fill_gaps(
-                pd.DataFrame(np.transpose(data_list), columns=LOCATION_COLUMNS),
+                pd.DataFrame(
+                    {c: np.array(v, dtype=float) for c, v in zip(LOCATION_COLUMNS, data_list)}
+                ),
                 gaps,
-                loc_stats.mean_of_means(),
+                buffer.stats.mean_of_means(),
                 True,
             ),
             SensorType.BEST_LOCATION,
@@ -780,6 +915,30 @@ def load_apim_best_location_from_list(
         )
 
 
+def __location_columns(
+        loc: api_m.RedvoxPacketM.Sensors.Location, num_samples: int, provider_default: float
+) -> List[np.ndarray]:
+    """
+    :param loc: the location sensor to read
+    :param num_samples: the number of timestamps in the sensor
+    :param provider_default: value to use for missing location providers
+    :return: the location columns after the timestamps, each padded to num_samples with np.nan
+    """
+    return [
+        __padded_array(loc.timestamps_gps.timestamps, num_samples),
+        __padded_array(loc.latitude_samples.values, num_samples),
+        __padded_array(loc.longitude_samples.values, num_samples),
+        __padded_array(loc.altitude_samples.values, num_samples),
+        __padded_array(loc.speed_samples.values, num_samples),
+        __padded_array(loc.bearing_samples.values, num_samples),
+        __padded_array(loc.horizontal_accuracy_samples.values, num_samples),
+        __padded_array(loc.vertical_accuracy_samples.values, num_samples),
+        __padded_array(loc.speed_accuracy_samples.values, num_samples),
+        __padded_array(loc.bearing_accuracy_samples.values, num_samples),
+        __padded_array(loc.location_providers, num_samples, provider_default),
+    ]
+
+
 def load_apim_location(packet: api_m.RedvoxPacketM) -> Optional[SensorData]:
     """
     load location data from a single packet
@@ -789,40 +948,13 @@ def load_apim_location(packet: api_m.RedvoxPacketM) -> Optional[SensorData]:
     """
     if __has_sensor(packet, __LOCATION_FIELD_NAME):
         loc: api_m.RedvoxPacketM.Sensors.Location = packet.sensors.location
-        timestamps = loc.timestamps.timestamps
-        if len(timestamps) > 0:
-            gps_timestamps = loc.timestamps_gps.timestamps
-            lat_samples = loc.latitude_samples.values
-            lon_samples = loc.longitude_samples.values
-            alt_samples = loc.altitude_samples.values
-            spd_samples = loc.speed_samples.values
-            bear_samples = loc.bearing_samples.values
-            hor_acc_samples = loc.horizontal_accuracy_samples.values
-            vert_acc_samples = loc.vertical_accuracy_samples.values
-            spd_acc_samples = loc.speed_accuracy_samples.values
-            bear_acc_samples = loc.bearing_accuracy_samples.values
-            loc_prov_samples = loc.location_providers
-            data_for_df = []
-            for i in range(len(timestamps)):
-                new_entry = [
-                    timestamps[i],
-                    timestamps[i],
-                    np.nan if len(gps_timestamps) <= i else gps_timestamps[i],
-                    lat_samples[i],
-                    lon_samples[i],
-                    np.nan if len(alt_samples) <= i else alt_samples[i],
-                    np.nan if len(spd_samples) <= i else spd_samples[i],
-                    np.nan if len(bear_samples) <= i else bear_samples[i],
-                    np.nan if len(hor_acc_samples) <= i else hor_acc_samples[i],
-                    np.nan if len(vert_acc_samples) <= i else vert_acc_samples[i],
-                    np.nan if len(spd_acc_samples) <= i else spd_acc_samples[i],
-                    np.nan if len(bear_acc_samples) <= i else bear_acc_samples[i],
-                    np.nan if len(loc_prov_samples) <= i else loc_prov_samples[i],
-                ]
-                data_for_df.append(new_entry)
-        else:
+        timestamps = np.array(loc.timestamps.timestamps, dtype=float)
+        if len(timestamps) < 1:
             return None
-        data_df = pd.DataFrame(data_for_df, columns=LOCATION_COLUMNS)
+        data_df = pd.DataFrame(
+            dict(zip(LOCATION_COLUMNS, [timestamps, timestamps.copy()]
+                     + __location_columns(loc, len(timestamps), np.nan)))
+        )
         sample_rate, sample_interval, sample_interval_std = get_sample_statistics(
             data_df
         )
@@ -839,7 +971,7 @@ def load_apim_location(packet: api_m.RedvoxPacketM) -> Optional[SensorData]:
 
 
 def load_apim_location_from_list(
-        packets: List[api_m.RedvoxPacketM], gaps: List[Tuple[float, float]]
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
 ) -> Optional[SensorData]:
     """
     load location data from a list of redvox packets
@@ -848,77 +980,38 @@ def load_apim_location_from_list(
     :param gaps: the list of non-inclusive start and end times of the gaps in the packets
     :return: location sensor data if it exists, None otherwise
     """
-    data_list: List[List[float]] = [[], [], [], [], [], [], [], [], [], [], [], []]
-    loc_stats = StatsContainer("location_sensor")
-    for packet in packets:
-        if __has_sensor(packet, __LOCATION_FIELD_NAME):
-            loc: api_m.RedvoxPacketM.Sensors.Location = packet.sensors.location
-
-            num_samples = len(loc.timestamps.timestamps)
-            if num_samples > 0:
-                samples = loc.timestamps.timestamps
-                data_list[0].extend(samples)
-                if num_samples == 1:
-                    loc_stats.add(
-                        __packet_duration_us(packet),
-                        0,
-                        1,
-                    )
-                else:
-                    loc_stats.add(
-                        np.mean(np.diff(samples)),
-                        np.std(np.diff(samples)),
-                        num_samples - 1,
-                        )
-                for i in range(num_samples):
-                    samples = loc.timestamps_gps.timestamps
-                    data_list[1].append(np.nan if len(samples) <= i else samples[i])
-                    samples = loc.latitude_samples.values
-                    data_list[2].append(samples[i])
-                    samples = loc.longitude_samples.values
-                    data_list[3].append(samples[i])
-                    samples = loc.altitude_samples.values
-                    data_list[4].append(
-                        np.nan if len(samples) < i + 1 else samples[i]
-                    )
-                    samples = loc.speed_samples.values
-                    data_list[5].append(
-                        np.nan if len(samples) < i + 1 else samples[i]
-                    )
-                    samples = loc.bearing_samples.values
-                    data_list[6].append(
-                        np.nan if len(samples) < i + 1 else samples[i]
-                    )
-                    samples = loc.horizontal_accuracy_samples.values
-                    data_list[7].append(
-                        np.nan if len(samples) < i + 1 else samples[i]
-                    )
-                    samples = loc.vertical_accuracy_samples.values
-                    data_list[8].append(
-                        np.nan if len(samples) < i + 1 else samples[i]
-                    )
-                    samples = loc.speed_accuracy_samples.values
-                    data_list[9].append(
-                        np.nan if len(samples) < i + 1 else samples[i]
-                    )
-                    samples = loc.bearing_accuracy_samples.values
-                    data_list[10].append(
-                        np.nan if len(samples) < i + 1 else samples[i]
-                    )
-                    samples = list(loc.location_providers)
-                    data_list[11].append(
-                        api_m.RedvoxPacketM.Sensors.Location.LocationProvider.UNKNOWN
-                        if len(samples) < i + 1
-                        else samples[i]
-                    )
-    if len(data_list[0]) > 0:
-        data_list.insert(1, data_list[0].copy())
+    return __load_from_list(packets, gaps, _new_sensor_buffer(SensorType.LOCATION))
+
+
+def __add_location(
+        buffer: _SensorBuffer, packet: api_m.RedvoxPacketM, loc: api_m.RedvoxPacketM.Sensors.Location
+):
+    timestamps = np.array(loc.timestamps.timestamps, dtype=float)
+    num_samples = len(timestamps)
+    if num_samples > 0:
+        if num_samples == 1:
+            buffer.stats.add(__packet_duration_us(packet), 0, 1)
+        else:
+            buffer.stats.add(np.mean(np.diff(timestamps)), np.std(np.diff(timestamps)), num_samples - 1)
+        columns = [timestamps] + __location_columns(
+            loc, num_samples, api_m.RedvoxPacketM.Sensors.Location.LocationProvider.UNKNOWN
+        )
+        for data, column in zip(buffer.data_list, columns):
+            data.append(column)
+
+
+def __build_location(
+        buffer: _SensorBuffer, packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
+) -> Optional[SensorData]:
+    if len(buffer.data_list[0]) > 0:
+        columns = [np.concatenate(data) for data in buffer.data_list]
+        columns.insert(1, columns[0].copy())
         return SensorData(
-            get_sensor_description_list(packets, SensorType.LOCATION),
+            buffer.description,
             gpu.fill_gaps(
-                pd.DataFrame(np.transpose(data_list), columns=LOCATION_COLUMNS),
+                pd.DataFrame(dict(zip(LOCATION_COLUMNS, columns))),
                 gaps,
-                loc_stats.mean_of_means(),
+                buffer.stats.mean_of_means(),
                 True,
             ),
             SensorType.LOCATION,
@@ -954,35 +1047,40 @@ def load_single(
 
 def load_single_from_list(
         packets: List[api_m.RedvoxPacketM],
-        gaps: List[Tuple[float, float]],
+        gaps: Iterable[Tuple[float, float]],
         sensor_type: SensorType,
 ) -> Optional[SensorData]:
-    field_name: str = __SENSOR_TYPE_TO_FIELD_NAME[sensor_type]
-    data_list: List[float] = []
-    timestamps: List[float] = []
-    sensor_stats: StatsContainer = StatsContainer(f"{field_name}_sensor")
-    sensor_fn: Optional[
-        Callable[[api_m.RedvoxPacketM], Sensor]
-    ] = __SENSOR_TYPE_TO_SENSOR_FN[sensor_type]
-    for packet in packets:
-        if __has_sensor(packet, field_name) and sensor_fn is not None:
-            sensor: api_m.RedvoxPacketM.Sensors.Single = sensor_fn(packet)
-            data_list.extend(sensor.samples.values)
-            ts = sensor.timestamps.timestamps
-            timestamps.extend(ts)
-            if len(sensor.timestamps.timestamps) == 1:
-                sensor_stats.add(__packet_duration_us(packet), 0, 1)
-            else:
-                sensor_stats.add(np.mean(np.diff(ts)), np.std(np.diff(ts)), len(ts) - 1)
-    if len(data_list) > 0:
+    return __load_from_list(
+        packets,
+        gaps,
+        _SensorBuffer(sensor_type, __SENSOR_TYPE_TO_FIELD_NAME[sensor_type], 2, __add_single, __build_single),
+    )
+
+
+def __add_single(
+        buffer: _SensorBuffer, packet: api_m.RedvoxPacketM, sensor: api_m.RedvoxPacketM.Sensors.Single
+):
+    ts = sensor.timestamps.timestamps
+    buffer.data_list[0].extend(ts)
+    buffer.data_list[1].extend(sensor.samples.values)
+    if len(ts) == 1:
+        buffer.stats.add(__packet_duration_us(packet), 0, 1)
+    else:
+        buffer.stats.add(np.mean(np.diff(ts)), np.std(np.diff(ts)), len(ts) - 1)
+
+
+def __build_single(
+        buffer: _SensorBuffer, packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
+) -> Optional[SensorData]:
+    if len(buffer.data_list[1]) > 0:
         return load_apim_single_sensor_from_list(
-            sensor_type,
-            timestamps,
-            data_list,
+            buffer.sensor_type,
+            buffer.data_list[0],
+            buffer.data_list[1],
             gaps,
-            field_name,
-            get_sensor_description_list(packets, sensor_type),
-            sensor_stats.mean_of_means(),
+            buffer.field_name,
+            buffer.description,
+            buffer.stats.mean_of_means(),
         )
     return None
 
@@ -998,7 +1096,7 @@ def load_apim_pressure(packet: api_m.RedvoxPacketM) -> Optional[SensorData]:
 
 
 def load_apim_pressure_from_list(
-        packets: List[api_m.RedvoxPacketM], gaps: List[Tuple[float, float]]
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
 ) -> Optional[SensorData]:
     """
     load pressure data from a list of redvox packets
@@ -1025,7 +1123,7 @@ def load_apim_light(packet: api_m.RedvoxPacketM) -> Optional[SensorData]:
 
 
 def load_apim_light_from_list(
-        packets: List[api_m.RedvoxPacketM], gaps: List[Tuple[float, float]]
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
 ) -> Optional[SensorData]:
     """
     load light data from a list of redvox packets
@@ -1052,7 +1150,7 @@ def load_apim_proximity(packet: api_m.RedvoxPacketM) -> Optional[SensorData]:
 
 
 def load_apim_proximity_from_list(
-        packets: List[api_m.RedvoxPacketM], gaps: List[Tuple[float, float]]
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
 ) -> Optional[SensorData]:
     """
     load proximity data from a list of redvox packets
@@ -1084,7 +1182,7 @@ def load_apim_ambient_temp(
 
 
 def load_apim_ambient_temp_from_list(
-        packets: List[api_m.RedvoxPacketM], gaps: List[Tuple[float, float]]
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
 ) -> Optional[SensorData]:
     """
     load ambient temperature data from a list of redvox packets
@@ -1116,7 +1214,7 @@ def load_apim_rel_humidity(
 
 
 def load_apim_rel_humidity_from_list(
-        packets: List[api_m.RedvoxPacketM], gaps: List[Tuple[float, float]]
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
 ) -> Optional[SensorData]:
     """
     load relative humidity data from a list of redvox packets
@@ -1159,37 +1257,41 @@ def load_xyz(
 
 def load_xyz_from_list(
         packets: List[api_m.RedvoxPacketM],
-        gaps: List[Tuple[float, float]],
+        gaps: Iterable[Tuple[float, float]],
         sensor_type: SensorType,
 ) -> Optional[SensorData]:
-    field_name: str = __SENSOR_TYPE_TO_FIELD_NAME[sensor_type]
-    data_list: List[List[float]] = [[], [], [], []]
-    sensor_stats: StatsContainer = StatsContainer(f"{field_name}_sensor")
-    packet: api_m.RedvoxPacketM
-    sensor_fn: Optional[
-        Callable[[api_m.RedvoxPacketM], Sensor]
-    ] = __SENSOR_TYPE_TO_SENSOR_FN[sensor_type]
-    for packet in packets:
-        if __has_sensor(packet, field_name) and sensor_fn is not None:
-            sensor: api_m.RedvoxPacketM.Sensors.Xyz = sensor_fn(packet)
-
-            ts = sensor.timestamps.timestamps
-            data_list[0].extend(ts)
-            data_list[1].extend(sensor.x_samples.values)
-            data_list[2].extend(sensor.y_samples.values)
-            data_list[3].extend(sensor.z_samples.values)
-            if len(sensor.timestamps.timestamps) == 1:
-                sensor_stats.add(__packet_duration_us(packet), 0, 1)
-            else:
-                sensor_stats.add(np.mean(np.diff(ts)), np.std(np.diff(ts)), len(ts) - 1)
-    if len(data_list[0]) > 0:
+    return __load_from_list(
+        packets,
+        gaps,
+        _SensorBuffer(sensor_type, __SENSOR_TYPE_TO_FIELD_NAME[sensor_type], 4, __add_xyz, __build_xyz),
+    )
+
+
+def __add_xyz(
+        buffer: _SensorBuffer, packet: api_m.RedvoxPacketM, sensor: api_m.RedvoxPacketM.Sensors.Xyz
+):
+    ts = sensor.timestamps.timestamps
+    buffer.data_list[0].extend(ts)
+    buffer.data_list[1].extend(sensor.x_samples.values)
+    buffer.data_list[2].extend(sensor.y_samples.values)
+    buffer.data_list[3].extend(sensor.z_samples.values)
+    if len(ts) == 1:
+        buffer.stats.add(__packet_duration_us(packet), 0, 1)
+    else:
+        buffer.stats.add(np.mean(np.diff(ts)), np.std(np.diff(ts)), len(ts) - 1)
+
+
+def __build_xyz(
+        buffer: _SensorBuffer, packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
+) -> Optional[SensorData]:
+    if len(buffer.data_list[0]) > 0:
         return load_apim_xyz_sensor_from_list(
-            sensor_type,
-            data_list,
+            buffer.sensor_type,
+            buffer.data_list,
             gaps,
-            field_name,
-            get_sensor_description_list(packets, sensor_type),
-            sensor_stats.mean_of_means(),
+            buffer.field_name,
+            buffer.description,
+            buffer.stats.mean_of_means(),
         )
     return None
 
@@ -1210,7 +1312,7 @@ def load_apim_accelerometer(
 
 
 def load_apim_accelerometer_from_list(
-        packets: List[api_m.RedvoxPacketM], gaps: List[Tuple[float, float]]
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
 ) -> Optional[SensorData]:
     """
     load accelerometer data from a list of redvox packets
@@ -1242,7 +1344,7 @@ def load_apim_magnetometer(
 
 
 def load_apim_magnetometer_from_list(
-        packets: List[api_m.RedvoxPacketM], gaps: List[Tuple[float, float]]
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
 ) -> Optional[SensorData]:
     """
     load magnetometer data from a list of redvox packets
@@ -1269,7 +1371,7 @@ def load_apim_gyroscope(packet: api_m.RedvoxPacketM) -> Optional[SensorData]:
 
 
 def load_apim_gyroscope_from_list(
-        packets: List[api_m.RedvoxPacketM], gaps: List[Tuple[float, float]]
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
 ) -> Optional[SensorData]:
     """
     load gyroscope data from a list of redvox packets
@@ -1296,7 +1398,7 @@ def load_apim_gravity(packet: api_m.RedvoxPacketM) -> Optional[SensorData]:
 
 
 def load_apim_gravity_from_list(
-        packets: List[api_m.RedvoxPacketM], gaps: List[Tuple[float, float]]
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
 ) -> Optional[SensorData]:
     """
     load gravity data from a list of redvox packets
@@ -1326,7 +1428,7 @@ def load_apim_orientation(packet: api_m.RedvoxPacketM) -> Optional[SensorData]:
 
 
 def load_apim_orientation_from_list(
-        packets: List[api_m.RedvoxPacketM], gaps: List[Tuple[float, float]]
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
 ) -> Optional[SensorData]:
     """
     load orientation data from a list of redvox packets
@@ -1358,7 +1460,7 @@ def load_apim_linear_accel(
 
 
 def load_apim_linear_accel_from_list(
-        packets: List[api_m.RedvoxPacketM], gaps: List[Tuple[float, float]]
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
 ) -> Optional[SensorData]:
     """
     load linear acceleration data from a list of redvox packets
@@ -1390,7 +1492,7 @@ def load_apim_rotation_vector(
 
 
 def load_apim_rotation_vector_from_list(
-        packets: List[api_m.RedvoxPacketM], gaps: List[Tuple[float, float]]
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
 ) -> Optional[SensorData]:
     """
     load rotation vector data from a list of redvox packets
@@ -1406,6 +1508,38 @@ def load_apim_rotation_vector_from_list(
     )
 
 
+def __health_columns(
+        metrics: api_m.RedvoxPacketM.StationInformation.StationMetrics, num_samples: int, fill_enums: bool
+) -> List[np.ndarray]:
+    """
+    :param metrics: the station metrics to read
+    :param num_samples: the number of timestamps in the metrics
+    :param fill_enums: if True, missing enumerated values are set to the unknown value of the enumeration,
+                        otherwise missing values are np.nan
+    :return: the station health columns after the timestamps, each padded to num_samples
+    """
+    return [
+        __padded_array(metrics.battery.values, num_samples),
+        __padded_array(metrics.battery_current.values, num_samples),
+        __padded_array(metrics.temperature.values, num_samples),
+        __padded_array(metrics.network_type, num_samples,
+                       NetworkType["UNKNOWN_NETWORK"].value if fill_enums else np.nan),
+        __padded_array(metrics.network_strength.values, num_samples),
+        __padded_array(metrics.power_state, num_samples,
+                       PowerState["UNKNOWN_POWER_STATE"].value if fill_enums else np.nan),
+        __padded_array(metrics.available_ram.values, num_samples),
+        __padded_array(metrics.available_disk.values, num_samples),
+        __padded_array(metrics.cell_service_state, num_samples,
+                       CellServiceState["UNKNOWN"].value if fill_enums else np.nan),
+        __padded_array(metrics.cpu_utilization.values, num_samples),
+        __padded_array(metrics.wifi_wake_lock, num_samples,
+                       WifiWakeLock["OTHER"].value if fill_enums else np.nan),
+        __padded_array(metrics.screen_state, num_samples,
+                       ScreenState["UNKNOWN_SCREEN_STATE"].value if fill_enums else np.nan),
+        __padded_array(metrics.screen_brightness.values, num_samples),
+    ]
+
+
 def load_apim_health(packet: api_m.RedvoxPacketM) -> Optional[SensorData]:
     """
     load station health data from a single redvox packet
@@ -1416,44 +1550,11 @@ def load_apim_health(packet: api_m.RedvoxPacketM) -> Optional[SensorData]:
     metrics: api_m.RedvoxPacketM.StationInformation.StationMetrics = (
         packet.station_information.station_metrics
     )
-    timestamps = metrics.timestamps.timestamps
+    timestamps = np.array(metrics.timestamps.timestamps, dtype=float)
     if len(timestamps) > 0:
-        bat_samples = metrics.battery.values
-        bat_cur_samples = metrics.battery_current.values
-        temp_samples = metrics.temperature.values
-        net_samples = metrics.network_type
-        net_str_samples = metrics.network_strength.values
-        pow_samples = metrics.power_state
-        avail_ram_samples = metrics.available_ram.values
-        avail_disk_samples = metrics.available_disk.values
-        cell_samples = metrics.cell_service_state
-        cpu_util_samples = metrics.cpu_utilization.values
-        wake_lock_samples = metrics.wifi_wake_lock
-        screen_state_samples = metrics.screen_state
-        screen_bright_samples = metrics.screen_brightness.values
-        data_for_df = []
-        for i in range(len(timestamps)):
-            new_entry = [
-                timestamps[i],
-                timestamps[i],
-                np.nan if len(bat_samples) < i + 1 else bat_samples[i],
-                np.nan if len(bat_cur_samples) < i + 1 else bat_cur_samples[i],
-                np.nan if len(temp_samples) < i + 1 else temp_samples[i],
-                np.nan if len(net_samples) < i + 1 else net_samples[i],
-                np.nan if len(net_str_samples) < i + 1 else net_str_samples[i],
-                np.nan if len(pow_samples) < i + 1 else pow_samples[i],
-                np.nan if len(avail_ram_samples) < i + 1 else avail_ram_samples[i],
-                np.nan if len(avail_disk_samples) < i + 1 else avail_disk_samples[i],
-                np.nan if len(cell_samples) < i + 1 else cell_samples[i],
-                np.nan if len(cpu_util_samples) < i + 1 else cpu_util_samples[i],
-                np.nan if len(wake_lock_samples) < i + 1 else wake_lock_samples[i],
-                np.nan if len(screen_state_samples) < i + 1 else screen_state_samples[i],
-                np.nan if len(screen_bright_samples) < i + 1 else screen_bright_samples[i],
-            ]
-            data_for_df.append(new_entry)
         data_df = pd.DataFrame(
-            data_for_df,
-            columns=STATION_HEALTH_COLUMNS,
+            dict(zip(STATION_HEALTH_COLUMNS, [timestamps, timestamps.copy()]
+                     + __health_columns(metrics, len(timestamps), False)))
         )
         # health is collected 1 per packet or 1 per second
         sample_rate, sample_interval, sample_interval_std = __stats_for_sensor_per_packet_per_second(
@@ -1472,7 +1573,7 @@ def load_apim_health(packet: api_m.RedvoxPacketM) -> Optional[SensorData]:
 
 
 def load_apim_health_from_list(
-        packets: List[api_m.RedvoxPacketM], gaps: List[Tuple[float, float]]
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
 ) -> Optional[SensorData]:
     """
     load station health data from a list of redvox packets
@@ -1481,50 +1582,34 @@ def load_apim_health_from_list(
     :param gaps: the list of non-inclusive start and end times of the gaps in the packets
     :return: station health sensor data if it exists, None otherwise
     """
-    data_list: List[List[float]] = [[], [], [], [], [], [], [], [], [], [], [], [], [], []]
-    for packet in packets:
-        metrics = packet.station_information.station_metrics
-        timestamps = metrics.timestamps.timestamps
-        num_samples = len(timestamps)
-        if num_samples > 0:
-            data_list[0].extend(timestamps)
-            samples = metrics.battery.values
-            data_list[1].extend(__fill_data_array(samples, num_samples, np.nan))
-            samples = metrics.battery_current.values
-            data_list[2].extend(__fill_data_array(samples, num_samples, np.nan))
-            samples = metrics.temperature.values
-            data_list[3].extend(__fill_data_array(samples, num_samples, np.nan))
-            samples = metrics.network_type
-            data_list[4].extend(__fill_data_array(samples, num_samples, NetworkType["UNKNOWN_NETWORK"].value))
-            samples = metrics.network_strength.values
-            data_list[5].extend(__fill_data_array(samples, num_samples, np.nan))
-            samples = metrics.power_state
-            data_list[6].extend(__fill_data_array(samples, num_samples, PowerState["UNKNOWN_POWER_STATE"].value))
-            samples = metrics.available_ram.values
-            data_list[7].extend(__fill_data_array(samples, num_samples, np.nan))
-            samples = metrics.available_disk.values
-            data_list[8].extend(__fill_data_array(samples, num_samples, np.nan))
-            samples = metrics.cell_service_state
-            data_list[9].extend(__fill_data_array(samples, num_samples, CellServiceState["UNKNOWN"].value))
-            samples = metrics.cpu_utilization.values
-            data_list[10].extend(__fill_data_array(samples, num_samples, np.nan))
-            samples = metrics.wifi_wake_lock
-            data_list[11].extend(__fill_data_array(samples, num_samples, WifiWakeLock["OTHER"].value))
-            samples = metrics.screen_state
-            data_list[12].extend(__fill_data_array(samples, num_samples, ScreenState["UNKNOWN_SCREEN_STATE"].value))
-            samples = metrics.screen_brightness.values
-            data_list[13].extend(__fill_data_array(samples, num_samples, np.nan))
-    if len(data_list[0]) > 0:
-        data_list.insert(1, data_list[0].copy())
+    return __load_from_list(packets, gaps, _new_sensor_buffer(SensorType.STATION_HEALTH))
+
+
+def __add_health(
+        buffer: _SensorBuffer,
+        packet: api_m.RedvoxPacketM,
+        metrics: api_m.RedvoxPacketM.StationInformation.StationMetrics
+):
+    timestamps = np.array(metrics.timestamps.timestamps, dtype=float)
+    num_samples = len(timestamps)
+    if num_samples > 0:
+        columns = [timestamps] + __health_columns(metrics, num_samples, True)
+        for data, column in zip(buffer.data_list, columns):
+            data.append(column)
+
+
+def __build_health(
+        buffer: _SensorBuffer, packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]]
+) -> Optional[SensorData]:
+    if len(buffer.data_list[0]) > 0:
+        columns = [np.concatenate(data) for data in buffer.data_list]
+        columns.insert(1, columns[0].copy())
         # health is collected 1 per packet or 1 per second
         sample_rate, sample_interval, sample_interval_std = __stats_for_sensor_per_packet_per_second(
-            len(packets), __packet_duration_s(packets[0]), data_list[0]
+            len(packets), __packet_duration_s(packets[0]), columns[0]
         )
         df = gpu.fill_gaps(
-            pd.DataFrame(
-                np.transpose(data_list),
-                columns=STATION_HEALTH_COLUMNS,
-            ),
+            pd.DataFrame(dict(zip(STATION_HEALTH_COLUMNS, columns))),
             gaps,
             dtu.seconds_to_microseconds(sample_interval),
             True,
@@ -1539,3 +1624,143 @@ def load_apim_health_from_list(
             True
         )
     return None
+
+
+# Maps a sensor type read from a list of packets to the number of columns it reads and the functions that add a packet
+# to its buffer and build the sensor from its buffer.
+__SENSOR_TYPE_TO_BUFFER_FNS: Dict[SensorType, Tuple[int, Callable, Callable]] = {
+    SensorType.COMPRESSED_AUDIO: (3, __add_compressed_audio, __build_compressed_audio),
+    SensorType.IMAGE: (3, __add_image, __build_image),
+    SensorType.BEST_LOCATION: (13, __add_best_location, __build_best_location),
+    SensorType.LOCATION: (12, __add_location, __build_location),
+    SensorType.PRESSURE: (2, __add_single, __build_single),
+    SensorType.LIGHT: (2, __add_single, __build_single),
+    SensorType.AMBIENT_TEMPERATURE: (2, __add_single, __build_single),
+    SensorType.RELATIVE_HUMIDITY: (2, __add_single, __build_single),
+    SensorType.PROXIMITY: (2, __add_single, __build_single),
+    SensorType.INFRARED: (2, __add_single, __build_single),
+    SensorType.ACCELEROMETER: (4, __add_xyz, __build_xyz),
+    SensorType.GYROSCOPE: (4, __add_xyz, __build_xyz),
+    SensorType.MAGNETOMETER: (4, __add_xyz, __build_xyz),
+    SensorType.GRAVITY: (4, __add_xyz, __build_xyz),
+    SensorType.LINEAR_ACCELERATION: (4, __add_xyz, __build_xyz),
+    SensorType.ORIENTATION: (4, __add_xyz, __build_xyz),
+    SensorType.ROTATION_VECTOR: (4, __add_xyz, __build_xyz),
+    SensorType.STATION_HEALTH: (14, __add_health, __build_health),
+}
+
+# The sensors other than audio read from a list of packets, in the order they are added to a Station
+LIST_SENSOR_TYPES: List[SensorType] = [
+    SensorType.COMPRESSED_AUDIO,
+    SensorType.IMAGE,
+    SensorType.BEST_LOCATION,
+    SensorType.LOCATION,
+    SensorType.PRESSURE,
+    SensorType.LIGHT,
+    SensorType.AMBIENT_TEMPERATURE,
+    SensorType.RELATIVE_HUMIDITY,
+    SensorType.PROXIMITY,
+    SensorType.ACCELEROMETER,
+    SensorType.GYROSCOPE,
+    SensorType.MAGNETOMETER,
+    SensorType.GRAVITY,
+    SensorType.LINEAR_ACCELERATION,
+    SensorType.ORIENTATION,
+    SensorType.ROTATION_VECTOR,
+    SensorType.STATION_HEALTH,
+]
+
+
+def skipped_sensor_fields(sensor_types: Optional[Iterable[SensorType]] = None) -> Set[str]:
+    """
+    :param sensor_types: the types of sensors to load besides audio, or None to load all sensors, default None
+    :return: the names of the fields of RedvoxPacketM.Sensors that are not needed to load audio and sensor_types;
+                these fields can be left out when the packets are decoded
+    """
+    if sensor_types is None:
+        return set()
+    needed: Set[str] = {__AUDIO_FIELD_NAME} | {__SENSOR_TYPE_TO_FIELD_NAME[s] for s in sensor_types}
+    return {f for f in __SENSOR_TYPE_TO_FIELD_NAME.values() if f != "unknown"} - needed
+
+
+def _new_sensor_buffer(sensor_type: SensorType) -> _SensorBuffer:
+    """
+    :param sensor_type: the SensorType to read; must be in LIST_SENSOR_TYPES or be SensorType.INFRARED
+    :return: an empty buffer for the sensor_type
+    """
+    num_columns, add_fn, build_fn = __SENSOR_TYPE_TO_BUFFER_FNS[sensor_type]
+    field_name = None if sensor_type == SensorType.STATION_HEALTH else __SENSOR_TYPE_TO_FIELD_NAME[sensor_type]
+    return _SensorBuffer(sensor_type, field_name, num_columns, add_fn, build_fn)
+
+
+def load_apim_sensors_from_list(
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]],
+        dtype_policy: Optional[DtypePolicy] = None,
+        sensor_types: Optional[Iterable[SensorType]] = None
+) -> List[SensorData]:
+    """
+    load every sensor in LIST_SENSOR_TYPES, or only those in sensor_types, from a list of redvox packets.
+    the packets are read once, filling the buffers of each sensor present in the packet, and the sensors are created
+    after all packets are read.  The results are the same as calling each of the load_apim_*_from_list functions.
+
+    :param packets: packets with data to load
+    :param gaps: the list of non-inclusive start and end times of the gaps in the packets
+    :param dtype_policy: optional types to store the data channels of the sensors as, default None (float64)
+    :param sensor_types: optional types of the sensors to load; other sensors are not read.  default None (all)
+    :return: list of the sensors that exist in the packets, in the order of LIST_SENSOR_TYPES
+    """
+    selected = LIST_SENSOR_TYPES if sensor_types is None else set(sensor_types)
+    buffers: List[_SensorBuffer] = [_new_sensor_buffer(s) for s in LIST_SENSOR_TYPES if s in selected]
+    for packet in packets:
+        present = {field.name for field, _ in packet.sensors.ListFields()}
+        for buffer in buffers:
+            if buffer.field_name is None or buffer.field_name in present:
+                buffer.add(packet)
+    sensors: List[SensorData] = []
+    for buffer in buffers:
+        sensor = buffer.build(packets, gaps)
+        if sensor is not None:
+            # convert each sensor as it is built so its float64 arrays are released before the next is built
+            sensors.append(sensor if dtype_policy is None else dtype_policy.apply(sensor))
+    return sensors
+
+
+def load_apim_sensor_from_list(
+        packets: List[api_m.RedvoxPacketM], gaps: Iterable[Tuple[float, float]], sensor_type: SensorType,
+        dtype_policy: Optional[DtypePolicy] = None
+) -> Optional[SensorData]:
+    """
+    load a single sensor in LIST_SENSOR_TYPES from a list of redvox packets
+
+    :param packets: packets with data to load
+    :param gaps: the list of non-inclusive start and end times of the gaps in the packets
+    :param sensor_type: the SensorType of the sensor to load
+    :param dtype_policy: optional types to store the data channels of the sensor as, default None (float64)
+    :return: the sensor data if it exists, None otherwise
+    """
+    sensor = __load_from_list(packets, gaps, _new_sensor_buffer(sensor_type))
+    return sensor if sensor is None or dtype_policy is None else dtype_policy.apply(sensor)
+
+
+def list_sensor_types_in_packets(
+        packets: List[api_m.RedvoxPacketM], sensor_types: Optional[Iterable[SensorType]] = None
+) -> List[SensorType]:
+    """
+    find the sensors in LIST_SENSOR_TYPES, or only those in sensor_types, that are present in a list of redvox
+    packets without reading their data.  A sensor is present if any packet has its field set; station health is
+    present if any packet has station metrics timestamps.
+
+    :param packets: packets to check
+    :param sensor_types: optional types of the sensors to check for, default None (all)
+    :return: list of the sensors present in the packets, in the order of LIST_SENSOR_TYPES
+    """
+    present: Set[str] = set()
+    has_health: bool = False
+    for packet in packets:
+        present.update(field.name for field, _ in packet.sensors.ListFields())
+        has_health = has_health or len(packet.station_information.station_metrics.timestamps.timestamps) > 0
+    selected = LIST_SENSOR_TYPES if sensor_types is None else set(sensor_types)
+    return [
+        s for s in LIST_SENSOR_TYPES if s in selected
+        and (has_health if s == SensorType.STATION_HEALTH else __SENSOR_TYPE_TO_FIELD_NAME[s] in present)
+    ]
@@ -3,13 +3,12 @@ Defines generic station objects for API-independent analysis
 all timestamps are integers in microseconds unless otherwise stated
 Utilizes WrappedRedvoxPacketM (API M data packets) as the format of the data due to their versatility
 """
-from typing import List, Optional, Tuple
-from itertools import repeat
-from types import FunctionType
+from typing import Iterable, List, Optional, Set
 
 import numpy as np
 
 from redvox.common import sensor_data as sd
+from redvox.common import gap_and_pad_utils as gpu
 from redvox.common import sensor_reader_utils as sdru
 from redvox.common import station_utils as st_utils
 from redvox.common.timesync import TimeSyncAnalysis
@@ -40,7 +39,15 @@ class Station:
         timesync_analysis: TimeSyncAnalysis object, contains information about the station's timing values
         use_model_correction: bool, if True, time correction is done using OffsetModel functions, otherwise
         correction is done by adding the OffsetModel's best offset (intercept value).  default True
-        _gaps: List of Tuples of floats indicating start and end times of gaps.  Times are not inclusive of the gap.
+        dtype_policy: DtypePolicy, the types used to store the data channels of the sensors.  default float64 for all
+        sensors
+        sensor_types: optional set of SensorType, the sensors to load from packets besides audio, which is always
+        loaded.  default None (all sensors)
+        lazy: bool, if True, sensors other than audio are built from the packets the first time they are accessed.
+        default False
+        spill_policy: optional SpillPolicy, if set, the large columns of the sensors, usually audio and its
+        timestamps, are kept in memory-mapped files instead of in memory.  default None
+        _gaps: GapIntervals, the start and end times of the gaps in the audio.  Times are not inclusive of the gap.
     """
 
     def __init__(
@@ -50,6 +57,10 @@ class Station:
             uuid: str = None,
             start_time: float = np.nan,
             use_model_correction: bool = True,
+            dtype_policy: Optional[sd.DtypePolicy] = None,
+            sensor_types: Optional[Iterable[sd.SensorType]] = None,
+            lazy: bool = False,
+            spill_policy: Optional[sd.SpillPolicy] = None,
     ):
         """
         initialize Station
@@ -59,13 +70,26 @@ class Station:
         :param start_time: optional start time in microseconds since epoch UTC if no data packets, default np.nan
         :param use_model_correction: if True, use OffsetModel functions for time correction, add OffsetModel best offset
                                         (intercept value) otherwise.  Default True
-        """
-        self.data = []
+        :param dtype_policy: optional types to store the data channels of the sensors as, default None (float64)
+        :param sensor_types: optional types of the sensors to load from packets besides audio, default None (all)
+        :param lazy: if True, keep the data packets and build each sensor other than audio the first time it is
+                        accessed.  Default False
+        :param spill_policy: optional policy to keep the large columns of the sensors in memory-mapped files with,
+                                default None (kept in memory)
+        """
+        self._data: List[sd.SensorData] = []
         self.packet_metadata: List[st_utils.StationPacketMetadata] = []
         self.is_timestamps_updated = False
-        self._gaps: List[Tuple[float, float]] = []
+        self._gaps: gpu.GapIntervals = gpu.GapIntervals()
         self.errors: RedVoxExceptions = RedVoxExceptions("Station")
         self.use_model_correction = use_model_correction
+        self.dtype_policy: sd.DtypePolicy = sd.DtypePolicy() if dtype_policy is None else dtype_policy
+        self.sensor_types: Optional[Set[sd.SensorType]] = None if sensor_types is None else set(sensor_types)
+        self.lazy: bool = lazy
+        self.spill_policy: Optional[sd.SpillPolicy] = spill_policy
+        # the packets and types of the sensors that have not been built yet when lazy is True
+        self._lazy_packets: List[api_m.RedvoxPacketM] = []
+        self._unbuilt_sensor_types: List[sd.SensorType] = []
         if data_packets and st_utils.validate_station_key_list(data_packets, True):
             # noinspection Mypy
             self._load_metadata_from_packet(data_packets[0])
@@ -88,6 +112,43 @@ class Station:
             self.timesync_analysis = TimeSyncAnalysis()
         # self.errors.print()
 
+    @property
+    def data(self) -> List[sd.SensorData]:
+        """
+        :return: list of all sensors of the station; builds any sensor that has not been built yet
+        """
+        while self._unbuilt_sensor_types:
+            self._build_sensor(self._unbuilt_sensor_types[0])
+        return self._data
+
+    @data.setter
+    def data(self, data: List[sd.SensorData]):
+        """
+        :param data: list of sensors to replace the sensors of the station with
+        """
+        self._unbuilt_sensor_types = []
+        self._lazy_packets = []
+        self._data = data
+
+    def _build_sensor(self, sensor_type: sd.SensorType):
+        """
+        builds a sensor that has not been built yet from the packets and adds it to the station.
+        if the station's timestamps have already been updated, the sensor's timestamps are updated as well.
+        :param sensor_type: the type of sensor to build
+        """
+        self._unbuilt_sensor_types.remove(sensor_type)
+        sensor = sdru.load_apim_sensor_from_list(self._lazy_packets, self._gaps, sensor_type, self.dtype_policy)
+        if sensor is not None and self.spill_policy is not None:
+            self.spill_policy.apply(sensor)
+        if not self._unbuilt_sensor_types:
+            self._lazy_packets = []
+        if sensor is not None:
+            if self.is_timestamps_updated:
+                sensor.update_data_timestamps(self.timesync_analysis.offset_model, self.use_model_correction,
+                                              in_place=True)
+            self._data.append(sensor)
+            self.errors.extend_error(sensor.errors)
+
     def _load_metadata_from_packet(self, packet: api_m.RedvoxPacketM):
         """
         sets metadata that applies to the entire station from a single packet
@@ -231,16 +292,18 @@ class Station:
 
     def get_station_sensor_types(self) -> List[sd.SensorType]:
         """
-        :return: a list of sensor types in the station
+        :return: a list of sensor types in the station, including the sensors that have not been built yet
         """
-        return [s.type for s in self.data]
+        return [s.type for s in self._data] + self._unbuilt_sensor_types
 
     def get_sensor_by_type(self, sensor_type: sd.SensorType) -> Optional[sd.SensorData]:
         """
         :param sensor_type: type of sensor to get
         :return: the sensor of the type or None if it doesn't exist
         """
-        for s in self.data:
+        if sensor_type in self._unbuilt_sensor_types:
+            self._build_sensor(sensor_type)
+        for s in self._data:
             if s.type == sensor_type:
                 return s
         return None
@@ -251,8 +314,12 @@ class Station:
         :param sensor_data: the data to append
         """
         if sensor_data.type in self.get_station_sensor_types():
-            self.get_sensor_by_type(sensor_data.type).append_data(sensor_data.data_df)
+            # the appended data is converted to the types of the existing sensor when it is joined
+            self.get_sensor_by_type(sensor_data.type).append_data(sensor_data)
         else:
+            self.dtype_policy.apply(sensor_data)
+            if self.spill_policy is not None:
+                self.spill_policy.apply(sensor_data)
             self._add_sensor(sensor_data.type, sensor_data)
         self.errors.extend_error(sensor_data.errors)
 
@@ -261,8 +328,12 @@ class Station:
         removes a sensor from the sensor data dictionary if it exists
         :param sensor_type: the sensor to remove
         """
-        if sensor_type in self.get_station_sensor_types():
-            self.data.remove(self.get_sensor_by_type(sensor_type))
+        if sensor_type in self._unbuilt_sensor_types:
+            self._unbuilt_sensor_types.remove(sensor_type)
+            if not self._unbuilt_sensor_types:
+                self._lazy_packets = []
+        elif sensor_type in self.get_station_sensor_types():
+            self._data.remove(self.get_sensor_by_type(sensor_type))
 
     def _add_sensor(self, sensor_type: sd.SensorType, sensor: sd.SensorData):
         """
@@ -275,7 +346,7 @@ class Station:
                 f"Cannot add sensor type ({sensor_type.name}) that already exists in packet!"
             )
         else:
-            self.data.append(sensor)
+            self._data.append(sensor)
 
     def get_mean_packet_duration(self) -> float:
         """
@@ -958,40 +1029,29 @@ class Station:
         self.packet_metadata = [
             st_utils.StationPacketMetadata(packet) for packet in packets
         ]
-        sensor, self._gaps = sdru.load_apim_audio_from_list(packets)
+        sensor, gaps = sdru.load_apim_audio_from_list(packets, self.dtype_policy, self.spill_policy)
+        self._gaps = gpu.GapIntervals.from_list(gaps)
         if sensor:
             self.append_sensor(sensor)
-        funcs = [
-            sdru.load_apim_compressed_audio_from_list,
-            sdru.load_apim_image_from_list,
-            sdru.load_apim_best_location_from_list,
-            sdru.load_apim_location_from_list,
-            sdru.load_apim_pressure_from_list,
-            sdru.load_apim_light_from_list,
-            sdru.load_apim_ambient_temp_from_list,
-            sdru.load_apim_rel_humidity_from_list,
-            sdru.load_apim_proximity_from_list,
-            sdru.load_apim_accelerometer_from_list,
-            sdru.load_apim_gyroscope_from_list,
-            sdru.load_apim_magnetometer_from_list,
-            sdru.load_apim_gravity_from_list,
-            sdru.load_apim_linear_accel_from_list,
-            sdru.load_apim_orientation_from_list,
-            sdru.load_apim_rotation_vector_from_list,
-            sdru.load_apim_health_from_list,
-        ]
-        sensors = map(FunctionType.__call__, funcs, repeat(packets), repeat(self._gaps))
-        for sensor in sensors:
-            if sensor:
+        if self.lazy:
+            self._lazy_packets = packets
+            self._unbuilt_sensor_types = sdru.list_sensor_types_in_packets(packets, self.sensor_types)
+        else:
+            for sensor in sdru.load_apim_sensors_from_list(packets, self._gaps, self.dtype_policy, self.sensor_types):
                 self.append_sensor(sensor)
 
     @staticmethod
-    def from_packet(packet: api_m.RedvoxPacketM) -> "Station":
+    def from_packet(packet: api_m.RedvoxPacketM, dtype_policy: Optional[sd.DtypePolicy] = None,
+                    sensor_types: Optional[Iterable[sd.SensorType]] = None,
+                    spill_policy: Optional[sd.SpillPolicy] = None) -> "Station":
         start_time = packet.timing_information.app_start_mach_timestamp
         return Station(
             station_id=packet.station_information.id,
             uuid=packet.station_information.uuid,
             start_time=np.nan if start_time < 0 else start_time,
+            dtype_policy=dtype_policy,
+            sensor_types=sensor_types,
+            spill_policy=spill_policy,
         )._load_packet(packet)
 
     def load_packet(self, packet: api_m.RedvoxPacketM) -> "Station":
@@ -1005,6 +1065,9 @@ class Station:
             station_id=packet.station_information.id,
             uuid=packet.station_information.uuid,
             start_time=np.nan if start_time < 0 else start_time,
+            dtype_policy=self.dtype_policy,
+            sensor_types=self.sensor_types,
+            spill_policy=self.spill_policy,
         )
         if self.get_key() == o_s.get_key():
             return self._load_packet(packet)
@@ -1013,26 +1076,28 @@ class Station:
     def _load_packet(self, packet: api_m.RedvoxPacketM) -> "Station":
         self.packet_metadata.append(st_utils.StationPacketMetadata(packet))
         funcs = [
-            sdru.load_apim_audio,
-            sdru.load_apim_compressed_audio,
-            sdru.load_apim_image,
-            sdru.load_apim_best_location,
-            sdru.load_apim_location,
-            sdru.load_apim_pressure,
-            sdru.load_apim_light,
-            sdru.load_apim_ambient_temp,
-            sdru.load_apim_rel_humidity,
-            sdru.load_apim_proximity,
-            sdru.load_apim_accelerometer,
-            sdru.load_apim_gyroscope,
-            sdru.load_apim_magnetometer,
-            sdru.load_apim_gravity,
-            sdru.load_apim_linear_accel,
-            sdru.load_apim_orientation,
-            sdru.load_apim_rotation_vector,
-            sdru.load_apim_health,
+            (sd.SensorType.AUDIO, sdru.load_apim_audio),
+            (sd.SensorType.COMPRESSED_AUDIO, sdru.load_apim_compressed_audio),
+            (sd.SensorType.IMAGE, sdru.load_apim_image),
+            (sd.SensorType.BEST_LOCATION, sdru.load_apim_best_location),
+            (sd.SensorType.LOCATION, sdru.load_apim_location),
+            (sd.SensorType.PRESSURE, sdru.load_apim_pressure),
+            (sd.SensorType.LIGHT, sdru.load_apim_light),
+            (sd.SensorType.AMBIENT_TEMPERATURE, sdru.load_apim_ambient_temp),
+            (sd.SensorType.RELATIVE_HUMIDITY, sdru.load_apim_rel_humidity),
+            (sd.SensorType.PROXIMITY, sdru.load_apim_proximity),
+            (sd.SensorType.ACCELEROMETER, sdru.load_apim_accelerometer),
+            (sd.SensorType.GYROSCOPE, sdru.load_apim_gyroscope),
+            (sd.SensorType.MAGNETOMETER, sdru.load_apim_magnetometer),
+            (sd.SensorType.GRAVITY, sdru.load_apim_gravity),
+            (sd.SensorType.LINEAR_ACCELERATION, sdru.load_apim_linear_accel),
+            (sd.SensorType.ORIENTATION, sdru.load_apim_orientation),
+            (sd.SensorType.ROTATION_VECTOR, sdru.load_apim_rotation_vector),
+            (sd.SensorType.STATION_HEALTH, sdru.load_apim_health),
         ]
-        sensors = map(lambda fn: fn(packet), funcs)
+        sensors = [fn(packet) for sensor_type, fn in funcs
+                   if sensor_type == sd.SensorType.AUDIO or self.sensor_types is None
+                   or sensor_type in self.sensor_types]
         for sensor in sensors:
             if sensor:
                 self.append_sensor(sensor)
@@ -1045,10 +1110,12 @@ class Station:
         if self.is_timestamps_updated:
             self.errors.append("Timestamps already corrected!")
         else:
-            for sensor in self.data:
-                sensor.update_data_timestamps(self.timesync_analysis.offset_model, self.use_model_correction)
-            for packet in self.packet_metadata:
-                packet.update_timestamps(self.timesync_analysis.offset_model, self.use_model_correction)
+            # sensors that have not been built yet are updated when they are built
+            for sensor in self._data:
+                sensor.update_data_timestamps(self.timesync_analysis.offset_model, self.use_model_correction,
+                                              in_place=True)
+            st_utils.update_packet_metadata_timestamps(self.packet_metadata, self.timesync_analysis.offset_model,
+                                                       self.use_model_correction)
             self.timesync_analysis.update_timestamps()
             self.start_timestamp = self.timesync_analysis.offset_model.update_time(
                 self.start_timestamp, self.use_model_correction
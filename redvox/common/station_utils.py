@@ -378,3 +378,27 @@ class StationPacketMetadataWrapped:
         self.packet_end_mach_timestamp = om.update_time(self.packet_end_mach_timestamp, use_model_function)
         self.packet_start_os_timestamp = om.update_time(self.packet_start_os_timestamp, use_model_function)
         self.packet_end_os_timestamp = om.update_time(self.packet_end_os_timestamp, use_model_function)
+
+
+PACKET_TIMESTAMP_FIELDS: Tuple[str, ...] = ("packet_start_mach_timestamp", "packet_end_mach_timestamp",
+                                            "packet_start_os_timestamp", "packet_end_os_timestamp")
+
+
+def update_packet_metadata_timestamps(
+        packet_metadata: List[StationPacketMetadata], om: OffsetModel, use_model_function: bool = True
+):
+    """
+    updates the timestamps of every packet metadata in the list using the offset model, all at once.
+    the timestamps are the same as the ones from calling update_timestamps on each packet metadata
+
+    :param packet_metadata: list of StationPacketMetadata or StationPacketMetadataWrapped to update
+    :param om: OffsetModel to apply to data
+    :param use_model_function: if True, use the offset model's correction function to correct time,
+                                otherwise use best offset (model's intercept value).  default True
+    """
+    if len(packet_metadata) < 1:
+        return
+    timestamps = np.array([[getattr(p, f) for f in PACKET_TIMESTAMP_FIELDS] for p in packet_metadata], dtype=float)
+    for p, row in zip(packet_metadata, om.update_timestamps(timestamps, use_model_function).tolist()):
+        for f, t in zip(PACKET_TIMESTAMP_FIELDS, row):
+            setattr(p, f, t)
@@ -5,8 +5,7 @@ Also includes functions for correcting time arrays.
 ALL timestamps in microseconds unless otherwise stated
 """
 
-from functools import reduce
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 
 # noinspection Mypy
 import numpy as np
@@ -14,7 +13,9 @@ import numpy as np
 import redvox.api900.lib.api900_pb2 as api900_pb2
 from redvox.api1000.proto.redvox_api_m_pb2 import RedvoxPacketM
 from redvox.api900.lib.api900_pb2 import RedvoxPacket
-from redvox.common.offset_model import OffsetModel
+from multiprocessing.pool import Pool
+
+from redvox.common.offset_model import OffsetModel, fit_offset_models
 import redvox.api900.reader_utils as util_900
 from redvox.api1000.wrapped_redvox_packet.wrapped_packet import WrappedRedvoxPacketM
 from redvox.api900.wrapped_redvox_packet import WrappedRedvoxPacket
@@ -26,6 +27,126 @@ from redvox.common import (
 )
 
 
+class TimeSyncExchanges:
+    """
+    Stores the tri-message exchanges of all the packets of a station in one array, and the statistics of each packet's
+    exchanges, computed for all packets at once
+    ALL timestamps in microseconds
+    properties:
+        exchanges: np.ndarray, (N, 6) array of the a1, a2, a3, b1, b2 and b3 timestamps of each exchange, grouped by
+                    packet in packet order
+        packet_index: np.ndarray, index of the packet of each exchange
+        num_packets: int, number of packets
+        num_exchanges: np.ndarray, number of exchanges of each packet
+        first_exchange: np.ndarray, index of the first exchange of each packet
+        latency1: np.ndarray, latencies measured by timestamps 1 and 2 of each exchange
+        latency3: np.ndarray, latencies measured by timestamps 2 and 3 of each exchange
+        offset1: np.ndarray, offsets measured by timestamps 1 and 2 of each exchange
+        offset3: np.ndarray, offsets measured by timestamps 2 and 3 of each exchange
+        mean_latency: np.ndarray, mean latency of each packet, np.nan if it has no exchanges
+        latency_std: np.ndarray, standard deviation of the latencies of each packet, np.nan if it has no exchanges
+        mean_offset: np.ndarray, mean offset of each packet, np.nan if it has no exchanges
+        offset_std: np.ndarray, standard deviation of the offsets of each packet, np.nan if it has no exchanges
+        best_latency: np.ndarray, best latency of each packet, np.nan if it has none
+        best_offset: np.ndarray, offset of the best latency of each packet, 0.0 if it has none
+        best_latency_array_index: np.ndarray, 1 or 3, the latency array with the best latency of each packet,
+                                    np.nan if it has none
+        best_latency_index: np.ndarray, index of the best latency in the exchanges of each packet, np.nan if it has none
+        best_latency_timestamp: np.ndarray, device timestamp of the best latency of each packet, np.nan if it has none
+    """
+
+    def __init__(self, exchanges: np.ndarray, packet_index: np.ndarray, num_packets: int):
+        """
+        Compute the statistics of each packet's exchanges
+        :param exchanges: (N, 6) array of the timestamps of each exchange, grouped by packet in packet order
+        :param packet_index: index of the packet of each exchange
+        :param num_packets: number of packets
+        """
+        self.exchanges: np.ndarray = np.reshape(np.asarray(exchanges, dtype=float), (-1, 6))
+        self.packet_index: np.ndarray = np.asarray(packet_index, dtype=int)
+        self.num_packets: int = num_packets
+        self.num_exchanges: np.ndarray = np.bincount(self.packet_index, minlength=num_packets)
+        self.first_exchange: np.ndarray = np.cumsum(self.num_exchanges) - self.num_exchanges
+        columns = [self.exchanges[:, i] for i in range(6)]
+        self.latency1, self.latency3 = tms.latencies(*columns)
+        self.offset1, self.offset3 = tms.offsets(*columns)
+        self.mean_latency, self.latency_std = self._mean_and_std(self.latency1, self.latency3)
+        self.mean_offset, self.offset_std = self._mean_and_std(self.offset1, self.offset3)
+        self._find_best_latencies()
+
+    @staticmethod
+    def from_packet_exchanges(exchanges: List[np.ndarray]) -> "TimeSyncExchanges":
+        """
+        :param exchanges: (N, 6) array of the timestamps of the exchanges of each packet
+        :return: TimeSyncExchanges of all the packets
+        """
+        counts = [len(ex) for ex in exchanges]
+        return TimeSyncExchanges(np.concatenate(exchanges) if exchanges else np.empty((0, 6)),
+                                 np.repeat(np.arange(len(exchanges)), counts), len(exchanges))
+
+    @staticmethod
+    def from_timesync_data(timesync_data: List["TimeSyncData"]) -> "TimeSyncExchanges":
+        """
+        :param timesync_data: TimeSyncData of each packet
+        :return: TimeSyncExchanges of all the packets
+        """
+        return TimeSyncExchanges.from_packet_exchanges(
+            [np.reshape(np.transpose(tsd.time_sync_exchanges_list), (-1, 6)) for tsd in timesync_data])
+
+    def _mean_and_std(self, values1: np.ndarray, values3: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param values1: the values of each exchange measured by timestamps 1 and 2
+        :param values3: the values of each exchange measured by timestamps 2 and 3
+        :return: the mean and standard deviation of the values of each packet
+        """
+        counts = 2 * self.num_exchanges
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = (np.bincount(self.packet_index, values1, self.num_packets)
+                     + np.bincount(self.packet_index, values3, self.num_packets)) / counts
+            dev1 = values1 - means[self.packet_index]
+            dev3 = values3 - means[self.packet_index]
+            stds = np.sqrt((np.bincount(self.packet_index, dev1 * dev1, self.num_packets)
+                            + np.bincount(self.packet_index, dev3 * dev3, self.num_packets)) / counts)
+        return means, stds
+
+    def _packet_min(self, values: np.ndarray) -> np.ndarray:
+        """
+        :param values: a value for each exchange
+        :return: the minimum of the values of each packet, np.inf if it has no exchanges
+        """
+        result = np.full(self.num_packets, np.inf)
+        has_exchanges = self.num_exchanges > 0
+        if np.any(has_exchanges):
+            result[has_exchanges] = np.minimum.reduceat(values, self.first_exchange[has_exchanges])
+        return result
+
+    def _find_best_latencies(self):
+        """
+        Finds the best latency of each packet and its offset the same way TriMessageStats does for one packet.
+        packets where all the latencies of either latency array are 0 or np.nan have no best latency
+        """
+        valid1 = np.nan_to_num(self.latency1) != 0
+        valid3 = np.nan_to_num(self.latency3) != 0
+        trusted = (np.bincount(self.packet_index, valid1, self.num_packets) > 0) \
+            & (np.bincount(self.packet_index, valid3, self.num_packets) > 0)
+        d1_min = self._packet_min(np.where(valid1, self.latency1, np.inf))
+        d3_min = self._packet_min(np.where(valid3, self.latency3, np.inf))
+        # use the server round trip if it is shorter
+        use1 = d3_min > d1_min
+        self.best_latency = np.where(trusted, np.where(use1, d1_min, d3_min), np.nan)
+        is_best = np.where(use1[self.packet_index], self.latency1, self.latency3) \
+            == self.best_latency[self.packet_index]
+        local_index = np.arange(len(self.exchanges)) - self.first_exchange[self.packet_index]
+        self.best_latency_index = np.where(trusted, self._packet_min(np.where(is_best, local_index, np.inf)), np.nan)
+        self.best_latency_array_index = np.where(trusted, np.where(use1, 1., 3.), np.nan)
+        self.best_offset = np.zeros(self.num_packets)
+        self.best_latency_timestamp = np.full(self.num_packets, np.nan)
+        best = self.first_exchange[trusted] + self.best_latency_index[trusted].astype(int)
+        best_use1 = use1[trusted]
+        self.best_offset[trusted] = np.where(best_use1, self.offset1[best], self.offset3[best])
+        self.best_latency_timestamp[trusted] = np.where(best_use1, self.exchanges[best, 3], self.exchanges[best, 5])
+
+
 class TimeSyncData:
     """
     Stores latencies, offsets, and other timesync related information about a single station
@@ -65,6 +186,7 @@ class TimeSyncData:
             time_sync_exchanges_list: Optional[List[float]] = None,
             best_latency: float = np.nan,
             best_offset: float = 0.0,
+            exchange_stats: Optional[Tuple[TimeSyncExchanges, int]] = None,
     ):
         """
         Initialize properties
@@ -79,6 +201,9 @@ class TimeSyncData:
         :param time_sync_exchanges_list: the timesync exchanges of the packet as a flat list, default None
         :param best_latency: the best latency of the packet, default np.nan
         :param best_offset: the best offset of the packet, default 0.0
+        :param exchange_stats: the TimeSyncExchanges that contains the exchanges of the packet and the index of the
+                                packet in it.  if given, the exchanges and their statistics are taken from it instead of
+                                time_sync_exchanges_list.  default None
         """
         self.station_id = station_id
         self.sample_rate_hz = sample_rate_hz
@@ -87,18 +212,15 @@ class TimeSyncData:
         self.server_acquisition_timestamp = server_acquisition_timestamp
         self.packet_start_timestamp = packet_start_timestamp
         self.packet_end_timestamp = packet_end_timestamp
-        if time_sync_exchanges_list is None:
-            time_sync_exchanges_list = []
-        else:
-            time_sync_exchanges_list = [
-                time_sync_exchanges_list[i: i + 6]
-                for i in range(0, len(time_sync_exchanges_list), 6)
-            ]
-        self.time_sync_exchanges_list = np.transpose(time_sync_exchanges_list)
+        if exchange_stats is None:
+            if time_sync_exchanges_list is None:
+                time_sync_exchanges_list = []
+            exchange_stats = (TimeSyncExchanges.from_packet_exchanges(
+                [np.reshape(np.asarray(time_sync_exchanges_list, dtype=float), (-1, 6))]), 0)
         self.best_latency = best_latency
         self.best_offset = best_offset
 
-        self._compute_tri_message_stats()
+        self._compute_tri_message_stats(*exchange_stats)
         # set the packet duration
         self.packet_duration = self.packet_end_timestamp - self.packet_start_timestamp
         # calculate travel time between corrected end of packet timestamp and server timestamp
@@ -106,40 +228,40 @@ class TimeSyncData:
                 self.packet_end_timestamp + self.best_offset
         )
 
-    def _compute_tri_message_stats(self):
+    def _compute_tri_message_stats(self, exchange_stats: TimeSyncExchanges, index: int):
         """
         Compute the tri-message stats from the data
+        :param exchange_stats: the TimeSyncExchanges that contains the exchanges of the packet
+        :param index: the index of the packet in exchange_stats
         """
-        if self.num_tri_messages() > 0:
-            # compute tri message data from time sync exchanges
-            tse = tms.TriMessageStats(
-                self.station_id,
-                np.array(self.time_sync_exchanges_list[0]),
-                np.array(self.time_sync_exchanges_list[1]),
-                np.array(self.time_sync_exchanges_list[2]),
-                np.array(self.time_sync_exchanges_list[3]),
-                np.array(self.time_sync_exchanges_list[4]),
-                np.array(self.time_sync_exchanges_list[5]),
-            )
+        first = exchange_stats.first_exchange[index]
+        end = first + exchange_stats.num_exchanges[index]
+        if end > first:
+            self.time_sync_exchanges_list = np.transpose(exchange_stats.exchanges[first:end])
             # Compute the statistics for latency and offset
-            self.mean_latency = np.mean([*tse.latency1, *tse.latency3])
-            self.latency_std = np.std([*tse.latency1, *tse.latency3])
-            self.mean_offset = np.mean([*tse.offset1, *tse.offset3])
-            self.offset_std = np.std([*tse.offset1, *tse.offset3])
-            self.latencies = np.array((tse.latency1, tse.latency3))
-            self.offsets = np.array((tse.offset1, tse.offset3))
-            self.best_latency_index = tse.best_latency_index
-            self.best_tri_msg_index = tse.best_latency_index
-            self.best_msg_timestamp_index = tse.best_latency_array_index
+            self.mean_latency = exchange_stats.mean_latency[index]
+            self.latency_std = exchange_stats.latency_std[index]
+            self.mean_offset = exchange_stats.mean_offset[index]
+            self.offset_std = exchange_stats.offset_std[index]
+            self.latencies = np.array((exchange_stats.latency1[first:end], exchange_stats.latency3[first:end]))
+            self.offsets = np.array((exchange_stats.offset1[first:end], exchange_stats.offset3[first:end]))
+            if np.isnan(exchange_stats.best_latency_index[index]):
+                self.best_latency_index = None
+                self.best_msg_timestamp_index = None
+            else:
+                self.best_latency_index = int(exchange_stats.best_latency_index[index])
+                self.best_msg_timestamp_index = int(exchange_stats.best_latency_array_index[index])
+            self.best_tri_msg_index = self.best_latency_index
             # if best_latency is np.nan, set to best computed latency
             if np.isnan(self.best_latency):
-                self.best_latency = tse.best_latency
-                self.best_offset = tse.best_offset
+                self.best_latency = exchange_stats.best_latency[index]
+                self.best_offset = exchange_stats.best_offset[index]
             # if best_offset is still default value, use the best computed offset
             elif self.best_offset == 0:
-                self.best_offset = tse.best_offset
+                self.best_offset = exchange_stats.best_offset[index]
         else:
             # If here, there are no exchanges to read.  write default or empty values to the correct properties
+            self.time_sync_exchanges_list = np.transpose([])
             self.latencies = np.array(([], []))
             self.offsets = np.array(([], []))
             self.best_tri_msg_index = np.nan
@@ -188,16 +310,35 @@ class TimeSyncData:
             return self.packet_start_timestamp
 
 
-def time_sync_data_from_raw_packet(packet: Union[RedvoxPacketM, RedvoxPacket]) -> TimeSyncData:
+def raw_packet_exchanges(packet: Union[RedvoxPacketM, RedvoxPacket]) -> np.ndarray:
+    """
+    :param packet: data packet to get time sync exchanges from
+    :return: (N, 6) array of the a1, a2, a3, b1, b2 and b3 timestamps of each time sync exchange in the packet
+    """
+    exchanges = []
+    if isinstance(packet, RedvoxPacketM):
+        exchanges = [[ex.a1, ex.a2, ex.a3, ex.b1, ex.b2, ex.b3] for ex in packet.timing_information.synch_exchanges]
+    else:
+        ch: api900_pb2.UnevenlySampledChannel
+        for ch in packet.unevenly_sampled_channels:
+            if api900_pb2.TIME_SYNCHRONIZATION in ch.channel_types:
+                exchanges = util_900.extract_payload(ch)
+    return np.reshape(np.asarray(exchanges, dtype=float), (-1, 6))
+
+
+def time_sync_data_from_raw_packet(
+        packet: Union[RedvoxPacketM, RedvoxPacket],
+        exchange_stats: Optional[Tuple[TimeSyncExchanges, int]] = None
+) -> TimeSyncData:
     """
     :param packet: data packet to get time sync data from
+    :param exchange_stats: the TimeSyncExchanges that contains the exchanges of the packet and the index of the packet
+                            in it.  if None, the exchanges are read from the packet.  default None
     :return: TimeSyncData object from data packet
     """
+    exchanges: Optional[np.ndarray] = raw_packet_exchanges(packet) if exchange_stats is None else None
     tsd: TimeSyncData
     if isinstance(packet, RedvoxPacketM):
-        exchanges: List[float] = reduce(lambda acc, ex: acc + [ex.a1, ex.a2, ex.a3, ex.b1, ex.b2, ex.b3],
-                                        packet.timing_information.synch_exchanges,
-                                        [])
         tsd = TimeSyncData(
             packet.station_information.id,
             packet.sensors.audio.sample_rate,
@@ -208,7 +349,8 @@ def time_sync_data_from_raw_packet(packet: Union[RedvoxPacketM, RedvoxPacket]) -
             packet.timing_information.packet_end_mach_timestamp,
             exchanges,
             packet.timing_information.best_latency,
-            packet.timing_information.best_offset
+            packet.timing_information.best_offset,
+            exchange_stats,
         )
     else:
         mtz: float = np.nan
@@ -227,13 +369,6 @@ def time_sync_data_from_raw_packet(packet: Union[RedvoxPacketM, RedvoxPacket]) -
             except (KeyError, ValueError):
                 continue
 
-        # Get synch exchanges
-        exchanges: Optional[np.ndarray] = None
-        ch: api900_pb2.UnevenlySampledChannel
-        for ch in packet.unevenly_sampled_channels:
-            if api900_pb2.TIME_SYNCHRONIZATION in ch.channel_types:
-                exchanges = util_900.extract_payload(ch)
-
         tsd = TimeSyncData(
             packet.redvox_id,
             packet.evenly_sampled_channels[0].sample_rate_hz,
@@ -242,9 +377,10 @@ def time_sync_data_from_raw_packet(packet: Union[RedvoxPacketM, RedvoxPacket]) -
             packet.evenly_sampled_channels[0].first_sample_timestamp_epoch_microseconds_utc,
             packet.server_timestamp_epoch_microseconds_utc,
             packet.app_file_start_timestamp_machine,
-            list(exchanges),
+            exchanges,
             best_latency,
             best_offset,
+            exchange_stats,
         )
 
     return tsd
@@ -258,10 +394,12 @@ class TimeSyncAnalysis:
         best_latency_index: int, the index of the TimeSyncData object with the best latency, default np.nan
         latency_stats: StatsContainer, the statistics of the latencies
         offset_stats: StatsContainer, the statistics of the offsets
-        offset_model: optional OffsetModel, used to calculate offset at a given point in time
+        offset_model: OffsetModel, used to calculate offset at a given point in time.  it is fit the first time it is
+                        used after the data is evaluated
         sample_rate_hz: float, the audio sample rate in hz of the station, default np.nan
         timesync_data: list of TimeSyncData, the TimeSyncData to analyze, default empty list
         station_start_timestamp: float, the timestamp of when the station became active, default np.nan
+        exchanges: optional TimeSyncExchanges, the exchanges of all the TimeSyncData, default None
     """
 
     def __init__(
@@ -285,31 +423,89 @@ class TimeSyncAnalysis:
         self.latency_stats = sh.StatsContainer("latency")
         self.offset_stats = sh.StatsContainer("offset")
         self.errors = RedVoxExceptions("TimeSyncAnalysis")
+        self.exchanges: Optional[TimeSyncExchanges] = None
+        self._offset_model: Optional[OffsetModel] = None
+        self._latencies: np.ndarray = np.array([])
+        self._offsets: np.ndarray = np.array([])
         if time_sync_data:
             self.timesync_data: List[TimeSyncData] = time_sync_data
             self.evaluate_and_validate_data()
         else:
             self.timesync_data = []
-            self.offset_model = OffsetModel.empty_model()
+            self._offset_model = OffsetModel.empty_model()
 
     def evaluate_and_validate_data(self):
         """
         check the data for errors and update the analysis statistics
         """
+        self._update_packet_arrays()
         self.evaluate_latencies()
         self.validate_start_timestamp()
         self.validate_sample_rate()
         self._calc_timesync_stats()
-        self.offset_model = self.get_offset_model()
+        # the model is fit when it is first used
+        self._offset_model = None
+
+    @property
+    def offset_model(self) -> OffsetModel:
+        """
+        :return: the OffsetModel of the timesync analysis; fits it if it has not been fit yet
+        """
+        if self._offset_model is None:
+            self._offset_model = self.get_offset_model()
+        return self._offset_model
+
+    @offset_model.setter
+    def offset_model(self, model: OffsetModel):
+        """
+        :param model: the OffsetModel to use for the timesync analysis
+        """
+        self._offset_model = model
+
+    def is_offset_model_fit(self) -> bool:
+        """
+        :return: True if the OffsetModel has been fit or set
+        """
+        return self._offset_model is not None
+
+    def offset_model_inputs(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float, float]:
+        """
+        :return: the latencies, offsets, times, start time and end time used to fit the OffsetModel
+        """
+        return (self.get_latencies(), self.get_offsets(), self.get_best_latency_timestamps(),
+                self.timesync_data[0].packet_start_timestamp, self.timesync_data[-1].packet_end_timestamp)
+
+    def _update_packet_arrays(self):
+        """
+        updates the exchanges and the best latency and offset of each packet from the timesync data.
+        the exchanges are only rebuilt if they are not from the same number of packets as the timesync data
+        """
+        if self.exchanges is None or self.exchanges.num_packets != len(self.timesync_data):
+            self.exchanges = TimeSyncExchanges.from_timesync_data(self.timesync_data)
+        self._latencies = np.array([tsd.best_latency for tsd in self.timesync_data], dtype=float)
+        self._offsets = np.array([tsd.best_offset for tsd in self.timesync_data], dtype=float)
+
+    def _packet_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :return: the best latency and best offset of each packet, updated if the timesync data has changed size
+        """
+        if len(self._latencies) != len(self.timesync_data):
+            self._update_packet_arrays()
+        return self._latencies, self._offsets
+
+    def get_best_latency_timestamps(self) -> np.ndarray:
+        """
+        :return: timestamp of the best latency of each packet, or start of the packet if it has no best latency
+        """
+        self._packet_arrays()
+        timestamps = self.exchanges.best_latency_timestamp
+        return np.where(np.isnan(timestamps), self.get_start_times(), timestamps)
 
     def get_offset_model(self) -> OffsetModel:
         """
         :return: an OffsetModel based on the information in the timesync analysis
         """
-        return OffsetModel(self.get_latencies(), self.get_offsets(),
-                           np.array([td.get_best_latency_timestamp() for td in self.timesync_data]),
-                           self.timesync_data[0].packet_start_timestamp,
-                           self.timesync_data[-1].packet_end_timestamp)
+        return OffsetModel(*self.offset_model_inputs())
 
     def _calc_timesync_stats(self):
         """
@@ -342,6 +538,7 @@ class TimeSyncAnalysis:
         :param packets: list of WrappedRedvoxPacketM to convert
         :return: modified version of self
         """
+        self.exchanges = None
         self.timesync_data = [TimeSyncData(self.station_id,
                                            self.sample_rate_hz,
                                            packet.get_sensors().get_audio().get_num_samples(),
@@ -372,71 +569,14 @@ class TimeSyncAnalysis:
 
     def from_raw_packets(self, packets: List[Union[RedvoxPacketM, RedvoxPacket]]) -> 'TimeSyncAnalysis':
         """
-        converts packets into TimeSyncData objects, then performs analysis
+        converts packets into TimeSyncData objects, then performs analysis.
+        the exchanges of all packets are evaluated together
         :param packets: list of WrappedRedvoxPacketM to convert
         :return: modified version of self
         """
-        timesync_data: List[TimeSyncData] = []
-
-        packet: Union[RedvoxPacketM, RedvoxPacket]
-        for packet in packets:
-            tsd: TimeSyncData
-            if isinstance(packet, RedvoxPacketM):
-                exchanges: List[float] = reduce(lambda acc, ex: acc + [ex.a1, ex.a2, ex.a3, ex.b1, ex.b2, ex.b3],
-                                                packet.timing_information.synch_exchanges,
-                                                [])
-                tsd = TimeSyncData(
-                    packet.station_information.id,
-                    packet.sensors.audio.sample_rate,
-                    len(packet.sensors.audio.samples.values),
-                    packet.timing_information.app_start_mach_timestamp,
-                    packet.timing_information.server_acquisition_arrival_timestamp,
-                    packet.timing_information.packet_start_mach_timestamp,
-                    packet.timing_information.packet_end_mach_timestamp,
-                    exchanges,
-                    packet.timing_information.best_latency,
-                    packet.timing_information.best_offset
-                )
-            else:
-                mtz: float = np.nan
-                best_latency: float = np.nan
-                best_offset: float = np.nan
-
-                for i, v in enumerate(packet.metadata):
-                    plus_1: int = i + 1
-                    try:
-                        if v == "machTimeZero" and plus_1 < len(packet.metadata):
-                            mtz = float(packet.metadata[plus_1])
-                        if v == "bestLatency" and plus_1 < len(packet.metadata):
-                            best_latency = float(packet.metadata[plus_1])
-                        if v == "bestOffset" and plus_1 < len(packet.metadata):
-                            best_offset = float(packet.metadata[plus_1])
-                    except (KeyError, ValueError):
-                        continue
-
-                # Get synch exchanges
-                exchanges: Optional[np.ndarray] = None
-                ch: api900_pb2.UnevenlySampledChannel
-                for ch in packet.unevenly_sampled_channels:
-                    if api900_pb2.TIME_SYNCHRONIZATION in ch.channel_types:
-                        exchanges = util_900.extract_payload(ch)
-
-                tsd = TimeSyncData(
-                    packet.redvox_id,
-                    packet.evenly_sampled_channels[0].sample_rate_hz,
-                    util_900.payload_len(packet.evenly_sampled_channels[0]),
-                    mtz,
-                    packet.evenly_sampled_channels[0].first_sample_timestamp_epoch_microseconds_utc,
-                    packet.server_timestamp_epoch_microseconds_utc,
-                    packet.app_file_start_timestamp_machine,
-                    list(exchanges),
-                    best_latency,
-                    best_offset,
-                )
-
-            timesync_data.append(tsd)
-
-        self.timesync_data = timesync_data
+        self.exchanges = TimeSyncExchanges.from_packet_exchanges([raw_packet_exchanges(p) for p in packets])
+        self.timesync_data = [time_sync_data_from_raw_packet(packet, (self.exchanges, i))
+                              for i, packet in enumerate(packets)]
 
         if len(self.timesync_data) > 0:
             self.evaluate_and_validate_data()
@@ -449,6 +589,7 @@ class TimeSyncAnalysis:
         :param timesync_data: TimeSyncData to add
         """
         self.timesync_data.append(timesync_data)
+        self.exchanges = None
         self.evaluate_and_validate_data()
 
     def get_num_packets(self) -> int:
@@ -463,13 +604,13 @@ class TimeSyncAnalysis:
         """
         if np.isnan(self.best_latency_index):
             return np.nan
-        return self.timesync_data[self.best_latency_index].best_latency
+        return self._packet_arrays()[0][self.best_latency_index]
 
     def get_latencies(self) -> np.array:
         """
         :return: np.array containing all the latencies
         """
-        return np.array([ts_data.best_latency for ts_data in self.timesync_data])
+        return self._packet_arrays()[0].copy()
 
     def get_mean_latency(self) -> float:
         """
@@ -489,13 +630,13 @@ class TimeSyncAnalysis:
         """
         if np.isnan(self.best_latency_index):
             return np.nan
-        return self.timesync_data[self.best_latency_index].best_offset
+        return self._packet_arrays()[1][self.best_latency_index]
 
     def get_offsets(self) -> np.array:
         """
         :return: np.array containing all the offsets
         """
-        return np.array([ts_data.best_offset for ts_data in self.timesync_data])
+        return self._packet_arrays()[1].copy()
 
     def get_mean_offset(self) -> float:
         """
@@ -515,7 +656,9 @@ class TimeSyncAnalysis:
         """
         if np.isnan(self.best_latency_index):
             return np.nan
-        return self.timesync_data[self.best_latency_index].best_latency_index
+        self._packet_arrays()
+        index = self.exchanges.best_latency_index[self.best_latency_index]
+        return np.nan if np.isnan(index) else int(index)
 
     def get_best_start_time(self) -> float:
         """
@@ -529,22 +672,16 @@ class TimeSyncAnalysis:
         """
         :return: list of the start timestamps of each packet
         """
-        start_times = []
-        for ts_data in self.timesync_data:
-            start_times.append(ts_data.packet_start_timestamp)
-        return np.array(start_times)
+        return np.array([ts_data.packet_start_timestamp for ts_data in self.timesync_data], dtype=float)
 
     def get_bad_packets(self) -> List[int]:
         """
         :return: list of all packets that contains invalid data
         """
-        bad_packets = []
-        for idx in range(
-                self.get_num_packets()
-        ):  # mark bad indices (they have a 0 or less value)
-            if self.get_latencies()[idx] <= 0 or np.isnan(self.get_latencies()[idx]):
-                bad_packets.append(idx)
-        return bad_packets
+        latencies = self._packet_arrays()[0]
+        # mark bad indices (they have a 0 or less value)
+        with np.errstate(invalid="ignore"):
+            return np.flatnonzero((latencies <= 0) | np.isnan(latencies)).tolist()
 
     def evaluate_latencies(self):
         """
@@ -556,15 +693,9 @@ class TimeSyncAnalysis:
                 "Latencies cannot be evaluated; length of timesync data is less than 1"
             )
         else:
-            self.best_latency_index = 0
-            # assume the first element has the best timesync values for now, then compare with the others
-            for index in range(1, self.get_num_packets()):
-                best_latency = self.get_best_latency()
-                # find the best latency; in this case, the minimum
-                # if new value exists and if the current best does not or new value is better than current best, update
-                if (not np.isnan(self.timesync_data[index].best_latency) and (np.isnan(best_latency))
-                        or self.timesync_data[index].best_latency < best_latency):
-                    self.best_latency_index = index
+            latencies = self._packet_arrays()[0]
+            # the best latency is the first minimum; use the first packet if no packet has a latency
+            self.best_latency_index = 0 if np.all(np.isnan(latencies)) else int(np.nanargmin(latencies))
 
     def validate_start_timestamp(self, debug: bool = False) -> bool:
         """
@@ -657,6 +788,19 @@ class TimeSyncAnalysis:
                 tsd.update_timestamps()
 
 
+def fit_analysis_offset_models(analyses: List[TimeSyncAnalysis], pool: Optional[Pool] = None):
+    """
+    fits the OffsetModels of the TimeSyncAnalysis objects that have not been fit yet, all in one batch that runs in
+    parallel when parallelism is enabled
+    :param analyses: the TimeSyncAnalysis objects to fit the models of
+    :param pool: optional pool to fit the models with.  If None, the SDK's shared pool is used when the models are
+                    fit in parallel.  Default None
+    """
+    unfit = [tsa for tsa in analyses if not tsa.is_offset_model_fit()]
+    for tsa, model in zip(unfit, fit_offset_models([tsa.offset_model_inputs() for tsa in unfit], pool=pool)):
+        tsa.offset_model = model
+
+
 def validate_sensors(tsa_data: TimeSyncAnalysis) -> bool:
     """
     Examine all sample rates and mach time zeros to ensure that sensor settings do not change
@@ -2,8 +2,9 @@
 Provides global settings that tweak the inner workings of the SDK.
 """
 
+import multiprocessing
 import os
-from typing import Optional
+from typing import Optional, Tuple
 
 REDVOX_ENABLE_PARALLELISM_ENV: str = "REDVOX_ENABLE_PARALLELISM"
 
@@ -51,6 +52,115 @@ def is_parallelism_enabled() -> bool:
     return False if __PARALLELISM_ENABLED is None else __PARALLELISM_ENABLED
 
 
+REDVOX_POOL_SIZE_ENV: str = "REDVOX_POOL_SIZE"
+REDVOX_POOL_START_METHOD_ENV: str = "REDVOX_POOL_START_METHOD"
+REDVOX_POOL_TYPE_ENV: str = "REDVOX_POOL_TYPE"
+
+POOL_TYPE_PROCESS: str = "process"
+POOL_TYPE_THREAD: str = "thread"
+POOL_TYPES: Tuple[str, ...] = (POOL_TYPE_PROCESS, POOL_TYPE_THREAD)
+
+
+def pool_size_env() -> Optional[int]:
+    """
+    Reads the number of workers of the SDK's shared pool from an environmental variable.
+    :return: The number of workers if the env var exists and is a positive integer, otherwise None.
+    """
+    try:
+        size: int = int(os.environ.get(REDVOX_POOL_SIZE_ENV, ""))
+    except ValueError:
+        return None
+    return size if size > 0 else None
+
+
+def pool_start_method_env() -> Optional[str]:
+    """
+    Reads the multiprocessing start method of the SDK's shared pool from an environmental variable.
+    :return: The start method if the env var exists and names a start method available on this platform, otherwise
+             None.
+    """
+    method: Optional[str] = os.environ.get(REDVOX_POOL_START_METHOD_ENV)
+    return method if method in multiprocessing.get_all_start_methods() else None
+
+
+def pool_type_env() -> Optional[str]:
+    """
+    Reads the type of the SDK's shared pool from an environmental variable.
+    :return: Either "process" or "thread" if the env var exists and is one of those values, otherwise None.
+    """
+    pool_type: str = os.environ.get(REDVOX_POOL_TYPE_ENV, "").lower()
+    return pool_type if pool_type in POOL_TYPES else None
+
+
+__POOL_SIZE: Optional[int] = None
+__POOL_START_METHOD: Optional[str] = None
+__POOL_TYPE: Optional[str] = None
+
+
+def set_pool_size(pool_size: Optional[int]) -> None:
+    """
+    Sets the number of workers of the SDK's shared pool.  A shared pool that already exists is replaced the next time
+    it is used.
+    :param pool_size: The number of workers, or None to use the env var or the number of CPUs.
+    """
+    global __POOL_SIZE
+    if pool_size is not None and pool_size < 1:
+        raise ValueError(f"pool_size must be positive, got {pool_size}")
+    __POOL_SIZE = pool_size
+
+
+def get_pool_size() -> int:
+    """
+    :return: The number of workers of the SDK's shared pool.
+    """
+    if __POOL_SIZE is not None:
+        return __POOL_SIZE
+    size: Optional[int] = pool_size_env()
+    return size if size is not None else os.cpu_count() or 1
+
+
+def set_pool_start_method(start_method: Optional[str]) -> None:
+    """
+    Sets the multiprocessing start method of the SDK's shared pool.  A shared pool that already exists is replaced
+    the next time it is used.
+    :param start_method: One of multiprocessing.get_all_start_methods(), or None to use the env var or the platform's
+                         default.
+    """
+    global __POOL_START_METHOD
+    if start_method is not None and start_method not in multiprocessing.get_all_start_methods():
+        raise ValueError(f"start_method must be one of {multiprocessing.get_all_start_methods()}, got {start_method}")
+    __POOL_START_METHOD = start_method
+
+
+def get_pool_start_method() -> Optional[str]:
+    """
+    :return: The multiprocessing start method of the SDK's shared pool, or None for the platform's default.
+    """
+    return __POOL_START_METHOD if __POOL_START_METHOD is not None else pool_start_method_env()
+
+
+def set_pool_type(pool_type: Optional[str]) -> None:
+    """
+    Sets whether the SDK's shared pool uses processes or threads.  A shared pool that already exists is replaced the
+    next time it is used.
+    :param pool_type: Either "process" or "thread", or None to use the env var or the default of "process".
+    """
+    global __POOL_TYPE
+    if pool_type is not None and pool_type not in POOL_TYPES:
+        raise ValueError(f"pool_type must be one of {POOL_TYPES}, got {pool_type}")
+    __POOL_TYPE = pool_type
+
+
+def get_pool_type() -> str:
+    """
+    :return: Either "process" or "thread", the type of workers of the SDK's shared pool.
+    """
+    if __POOL_TYPE is not None:
+        return __POOL_TYPE
+    pool_type: Optional[str] = pool_type_env()
+    return pool_type if pool_type is not None else POOL_TYPE_PROCESS
+
+
 def is_gui_extra_enabled() -> bool:
     """
     :return: True if the GUI extra is enabled, False otherwise
@@ -2,9 +2,13 @@
 tests for api X reader
 """
 from datetime import timedelta
+import multiprocessing
 import unittest
 import os
 
+import numpy as np
+
+import redvox.settings as settings
 import redvox.tests as tests
 from redvox.common import date_time_utils as dtu
 from redvox.common import api_reader
@@ -167,3 +171,53 @@ class ApiReaderTest(unittest.TestCase):
             self.assertEqual(result, 2)
             final_result += result
         self.assertEqual(final_result, 4)
+
+    def test_get_stations_order(self):
+        stations = api_reader.ApiReader(tests.TEST_DATA_DIR).get_stations()
+        self.assertEqual(["1637650010", "1637680001", "0000000001"], [s.id for s in stations])
+
+    def test_packet_cache(self):
+        reader = api_reader.ApiReader(tests.TEST_DATA_DIR)
+        self.assertEqual(len(reader._packet_cache), reader.index_summary.total_packets())
+        uncached_reader = api_reader.ApiReader(tests.TEST_DATA_DIR, packet_cache_size=0)
+        self.assertEqual(len(uncached_reader._packet_cache), 0)
+        stations = reader.get_stations()
+        self.assertEqual(len(reader._packet_cache), 0)
+        uncached_stations = uncached_reader.get_stations()
+        self.assertEqual(len(stations), len(uncached_stations))
+        for station, uncached_station in zip(stations, uncached_stations):
+            self.assertEqual(station.id, uncached_station.id)
+            self.assertEqual(station.audio_sensor().num_samples(), uncached_station.audio_sensor().num_samples())
+            self.assertEqual(len(station.packet_metadata), len(uncached_station.packet_metadata))
+
+    def test_packet_cache_parallel(self):
+        stations = api_reader.ApiReader(tests.TEST_DATA_DIR).get_stations()
+        parallelism_enabled = settings.is_parallelism_enabled()
+        settings.set_parallelism_enabled(True)
+        try:
+            with multiprocessing.Pool(2) as pool:
+                reader = api_reader.ApiReader(tests.TEST_DATA_DIR, pool=pool)
+                self.assertEqual(len(reader._packet_cache), reader.index_summary.total_packets())
+                parallel_stations = reader.get_stations(pool)
+                self.assertEqual(len(reader._packet_cache), 0)
+                reader = api_reader.ApiReader(tests.TEST_DATA_DIR, pool=pool)
+                iter_stations = list(reader.iter_stations(pool, 2))
+                self.assertEqual(len(reader._packet_cache), 0)
+        finally:
+            settings.set_parallelism_enabled(parallelism_enabled)
+        for result in [parallel_stations, iter_stations]:
+            self.assertEqual([s.id for s in stations], [s.id for s in result])
+            for station, parallel_station in zip(stations, result):
+                np.testing.assert_array_equal(station.audio_sensor().get_data_channel("microphone"),
+                                              parallel_station.audio_sensor().get_data_channel("microphone"))
+
+    def test_iter_stations(self):
+        stations = api_reader.ApiReader(tests.TEST_DATA_DIR).get_stations()
+        for prefetch in [0, 2]:
+            reader = api_reader.ApiReader(tests.TEST_DATA_DIR)
+            iter_stations = list(reader.iter_stations(prefetch=prefetch))
+            self.assertEqual(len(reader._packet_cache), 0)
+            self.assertEqual([s.id for s in stations], [s.id for s in iter_stations])
+            for station, iter_station in zip(stations, iter_stations):
+                self.assertEqual(station.audio_sensor().num_samples(), iter_station.audio_sensor().num_samples())
+                self.assertEqual(len(station.packet_metadata), len(iter_station.packet_metadata))
@@ -10,6 +10,8 @@ import numpy as np
 import redvox.tests as tests
 import redvox.common.date_time_utils as dt
 from redvox.common import data_window as dw
+from redvox.common import io
+from redvox.common.sensor_data import DtypePolicy, SensorType
 
 
 class DataWindowTest(unittest.TestCase):
@@ -69,6 +71,23 @@ class DataWindowTest(unittest.TestCase):
             self.assertIsNotNone(loc_sensor)
             self.assertEqual(loc_sensor.num_samples(), 4)
 
+    def test_dw_dtype_policy(self):
+        with contextlib.redirect_stdout(None):
+            datawindow = dw.DataWindow(
+                input_dir=self.input_dir,
+                station_ids=["1637680001"],
+                structured_layout=False,
+                dtype_policy=DtypePolicy.reduced(),
+            )
+        station = datawindow.stations[0]
+        for sensor_type in [SensorType.PRESSURE, SensorType.ACCELEROMETER, SensorType.LIGHT]:
+            sensor = station.get_sensor_by_type(sensor_type)
+            for name, values in sensor.columns().items():
+                self.assertEqual(values.dtype, np.float64 if "timestamps" in name else np.float32)
+        audio_sensor = station.audio_sensor()
+        self.assertEqual(audio_sensor.columns()["microphone"].dtype, np.float32)
+        self.assertEqual(len(audio_sensor.errors.get()), 1)
+
     def test_dw_invalid(self):
         dw_invalid = dw.DataWindow(
             input_dir=self.input_dir,
@@ -101,6 +120,30 @@ class DataWindowTest(unittest.TestCase):
         self.assertEqual(x.audio_sensor().num_samples(), 48000)
         self.assertEqual(np.count_nonzero(np.isnan(x.audio_sensor().get_data_channel("microphone"))), 2428)
 
+    def test_dw_station_callback(self):
+        with contextlib.redirect_stdout(None):
+            datawindow = dw.DataWindow(input_dir=self.input_dir, structured_layout=False)
+            streamed = []
+            streamed_dw = dw.DataWindow(input_dir=self.input_dir, structured_layout=False,
+                                        station_callback=streamed.append, max_loaded_stations=2)
+        self.assertEqual(len(streamed_dw.stations), 0)
+        self.assertEqual([s.id for s in datawindow.stations], [s.id for s in streamed])
+        self.assertEqual(datawindow.start_datetime, streamed_dw.start_datetime)
+        self.assertEqual(datawindow.end_datetime, streamed_dw.end_datetime)
+        for station, streamed_station in zip(datawindow.stations, streamed):
+            self.assertEqual(station.first_data_timestamp, streamed_station.first_data_timestamp)
+            self.assertEqual(station.audio_sensor().num_samples(), streamed_station.audio_sensor().num_samples())
+
+    def test_dw_station_output_dir(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            streamed_dw = dw.DataWindow(input_dir=self.input_dir, structured_layout=False,
+                                        station_ids=["0000000001"], station_output_dir=temp_dir)
+            self.assertEqual(len(streamed_dw.stations), 0)
+            self.assertEqual(len(streamed_dw.station_paths), 1)
+            station = io.deserialize_station(str(streamed_dw.station_paths[0]))
+            self.assertEqual(station.id, "0000000001")
+            self.assertEqual(station.audio_sensor().num_samples(), 720000)
+
 
 class DataWindowJsonTest(unittest.TestCase):
     @classmethod
@@ -2,8 +2,16 @@
 Redvox file helper test module
 """
 
+import glob
+import os
+import struct
 import unittest
 
+from google.protobuf.internal import encoder
+
+import redvox.tests as tests
+from redvox.api1000.proto.redvox_api_m_pb2 import RedvoxPacketM
+from redvox.api1000.wrapped_redvox_packet.wrapped_packet import WrappedRedvoxPacketM
 from redvox.common import file_statistics
 
 
@@ -26,3 +34,61 @@ class RdvxFileHelperTests(unittest.TestCase):
         self.assertEqual(40.96, file_statistics.get_duration_seconds_from_sample_rate(800))
         self.assertEqual(32.768, file_statistics.get_duration_seconds_from_sample_rate(8000))
         self.assertRaises(ValueError, file_statistics.get_duration_seconds_from_sample_rate, 100)
+
+    def test_from_api_1000_path(self):
+        paths = glob.glob(os.path.join(tests.TEST_DATA_DIR, "**", "*.rdvxm"), recursive=True)
+        self.assertTrue(len(paths) > 0)
+        for path in paths:
+            self.assertEqual(file_statistics.StationStat.from_api_1000(WrappedRedvoxPacketM.from_compressed_path(path)),
+                             file_statistics.StationStat.from_api_1000_path(path))
+
+    def test_read_stats_fields_api_1000(self):
+        packet, num_audio_samples = file_statistics.read_stats_fields_api_1000(tests.test_data("example.rdvxm"))
+        self.assertEqual(4096, num_audio_samples)
+        self.assertEqual(0, len(packet.sensors.audio.samples.values))
+        self.assertEqual(80., packet.sensors.audio.sample_rate)
+
+    def test_read_stats_fields_skips_sensors(self):
+        packet = RedvoxPacketM()
+        packet.station_information.id = "0000000001"
+        packet.sensors.audio.sample_rate = 80.
+        packet.sensors.audio.samples.values.extend(range(10))
+        packet.sensors.location.timestamps.timestamps.extend([1., 2.])
+        packet.sensors.accelerometer.x_samples.values.extend(range(1000))
+        packet.sensors.pressure.samples.values.extend(range(10))
+        trimmed, num_audio_samples = file_statistics._read_stats_fields(packet.SerializeToString())
+        self.assertEqual(10, num_audio_samples)
+        self.assertFalse(trimmed.sensors.HasField("accelerometer"))
+        self.assertFalse(trimmed.sensors.HasField("pressure"))
+        self.assertEqual([1., 2.], list(trimmed.sensors.location.timestamps.timestamps))
+        self.assertEqual("0000000001", trimmed.station_information.id)
+
+    def test_read_stats_fields_audio_encodings(self):
+        packet = RedvoxPacketM()
+        packet.sensors.audio.sample_rate = 80.
+        packet.sensors.audio.samples.values.extend(range(10))
+        more_samples = RedvoxPacketM()
+        more_samples.sensors.audio.samples.values.extend(range(5))
+        # repeated fields written in several packed chunks are joined when parsed
+        split = packet.SerializeToString() + more_samples.SerializeToString()
+        _, num_audio_samples = file_statistics._read_stats_fields(split)
+        self.assertEqual(15, num_audio_samples)
+
+        # values written one at a time instead of packed
+        def length_delimited(descriptor, name: str, payload: bytes) -> bytes:
+            number = descriptor.fields_by_name[name].number
+            return encoder._VarintBytes(number << 3 | 2) + encoder._VarintBytes(len(payload)) + payload
+
+        sensors = RedvoxPacketM.DESCRIPTOR.fields_by_name["sensors"].message_type
+        audio = sensors.fields_by_name["audio"].message_type
+        samples = audio.fields_by_name["samples"].message_type
+        values_key = encoder._VarintBytes(samples.fields_by_name["values"].number << 3 | 5)
+        unpacked_values = b"".join(values_key + struct.pack("<f", v) for v in range(7))
+        unpacked = packet.SerializeToString() + length_delimited(
+            RedvoxPacketM.DESCRIPTOR, "sensors",
+            length_delimited(sensors, "audio", length_delimited(audio, "samples", unpacked_values))
+        )
+        packet, num_audio_samples = file_statistics._read_stats_fields(unpacked)
+        self.assertEqual(17, num_audio_samples)
+        self.assertEqual(0, len(packet.sensors.audio.samples.values))
+        self.assertEqual(80., packet.sensors.audio.sample_rate)
@@ -233,6 +233,96 @@ class InterpolateGapsTest(unittest.TestCase):
         self.assertEqual(len(filled_df["timestamps"]), 15)
 
 
+class GapIntervalsTest(unittest.TestCase):
+    def test_check_gap_list(self):
+        gaps = [(9000, 15000), (4000, 6000), (1000, 8000), (500, 700), (15000, 16000), (3000, 2000)]
+        self.assertEqual(gpu.check_gap_list(gaps, 600, 15500),
+                         [(600., 700.), (1000., 8000.), (9000., 15000.), (15000., 15500.)])
+        self.assertEqual(gpu.check_gap_list([]), [])
+
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(11)
+        points = np.arange(0., 1000., .5)
+        for trial in range(50):
+            starts = rng.uniform(0, 1000, int(rng.integers(0, 40)))
+            ends = starts + rng.uniform(-10, 50, len(starts))
+            intervals = gpu.GapIntervals.from_arrays(starts, ends, 100., 900.)
+            # sorted and not overlapping
+            self.assertTrue(np.all(intervals.starts < intervals.ends))
+            self.assertTrue(np.all(intervals.starts[1:] >= intervals.ends[:-1]))
+            clipped_starts, clipped_ends = np.maximum(starts, 100.), np.minimum(ends, 900.)
+            in_any_gap = np.array([np.any((clipped_starts < p) & (p < clipped_ends)) for p in points])
+            np.testing.assert_array_equal(intervals.contains(points), in_any_gap)
+        self.assertFalse(gpu.GapIntervals().contains(5.))
+        self.assertTrue(gpu.GapIntervals.from_list([(1., 3.)]).contains(2.))
+        self.assertFalse(gpu.GapIntervals.from_list([(1., 3.)]).contains(1.))
+
+
+def list_fill_gaps(data_df: pd.DataFrame, gaps, sample_interval_micros: float, copy: bool) -> pd.DataFrame:
+    """
+    the gap by gap implementation of fill_gaps that the vectorized version must match
+    """
+    data_time_stamps = data_df["timestamps"].to_numpy()
+    result_df = data_df.copy()
+    data_duration = data_time_stamps[-1] - data_time_stamps[0]
+    expected_samples = (np.floor(data_duration / sample_interval_micros)
+                        + (1 if data_duration % sample_interval_micros >=
+                           sample_interval_micros * gpu.DEFAULT_GAP_UPPER_LIMIT else 0)) + 1
+    if expected_samples <= len(data_time_stamps):
+        return result_df.sort_values("timestamps", ignore_index=True)
+    pcm = gpu.DataPointCreationMode["COPY"] if copy else gpu.DataPointCreationMode["NAN"]
+    for gap in gpu.check_gap_list(gaps, data_time_stamps[0], data_time_stamps[-1]):
+        before_start = np.argwhere([t <= gap[0] for t in data_time_stamps])
+        after_end = np.argwhere([t >= gap[1] for t in data_time_stamps])
+        if len(before_start) > 0:
+            before_start = before_start[-1][0]
+            gap = (data_time_stamps[before_start], gap[1])
+        else:
+            before_start = None
+        if len(after_end) > 0:
+            after_end = after_end[0][0]
+            gap = (gap[0], data_time_stamps[after_end])
+        else:
+            after_end = None
+        num_new_points = int((gap[1] - gap[0]) / sample_interval_micros) - 1
+        if before_start is not None:
+            result_df = gpu.add_data_points_to_df(result_df, before_start, sample_interval_micros, num_new_points, pcm)
+        elif after_end is not None:
+            result_df = gpu.add_data_points_to_df(result_df, after_end, -sample_interval_micros, num_new_points, pcm)
+    return result_df.sort_values("timestamps", ignore_index=True)
+
+
+class FillGapsPropertyTest(unittest.TestCase):
+    def test_matches_list_fill_gaps(self):
+        rng = np.random.default_rng(7)
+        interval = 1000.
+        for trial in range(100):
+            num_points = int(rng.integers(2, 60))
+            # strictly increasing timestamps with random jitter and dropped stretches of points
+            steps = np.where(rng.random(num_points) < .15, rng.integers(2, 12, num_points), 1) * interval
+            timestamps = 1e6 + np.cumsum(steps) + rng.uniform(-100, 100, num_points)
+            data_df = pd.DataFrame({
+                "timestamps": timestamps,
+                "unaltered_timestamps": timestamps,
+                "data": rng.normal(size=num_points),
+                "location_provider": rng.integers(0, 4, num_points),
+            })
+            gap_starts = rng.uniform(timestamps[0] - 5 * interval, timestamps[-1], int(rng.integers(0, 6)))
+            gaps = [(g, g + rng.uniform(-interval, 15 * interval)) for g in gap_starts]
+            for copy in (False, True):
+                with self.subTest(trial=trial, copy=copy):
+                    expected = list_fill_gaps(data_df, gaps, interval, copy)
+                    result = gpu.fill_gaps(data_df, gaps, interval, copy)
+                    # copied points keep the types of the data instead of sharing a single type
+                    pd.testing.assert_frame_equal(result, expected, check_dtype=not copy)
+
+    def test_unsorted_timestamps(self):
+        data_df = pd.DataFrame([[1000, 50], [9000, 450], [8000, 400], [15000, 750]], columns=["timestamps", "data"])
+        gaps = [(1000, 8000), (9000, 15000)]
+        expected = list_fill_gaps(data_df, gaps, 1000, False)
+        pd.testing.assert_frame_equal(gpu.fill_gaps(data_df, gaps, 1000), expected)
+
+
 class AudioGapFillTest(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
@@ -270,6 +360,43 @@ class AudioGapFillTest(unittest.TestCase):
         self.assertEqual(len(filled_df["timestamps"]), 13)
         self.assertEqual(len(gaps), 1)
 
+    def test_audio_gap_columns(self):
+        my_data = ([(1000, [10, 20, 30, 40]), (2000, [40, 30, 20, 10]), (5000, [5, 15, 25, 35])])
+        result = gpu.fill_audio_gaps(my_data, self.sample_interval, audio_dtype=np.float32, as_columns=True)
+        self.assertIsNone(result.result_df)
+        self.assertEqual(len(result.gaps), 1)
+        self.assertEqual(list(result.result_columns.keys()), gpu.AUDIO_DF_COLUMNS)
+        self.assertEqual(result.result_columns["microphone"].dtype, np.float32)
+        self.assertEqual(result.result_columns["timestamps"].dtype, np.float64)
+        self.assertEqual(len(result.result_columns["timestamps"]), 20)
+        self.assertTrue(np.isnan(result.result_columns["microphone"][8:16]).all())
+        self.assertEqual(result.result_columns["microphone"][16], 5)
+        self.assertEqual(result.result_columns["timestamps"][19], 5750)
+        self.assertEqual(result.result_columns["unaltered_timestamps"][8], 3000)
+
+    def test_audio_gap_int_dtype(self):
+        my_data = ([(1000, [10, 20, 30, 40]), (2000, [40, 30, 20, 10]), (5000, [5, 15, 25, 35])])
+        result = gpu.fill_audio_gaps(my_data, self.sample_interval, audio_dtype=np.int16, as_columns=True,
+                                     audio_scale=5.)
+        audio = result.result_columns["microphone"]
+        self.assertEqual(audio.dtype, np.int16)
+        self.assertEqual(len(result.gaps), 1)
+        self.assertTrue((audio[8:16] == gpu.missing_integer_value(np.int16)).all())
+        np.testing.assert_array_equal(audio[16:], [1, 3, 5, 7])
+        decoded = gpu.decode_scaled_integers(audio, 5.)
+        self.assertTrue(np.isnan(decoded[8:16]).all())
+        np.testing.assert_array_equal(decoded[:4], [10, 20, 30, 40])
+
+    def test_audio_gap_invalid_dtype(self):
+        with self.assertRaises(ValueError):
+            gpu.fill_audio_gaps([(1000, [10, 20, 30, 40])], self.sample_interval, audio_dtype=np.uint16)
+
+    def test_encode_scaled_integers(self):
+        encoded = gpu.encode_scaled_integers(np.array([0.5, -1., 2., np.nan]), np.int8, 2 ** -7)
+        np.testing.assert_array_equal(encoded, [64, -127, 127, -128])
+        np.testing.assert_array_equal(gpu.decode_scaled_integers(encoded, 2 ** -7),
+                                      [0.5, -127 / 128, 127 / 128, np.nan])
+
     def test_failure_audio_gap_df(self):
         my_data = ([(1000, [10, 20, 30, 40]), (1500, [40, 30, 20, 10])])
         result = gpu.fill_audio_gaps(my_data, self.sample_interval)
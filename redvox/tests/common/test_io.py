@@ -4,7 +4,7 @@ import os.path
 import shutil
 import tempfile
 from typing import Optional, Union
-from unittest import TestCase
+from unittest import TestCase, mock
 
 from redvox.api1000.proto.redvox_api_m_pb2 import RedvoxPacketM
 from redvox.api1000.wrapped_redvox_packet.wrapped_packet import WrappedRedvoxPacketM
@@ -18,6 +18,7 @@ from redvox.common.date_time_utils import (
     truncate_dt_ymdh,
 )
 import redvox.common.io as io
+import redvox.tests as tests
 
 
 def write_min_api_1000(base_dir: str, file_name: Optional[str] = None) -> str:
@@ -448,6 +449,43 @@ class IndexEntryTests(IoTestCase):
         self.assertIsNotNone(packet)
         self.assertEqual(1000.0, packet.api)
 
+    def test_read_raw_reuse_buffer(self):
+        entry_900: io.IndexEntry = io.IndexEntry.from_path(
+            copy_exact(self.template_900_path, self.unstructured_900_dir, "0000000900_1609459200000.rdvxz"))
+        entry_1000: io.IndexEntry = io.IndexEntry.from_path(
+            copy_exact(self.template_1000_path, self.unstructured_1000_dir, "0000001000_1609459200000000.rdvxm"))
+        for entry in [entry_900, entry_1000, entry_900]:
+            self.assertEqual(entry.read_raw().SerializeToString(),
+                             entry.read_raw(reuse_buffer=True).SerializeToString())
+
+    def test_drop_sensors(self):
+        packet: RedvoxPacketM = RedvoxPacketM()
+        packet.api = 1000.0
+        packet.station_information.id = "0000001000"
+        packet.sensors.audio.sample_rate = 80.0
+        packet.sensors.audio.samples.values.extend([1.0, 2.0, 3.0])
+        packet.sensors.pressure.samples.values.extend([4.0, 5.0])
+        packet.sensors.accelerometer.x_samples.values.extend([6.0, 7.0])
+        serialized: bytes = packet.SerializeToString()
+        self.assertIs(serialized, io._drop_sensors(serialized, set()))
+        trimmed: RedvoxPacketM = RedvoxPacketM.FromString(io._drop_sensors(serialized, {"accelerometer", "image"}))
+        packet.sensors.ClearField("accelerometer")
+        self.assertEqual(packet, trimmed)
+
+    def test_read_into_buffer(self):
+        small_path: str = os.path.join(self.template_dir, "small.bin")
+        large_path: str = os.path.join(self.template_dir, "large.bin")
+        with open(small_path, "wb") as fout:
+            fout.write(b"abc")
+        with open(large_path, "wb") as fout:
+            fout.write(b"0123456789")
+        large = io._read_into_buffer(large_path)
+        self.assertEqual(b"0123456789", large.tobytes())
+        small = io._read_into_buffer(small_path)
+        self.assertEqual(b"abc", small.tobytes())
+        # the larger buffer is reused for the smaller file
+        self.assertIs(large.obj, small.obj)
+
 
 class IndexTests(IoTestCase):
     def test_empty_index(self):
@@ -656,6 +694,94 @@ class IndexTests(IoTestCase):
         self.assertEqual(4, len(index.read(io.ReadFilter.empty().with_start_dt(datetime(2021, 1, 1, 0, 0, 1)))))
         self.assertEqual(4, len(index.read(io.ReadFilter.empty().with_end_dt(datetime(2021, 1, 1, 0, 0, 0)))))
 
+    def make_mixed_index(self) -> io.Index:
+        return io.Index([
+            io.IndexEntry.from_path(
+                copy_exact(self.template_1000_path, self.unstructured_1000_dir, "1001_1609459201000000.foo")),
+            io.IndexEntry.from_path(
+                copy_exact(self.template_900_path, self.unstructured_900_dir, "901_1609459200000.rdvxz")),
+            io.IndexEntry.from_path(
+                copy_exact(self.template_1000_path, self.unstructured_1000_dir, "1000_1609459200000000.rdvxm")),
+            io.IndexEntry.from_path(
+                copy_exact(self.template_900_path, self.unstructured_900_dir, "900_1609459201000.rdvxz")),
+            io.IndexEntry.from_path(
+                copy_exact(self.template_1000_path, self.unstructured_1000_dir, "1001_1609459200000000.rdvxm")),
+            io.IndexEntry.from_path(
+                copy_exact(self.template_900_path, self.unstructured_900_dir, "900_1609459200000.rdvxz")),
+            io.IndexEntry.from_path(
+                copy_exact(self.template_1000_path, self.unstructured_1000_dir, "1000_1609459202000000.foo")),
+            io.IndexEntry.from_path(
+                copy_exact(self.template_900_path, self.unstructured_900_dir, "901_1609459202000.rdvxz")),
+        ])
+
+    def test_sort_matches_entry_order(self):
+        index: io.Index = self.make_mixed_index()
+        expected = sorted(index.entries, key=lambda entry: (entry.api_version, entry.station_id, entry.date_time))
+        index.sort()
+        self.assertEqual([e.full_path for e in expected], [e.full_path for e in index.entries])
+        self.assertTrue(index.columns().is_sorted)
+
+    def test_filter_matches_apply(self):
+        filters = [
+            io.ReadFilter.empty().with_start_dt(datetime(2021, 1, 1, 0, 0, 1)),
+            io.ReadFilter.empty().with_end_dt(datetime(2021, 1, 1, 0, 0, 1)),
+            io.ReadFilter.empty()
+            .with_start_dt(datetime(2021, 1, 1, 0, 0, 1))
+            .with_end_dt(datetime(2021, 1, 1, 0, 0, 1)),
+            io.ReadFilter().with_start_dt(datetime(2021, 1, 1, 0, 0, 3)),
+            io.ReadFilter.empty().with_station_ids({"900", "1001"}),
+            io.ReadFilter.empty().with_station_ids(set()),
+            io.ReadFilter.empty().with_extensions({".foo"}),
+            io.ReadFilter.empty().with_api_versions({io.ApiVersion.API_900}),
+            io.ReadFilter(),
+        ]
+        unsorted_index: io.Index = self.make_mixed_index()
+        sorted_index: io.Index = self.make_mixed_index()
+        sorted_index.sort()
+        for read_filter in filters:
+            for index in [unsorted_index, sorted_index]:
+                expected = list(filter(read_filter.apply, index.entries))
+                self.assertEqual([e.full_path for e in expected],
+                                 [e.full_path for e in index.filter(read_filter).entries])
+
+    def test_columns_follow_entries(self):
+        index: io.Index = self.make_mixed_index()
+        self.assertEqual(8, len(index.columns()))
+        index.append(iter([io.IndexEntry.from_path(
+            copy_exact(self.template_900_path, self.unstructured_900_dir, "902_1609459200000.rdvxz"))]))
+        self.assertEqual(9, len(index.columns()))
+        index.entries = index.entries[:2]
+        self.assertEqual(["1001", "901"], index.columns().station_ids.tolist())
+
+    def test_get_index_for_station_id(self):
+        index: io.Index = self.make_mixed_index()
+        station_index: io.Index = index.get_index_for_station_id("1001")
+        self.assertEqual(2, len(station_index.entries))
+        self.assertTrue(all(e.station_id == "1001" for e in station_index.entries))
+        self.assertEqual(0, len(index.get_index_for_station_id("1").entries))
+
+    def test_stream_raw_prefetch(self):
+        index: io.Index = self.make_mixed_index()
+        index.sort()
+        expected = list(index.stream_raw(io.ReadFilter.empty()))
+        prefetched = list(index.stream_raw(io.ReadFilter.empty(), prefetch=3))
+        self.assertEqual(len(expected), len(prefetched))
+        self.assertEqual(expected, prefetched)
+        buffered = list(index.stream_raw(io.ReadFilter.empty(), prefetch=3, reuse_buffers=True))
+        self.assertEqual([p.SerializeToString() for p in expected], [p.SerializeToString() for p in buffered])
+        self.assertEqual(4, len(list(index.stream(io.ReadFilter.empty().with_extensions({".foo", ".rdvxm"}),
+                                                  prefetch=2))))
+
+    def test_group_by_station_id(self):
+        index: io.Index = self.make_mixed_index()
+        index.sort()
+        groups = index.group_by_station_id()
+        self.assertEqual(list(dict.fromkeys(entry.station_id for entry in index.entries)), list(groups.keys()))
+        self.assertEqual({"900", "901", "1000", "1001"}, set(groups.keys()))
+        for station_id, station_index in groups.items():
+            self.assertEqual(index.get_index_for_station_id(station_id).entries, station_index.entries)
+        self.assertEqual({}, io.Index().group_by_station_id())
+
 
 # noinspection PyTypeChecker,DuplicatedCode,Mypy
 class ReadFilterTests(IoTestCase):
@@ -1032,3 +1158,237 @@ class IndexStationSummaryTests(IoTestCase):
         self.assertEqual(3, summary_1000.total_packets)
         self.assertEqual(datetime(1969, 12, 31, 23, 59, 59), summary_1000.first_packet)
         self.assertEqual(datetime(1970, 1, 1, 0, 0, 1), summary_1000.last_packet)
+
+
+class IndexCacheTests(IoTestCase):
+    def setUp(self) -> None:
+        self.cache_dir: str = tempfile.mkdtemp(dir=self.temp_dir_path)
+        copy_exact(self.template_900_path, self.cache_dir, "900_1546300800000.rdvxz")
+        copy_exact(self.template_900_path, self.cache_dir, "901_1577836800000.rdvxz")
+        copy_exact(self.template_1000_path, self.cache_dir, "1000_1546300800000000.rdvxm")
+        copy_exact(self.template_1000_path, self.cache_dir, "bad_name.rdvxm")
+
+    def age_dir(self) -> None:
+        # pretend the directory was last modified well before the cache was written
+        mtime_ns: int = os.stat(self.cache_dir).st_mtime_ns - 10 * io.INDEX_CACHE_RACY_NS
+        os.utime(self.cache_dir, ns=(mtime_ns, mtime_ns))
+
+    def test_cache_matches_uncached(self):
+        uncached = io.index_unstructured(self.cache_dir, io.ReadFilter.empty())
+        cached = io.index_unstructured(self.cache_dir, io.ReadFilter.empty(), use_cache=True)
+        self.assertEqual(uncached.entries, cached.entries)
+        self.assertTrue(os.path.isfile(io.DirIndexCache.cache_path(self.cache_dir)))
+        cached = io.index_unstructured(self.cache_dir, io.ReadFilter.empty(), use_cache=True)
+        self.assertEqual(uncached.entries, cached.entries)
+
+    def test_cache_rejected(self):
+        io.index_unstructured(self.cache_dir, io.ReadFilter.empty(), use_cache=True)
+        cache = io.DirIndexCache.load(self.cache_dir)
+        self.assertEqual({"bad_name.rdvxm"}, cache.rejected)
+        self.assertEqual(3, len(cache.entries))
+
+    def test_cache_fresh(self):
+        io.index_unstructured(self.cache_dir, io.ReadFilter.empty(), use_cache=True)
+        cache = io.DirIndexCache.load(self.cache_dir)
+        self.assertFalse(cache.is_fresh(os.stat(self.cache_dir).st_mtime_ns))
+        self.age_dir()
+        io.index_unstructured(self.cache_dir, io.ReadFilter.empty(), use_cache=True)
+        cache = io.DirIndexCache.load(self.cache_dir)
+        self.assertTrue(cache.is_fresh(os.stat(self.cache_dir).st_mtime_ns))
+
+    def test_cache_filtered(self):
+        io.index_unstructured(self.cache_dir, io.ReadFilter.empty(), use_cache=True)
+        self.age_dir()
+        index = io.index_unstructured(self.cache_dir,
+                                      io.ReadFilter.empty().with_api_versions({io.ApiVersion.API_900}),
+                                      use_cache=True)
+        self.assertEqual(2, len(index.entries))
+        index = io.index_unstructured(self.cache_dir,
+                                      io.ReadFilter.empty().with_station_ids({"1000"}),
+                                      use_cache=True)
+        self.assertEqual(1, len(index.entries))
+
+    def test_cache_add_and_remove(self):
+        io.index_unstructured(self.cache_dir, io.ReadFilter.empty(), use_cache=True)
+        self.age_dir()
+        copy_exact(self.template_1000_path, self.cache_dir, "1001_1546300800000000.rdvxm")
+        os.remove(os.path.join(self.cache_dir, "900_1546300800000.rdvxz"))
+        index = io.index_unstructured(self.cache_dir, io.ReadFilter.empty(), use_cache=True)
+        self.assertEqual({"901", "1000", "1001"}, {entry.station_id for entry in index.entries})
+        self.assertEqual(index.entries, io.index_unstructured(self.cache_dir, io.ReadFilter.empty()).entries)
+
+    def test_cache_other_dir(self):
+        io.index_unstructured(self.cache_dir, io.ReadFilter.empty(), use_cache=True)
+        other_dir: str = tempfile.mkdtemp(dir=self.temp_dir_path)
+        shutil.copy2(io.DirIndexCache.cache_path(self.cache_dir), other_dir)
+        self.assertIsNone(io.DirIndexCache.load(other_dir))
+        self.assertEqual(0, len(io.index_unstructured(other_dir, io.ReadFilter.empty(), use_cache=True).entries))
+
+    def test_cache_structured(self):
+        base_dir: str = tempfile.mkdtemp(dir=self.temp_dir_path)
+        copy_api_900(self.template_900_path, base_dir, True, "900", datetime(2019, 1, 1))
+        copy_api_1000(self.template_1000_path, base_dir, True, "1000", datetime(2019, 1, 1, 1))
+        copy_api_1000(self.template_1000_path, base_dir, True, "1000", datetime(2019, 1, 1, 2))
+        uncached = io.index_structured(base_dir, io.ReadFilter.empty())
+        cached = io.index_structured(base_dir, io.ReadFilter.empty(), use_cache=True)
+        self.assertEqual(3, len(cached.entries))
+        self.assertEqual(uncached.entries, cached.entries)
+
+
+class StructuredWalkTests(IoTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.structured_dir: str = os.path.join(cls.temp_dir_path, "structured")
+        cls.all_dts = [
+            datetime(2020, 12, 31, 23, 59),
+            datetime(2021, 1, 1, 0, 1),
+            datetime(2021, 1, 1, 1, 30),
+            datetime(2021, 1, 2, 12, 0),
+            datetime(2021, 2, 1, 0, 0),
+            datetime(2022, 6, 15, 6, 0),
+        ]
+        for dt in cls.all_dts:
+            copy_api_900(cls.template_900_path, cls.structured_dir, True, "900", dt)
+            copy_api_1000(cls.template_1000_path, cls.structured_dir, True, "1000", dt)
+
+    def assert_matches_unpruned(self, read_filter: io.ReadFilter) -> None:
+        index = io.index_structured(self.structured_dir, read_filter)
+        expected = [dt for dt in self.all_dts if read_filter.apply_dt(dt)]
+        self.assertEqual(2 * len(expected), len(index.entries))
+        self.assertEqual(sorted(expected), sorted({entry.date_time for entry in index.entries}))
+
+    def test_apply_span(self):
+        read_filter = io.ReadFilter(start_dt=datetime(2021, 1, 1, 1), end_dt=datetime(2021, 1, 1, 2),
+                                    start_dt_buf=timedelta(minutes=5), end_dt_buf=timedelta(minutes=5))
+        self.assertTrue(read_filter.apply_span(datetime(2021, 1, 1), datetime(2021, 1, 2)))
+        self.assertTrue(read_filter.apply_span(datetime(2021, 1, 1, 0), datetime(2021, 1, 1, 1)))
+        self.assertTrue(read_filter.apply_span(datetime(2021, 1, 1, 2), datetime(2021, 1, 1, 3)))
+        self.assertFalse(read_filter.apply_span(datetime(2021, 1, 1, 2, 6), datetime(2021, 1, 1, 3)))
+        self.assertFalse(read_filter.apply_span(datetime(2020, 1, 1), datetime(2021, 1, 1)))
+        self.assertTrue(io.ReadFilter.empty().apply_span(datetime(2020, 1, 1), datetime(2021, 1, 1)))
+
+    def test_dir_span(self):
+        self.assertEqual((datetime(2021, 1, 1), datetime(2022, 1, 1)), io._dir_span([2021]))
+        self.assertEqual((datetime(2021, 12, 1), datetime(2022, 1, 1)), io._dir_span([2021, 12]))
+        self.assertEqual((datetime(2021, 2, 28), datetime(2021, 3, 1)), io._dir_span([2021, 2, 28]))
+        self.assertEqual((datetime(2021, 2, 28, 23), datetime(2021, 3, 1)), io._dir_span([2021, 2, 28, 23]))
+        self.assertRaises(ValueError, io._dir_span, [2021, 2, 31])
+
+    def test_structured_data_dirs_pruned(self):
+        read_filter = io.ReadFilter(start_dt=datetime(2021, 1, 1, 1, 10), end_dt=datetime(2021, 1, 1, 1, 20))
+        data_dirs = io._structured_data_dirs(os.path.join(self.structured_dir, "api1000"), read_filter,
+                                             [{"2020", "2021", "2022"}, {f"{i:02}" for i in range(1, 13)},
+                                              {f"{i:02}" for i in range(1, 32)}, {f"{i:02}" for i in range(24)}])
+        self.assertEqual([os.path.join(self.structured_dir, "api1000", "2021", "01", "01", "01")], data_dirs)
+
+    def test_index_structured_windows(self):
+        self.assert_matches_unpruned(io.ReadFilter.empty())
+        self.assert_matches_unpruned(io.ReadFilter())
+        self.assert_matches_unpruned(io.ReadFilter(start_dt=datetime(2021, 1, 1), end_dt=datetime(2021, 1, 1, 1)))
+        self.assert_matches_unpruned(io.ReadFilter(start_dt=datetime(2021, 1, 1, 0, 2), end_dt=datetime(2021, 1, 2)))
+        self.assert_matches_unpruned(io.ReadFilter(end_dt=datetime(2021, 1, 1)))
+        self.assert_matches_unpruned(io.ReadFilter(start_dt=datetime(2021, 1, 5)))
+        self.assert_matches_unpruned(io.ReadFilter(start_dt=datetime(2023, 1, 5)))
+
+
+class ContainerTests(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_dir: str = os.path.join(self.temp_dir.name, "input")
+        self.output_dir: str = os.path.join(self.temp_dir.name, "output")
+        os.makedirs(self.input_dir)
+        os.makedirs(self.output_dir)
+        for name in os.listdir(tests.TEST_DATA_DIR):
+            if name.startswith("0000000001_") or (name.startswith("1637680001_") and name.endswith(".rdvxz")):
+                shutil.copy2(os.path.join(tests.TEST_DATA_DIR, name), self.input_dir)
+        self.file_index: io.Index = io.index_unstructured(self.input_dir, io.ReadFilter())
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def assert_same_packets(self, expected: io.Index, actual: io.Index) -> None:
+        self.assertEqual([(e.station_id, e.date_time, e.api_version) for e in expected.entries],
+                         [(e.station_id, e.date_time, e.api_version) for e in actual.entries])
+        self.assertEqual([p.SerializeToString() for p in expected.stream_raw()],
+                         [p.SerializeToString() for p in actual.stream_raw()])
+
+    def test_write_read_container(self):
+        path: str = os.path.join(self.output_dir, f"0000000001_0{io.CONTAINER_EXTENSION}")
+        entries = self.file_index.get_index_for_station_id("0000000001").entries
+        written = io.write_container(path, list(reversed(entries)))
+        self.assertEqual(written, io.read_container_entries(path))
+        self.assertTrue(all(entry.is_in_container() for entry in written))
+        self.assertEqual(len(written), len({entry.container_offset for entry in written}))
+        self.assert_same_packets(io.Index(entries), io.Index(written))
+        for entry, container_entry in zip(entries, written):
+            self.assertEqual(entry.read_compressed(), container_entry.read_compressed())
+
+    def test_write_container_merges(self):
+        path: str = os.path.join(self.output_dir, f"0000000001_0{io.CONTAINER_EXTENSION}")
+        entries = self.file_index.get_index_for_station_id("0000000001").entries
+        io.write_container(path, entries[:2])
+        written = io.write_container(path, entries[1:])
+        self.assert_same_packets(io.Index(entries), io.Index(written))
+        self.assertRaises(ValueError, io.write_container, path, self.file_index.entries)
+
+    def test_index_unstructured_containers(self):
+        entries = self.file_index.get_index_for_station_id("1637680001").entries
+        io.write_container(os.path.join(self.output_dir, f"1637680001_0{io.CONTAINER_EXTENSION}"), entries)
+        for use_cache in [False, True, True]:
+            index = io.index_unstructured(self.output_dir, io.ReadFilter(), use_cache=use_cache)
+            self.assert_same_packets(io.Index(entries), index)
+
+    def test_sort_unstructured_containers(self):
+        self.assertTrue(io.sort_unstructured_redvox_data(self.input_dir, self.output_dir, containers=True))
+        index = io.index_structured(self.output_dir)
+        self.assertTrue(all(entry.is_in_container() for entry in index.entries))
+        self.assert_same_packets(self.file_index, index)
+
+        read_filter = io.ReadFilter(start_dt=self.file_index.entries[1].date_time,
+                                    end_dt=self.file_index.entries[2].date_time,
+                                    start_dt_buf=timedelta(0), end_dt_buf=timedelta(0))
+        self.assertEqual([p.SerializeToString() for p in self.file_index.stream_raw(read_filter)],
+                         [p.SerializeToString() for p in index.stream_raw(read_filter, prefetch=2)])
+        self.assertEqual([p.default_filename() for p in self.file_index.stream(read_filter)],
+                         [p.default_filename() for p in index.stream(read_filter)])
+
+    def test_native_index_containers(self):
+        def without_containers(index: io.Index) -> io.Index:
+            # the native indexers do not read packet containers
+            return io.Index([entry for entry in index.entries if not entry.is_in_container()])
+
+        def fake_native_unstructured(base_dir, read_filter, sort, pool):
+            return without_containers(io.index_unstructured_py(base_dir, read_filter, sort, pool))
+
+        def fake_native_structured(base_dir, read_filter, pool):
+            return without_containers(io.index_structured_py(base_dir, read_filter, pool))
+
+        def fake_native_structured_1000(base_dir, read_filter, sort, pool):
+            return without_containers(io.index_structured_api_1000_py(base_dir, read_filter, sort, pool))
+
+        unstructured_dir: str = os.path.join(self.temp_dir.name, "unstructured")
+        os.makedirs(unstructured_dir)
+        io.write_container(os.path.join(unstructured_dir, f"1637680001_0{io.CONTAINER_EXTENSION}"),
+                           self.file_index.get_index_for_station_id("1637680001").entries)
+        for entry in self.file_index.get_index_for_station_id("0000000001").entries:
+            shutil.copy2(entry.full_path, unstructured_dir)
+        io.sort_unstructured_redvox_data(self.input_dir, self.output_dir,
+                                         io.ReadFilter(station_ids={"0000000001"}), containers=True)
+        io.sort_unstructured_redvox_data(self.input_dir, self.output_dir, io.ReadFilter(station_ids={"1637680001"}))
+        station_filter = io.ReadFilter(station_ids={"0000000001"})
+        with mock.patch.object(io, "__INDEX_UNSTRUCTURED_FN", fake_native_unstructured), \
+                mock.patch.object(io, "__INDEX_STRUCTURED_FN", fake_native_structured), \
+                mock.patch.object(io, "__INDEX_STRUCTURED_1000_FN", fake_native_structured_1000):
+            self.assert_same_packets(self.file_index, io.index_unstructured(unstructured_dir))
+            self.assert_same_packets(self.file_index, io.index_structured(self.output_dir))
+            self.assert_same_packets(self.file_index.filter(station_filter),
+                                     io.index_structured_api_1000(os.path.join(self.output_dir, "api1000")))
+            self.assert_same_packets(io.Index(), io.index_unstructured(unstructured_dir, io.ReadFilter(
+                station_ids={"1637680001"}, api_versions={io.ApiVersion.API_1000})))
+
+    def test_container_reads(self):
+        io.sort_unstructured_redvox_data(self.input_dir, self.output_dir, containers=True)
+        index = io.index_structured(self.output_dir)
+        reads = list(io._container_reads(index.entries + self.file_index.entries[:1]))
+        self.assertEqual([3, 3, 1], list(map(len, reads)))
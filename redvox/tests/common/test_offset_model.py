@@ -2,8 +2,10 @@
 tests for offset model
 """
 import unittest
+from unittest import mock
 
 import numpy as np
+import pandas as pd
 
 import redvox.tests as tests
 from redvox.common import offset_model as om
@@ -39,3 +41,90 @@ class OffsetModelTest(unittest.TestCase):
         self.assertEqual(model.n_samples, 3)
         self.assertEqual(model.mean_latency, 0.0)
         self.assertEqual(model.std_dev_latency, 0.0)
+
+    def test_update_timestamps(self):
+        model = om.OffsetModel.empty_model()
+        model.slope = 1e-6
+        model.intercept = 12.5
+        model.start_time = 1.6e15
+        timestamps = 1.6e15 + np.arange(3 * om.TIMESTAMP_BLOCK_SIZE + 5) * 1e3
+        expected = np.array([model.update_time(t) for t in timestamps])
+        updated = model.update_timestamps(timestamps)
+        self.assertIsInstance(updated, np.ndarray)
+        self.assertTrue(np.array_equal(updated, expected))
+        self.assertTrue(np.array_equal(model.update_timestamps(timestamps, False), timestamps + 12.5))
+        in_place = timestamps.copy()
+        self.assertIs(model.update_timestamps_in_place(in_place), in_place)
+        self.assertTrue(np.array_equal(in_place, expected))
+
+    def test_get_binned_df(self):
+        full_df = pd.DataFrame({"times": [5., 1., 3., 10., 12., 15., 14., 16., 20.],
+                                "latencies": [4., 3., np.nan, 1., 2., 2., 1., 5., 1.],
+                                "offsets": np.arange(9.)})
+        binned_df = om.get_binned_df(full_df, np.array([0., 10., 20.]), 2)
+        # times on the edges of the bins and nan latencies are ignored
+        self.assertEqual(list(binned_df.index), [1, 0, 4, 6])
+        self.assertTrue(np.array_equal(om.get_binned_indices(full_df["times"], full_df["latencies"],
+                                                             np.array([0., 10., 20.]), 2), [1, 0, 6, 4]))
+
+    def test_fit_offset_models(self):
+        rng = np.random.default_rng(7)
+        start_time = 1.6e15
+        model_inputs = []
+        for hours in [1, 2, 6]:
+            end_time = start_time + hours * 3600e6
+            times = np.sort(rng.uniform(start_time, end_time, hours * 60))
+            offsets = 1e4 + (times - start_time) * 2e-6 + rng.normal(0, 500, len(times))
+            model_inputs.append((rng.gamma(2, 3000, len(times)), offsets, times, start_time, end_time))
+        models = om.fit_offset_models(model_inputs)
+        self.assertEqual(len(models), 3)
+        for model_input, model in zip(model_inputs, models):
+            expected = om.OffsetModel(*model_input)
+            self.assertEqual(model.slope, expected.slope)
+            self.assertEqual(model.intercept, expected.intercept)
+            self.assertNotEqual(model.slope, 0.0)
+
+    def test_incremental_offset_model(self):
+        rng = np.random.default_rng(11)
+        start_time = 1.6e15
+        end_time = start_time + 2 * 3600e6
+        times = np.sort(rng.uniform(start_time, end_time, 240))
+        latencies = rng.gamma(2, 3000, len(times))
+        latencies[::17] = 50
+        offsets = 1e4 + (times - start_time) * 2e-6 + rng.normal(0, 500, len(times))
+        expected = [om.OffsetModel(latencies[:i], offsets[:i], times[:i], start_time, times[i - 1], fixed_bins=True)
+                    for i in range(40, len(times) + 1, 40)]
+        model = om.IncrementalOffsetModel(start_time)
+        self.assertRaises(ValueError, model.model)
+        self.assertRaises(ValueError, model.add, latencies[:1], offsets[:1], times[:1], start_time)
+        # each update only merges the new data, the data is never binned or fit again
+        with mock.patch.object(om, "get_binned_indices", side_effect=AssertionError), \
+                mock.patch.object(om, "offset_weighted_linear_regression", side_effect=AssertionError):
+            for i, expected_model in zip(range(0, len(times), 40), expected):
+                result = model.add(latencies[i:i + 40], offsets[i:i + 40], times[i:i + 40], times[i + 39]).model()
+                self.assertEqual(result.k_bins, expected_model.k_bins)
+                self.assertAlmostEqual(result.slope, expected_model.slope, delta=1e-9 * abs(expected_model.slope))
+                self.assertAlmostEqual(result.intercept, expected_model.intercept, delta=1e-5)
+                self.assertAlmostEqual(result.score, expected_model.score)
+                self.assertAlmostEqual(result.mean_latency, expected_model.mean_latency)
+                self.assertAlmostEqual(result.std_dev_latency, expected_model.std_dev_latency)
+        self.assertEqual(len(model), len(times))
+        self.assertNotEqual(model.model().slope, 0.0)
+        # two hours are 24 bins; a shorter span still gets one full bin
+        self.assertEqual(len(om.get_5min_bin_times(start_time, end_time)), 25)
+        np.testing.assert_array_equal(om.get_5min_bin_times(start_time, start_time + 1),
+                                      [start_time, start_time + 300e6])
+
+    def test_incremental_offset_model_matches_batch(self):
+        rng = np.random.default_rng(5)
+        times = np.sort(rng.uniform(0, 3600e6, 300))
+        latencies = rng.gamma(2, 3000, len(times))
+        # a slope near 1 gives a non-zero score; the short window fails the quality check
+        for offsets, end_time in [(0.9 * times + rng.normal(0, 1e8, len(times)), times[-1]),
+                                  (1e4 + times * 2e-6 + rng.normal(0, 500, len(times)), times[-1]),
+                                  (1e4 + times * 2e-6, 4 * 60e6)]:
+            expected = om.OffsetModel(latencies, offsets, times, 0, end_time, fixed_bins=True)
+            result = om.IncrementalOffsetModel(0).add(latencies, offsets, times, end_time).model()
+            self.assertAlmostEqual(result.slope, expected.slope, delta=1e-9 * abs(expected.slope))
+            self.assertAlmostEqual(result.intercept, expected.intercept, delta=1e-9 * abs(expected.intercept))
+            self.assertAlmostEqual(result.score, expected.score)
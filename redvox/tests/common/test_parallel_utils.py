@@ -1,13 +1,22 @@
 from typing import List
 from unittest import TestCase
 from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+import time
 
 import redvox.settings as settings
-from redvox.common.parallel_utils import maybe_parallel_map, MappingType
+from redvox.common.parallel_utils import maybe_parallel_map, MappingType, prefetch_map, PoolManager
 
 def map_fn(v: int) -> str:
     return str(v * v)
 
+
+def slow_map_fn(v: int) -> str:
+    # later values finish first
+    time.sleep(0.01 * (10 - v))
+    return map_fn(v)
+
+
 class TestParallelUtils(TestCase):
     def setUp(self) -> None:
         self.data: List[int] = list(range(10))
@@ -52,4 +61,69 @@ class TestParallelUtils(TestCase):
         res = maybe_parallel_map(None, map_fn, self.data, usage_out=usage_out, condition=lambda: len(self.data) > 10)
         self.assertEqual(self.res, list(res))
         self.assertEqual(MappingType.Serial, usage_out[0])
-        settings.set_parallelism_enabled(False)
\ No newline at end of file
+        settings.set_parallelism_enabled(False)
+
+    def test_prefetch_serial(self):
+        self.assertEqual(self.res, list(prefetch_map(map_fn, iter(self.data), 0)))
+
+    def test_prefetch_managed_pool(self):
+        self.assertEqual(self.res, list(prefetch_map(slow_map_fn, iter(self.data), 4)))
+
+    def test_prefetch_provided_pool(self):
+        with ThreadPool(2) as pool:
+            self.assertEqual(self.res, list(prefetch_map(slow_map_fn, iter(self.data), 8, pool)))
+        with Pool(2) as pool:
+            self.assertEqual(self.res, list(prefetch_map(map_fn, iter(self.data), 3, pool)))
+
+    def test_prefetch_partial(self):
+        res = prefetch_map(map_fn, iter(self.data), 4)
+        self.assertEqual(self.res[:3], [next(res) for _ in range(3)])
+        res.close()
+
+
+class TestPoolManager(TestCase):
+    def setUp(self) -> None:
+        self.manager = PoolManager()
+        settings.set_pool_size(2)
+        settings.set_pool_type(settings.POOL_TYPE_THREAD)
+
+    def tearDown(self) -> None:
+        self.manager.close()
+        settings.set_pool_size(None)
+        settings.set_pool_type(None)
+
+    def test_lazy(self):
+        self.assertFalse(self.manager.is_active())
+        pool = self.manager.get()
+        self.assertTrue(self.manager.is_active())
+        self.assertIsInstance(pool, ThreadPool)
+        self.assertEqual(["0", "1", "4"], pool.map(map_fn, [0, 1, 2]))
+
+    def test_reused(self):
+        self.assertIs(self.manager.get(), self.manager.get())
+
+    def test_settings_change(self):
+        pool = self.manager.get()
+        settings.set_pool_size(3)
+        self.assertIsNot(pool, self.manager.get())
+        settings.set_pool_type(settings.POOL_TYPE_PROCESS)
+        self.assertNotIsInstance(self.manager.get(), ThreadPool)
+
+    def test_close(self):
+        pool = self.manager.get()
+        self.manager.close()
+        self.assertFalse(self.manager.is_active())
+        self.assertIsNot(pool, self.manager.get())
+
+    def test_context_manager(self):
+        with self.manager as pool:
+            self.assertEqual(["0", "1", "4"], pool.map(map_fn, [0, 1, 2]))
+            with self.manager as inner_pool:
+                self.assertIs(pool, inner_pool)
+            self.assertTrue(self.manager.is_active())
+        self.assertFalse(self.manager.is_active())
+
+        pool = self.manager.get()
+        with self.manager as outer_pool:
+            self.assertIs(pool, outer_pool)
+        self.assertTrue(self.manager.is_active())
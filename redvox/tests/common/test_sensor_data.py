@@ -1,15 +1,21 @@
 """
 tests for sensor data and sensor metadata objects
 """
+import copy
 import unittest
+import pickle
+import tempfile
 
 import pandas as pd
 import numpy as np
 
 from redvox.common import date_time_utils as dtu
+from redvox.common import offset_model as om
 from redvox.common.sensor_data import (
     SensorData,
     SensorType,
+    DtypePolicy,
+    SpillPolicy,
 )
 
 
@@ -124,6 +130,50 @@ class SensorDataTest(unittest.TestCase):
         self.assertAlmostEqual(self.uneven_sensor.sample_interval_s, 0.000015, 6)
         self.assertAlmostEqual(self.uneven_sensor.sample_interval_std_s, 0.00001, 6)
 
+    def test_append_sensor_data_chunks(self):
+        self.even_sensor.set_channel_dtype(np.int16, .5)
+        new_sensor = SensorData("test", {"timestamps": np.array([200., 220.]),
+                                         "unaltered_timestamps": np.array([200., 220.]),
+                                         "microphone": np.array([1.5, np.nan])}, SensorType.AUDIO)
+        self.even_sensor.append_data(new_sensor)
+        self.even_sensor.append_data(new_sensor)
+        self.assertEqual(self.even_sensor.num_samples(), 13)
+        self.assertEqual(self.even_sensor.last_data_timestamp(), 220.)
+        columns = self.even_sensor.columns()
+        self.assertEqual(columns["microphone"].dtype, np.int16)
+        np.testing.assert_array_equal(self.even_sensor.get_data_channel("microphone")[-2:], [1.5, np.nan])
+        self.assertTrue(np.isnan(self.even_sensor.get_data_channel("test_data")[-4:]).all())
+        self.assertEqual(self.even_sensor.channel_scales, {"microphone": .5, "test_data": .5})
+
+    def test_spill_to_disk(self):
+        expected = self.even_sensor.data_df.copy()
+        with tempfile.TemporaryDirectory() as scratch_dir:
+            self.even_sensor.spill_to_disk(SpillPolicy(scratch_dir, 64))
+            self.assertEqual(self.even_sensor.spilled_columns(),
+                             ["timestamps", "unaltered_timestamps", "microphone", "test_data"])
+            self.assertEqual(SpillPolicy(scratch_dir, 100).apply(self.uneven_sensor).spilled_columns(), [])
+            self.even_sensor.take_samples(slice(1, 8))
+            self.assertEqual(len(self.even_sensor.spilled_columns()), 4)
+            self.even_sensor.append_data(self.even_sensor.data_df.iloc[[0]])
+            self.assertEqual(len(self.even_sensor.spilled_columns()), 4)
+            self.even_sensor = pickle.loads(pickle.dumps(self.even_sensor))
+            self.assertEqual(len(self.even_sensor.spilled_columns()), 4)
+            self.assertTrue(self.even_sensor.data_df.equals(pd.concat([expected.iloc[1:8], expected.iloc[[1]]],
+                                                                      ignore_index=True)))
+
+    def test_update_data_timestamps_in_place(self):
+        model = om.OffsetModel.empty_model()
+        model.slope = 1e-3
+        model.intercept = 10.
+        for sensor in [self.even_sensor, self.uneven_sensor]:
+            expected = copy.deepcopy(sensor)
+            expected.update_data_timestamps(model)
+            stored = sensor.data_timestamps()
+            sensor.update_data_timestamps(model, in_place=True)
+            self.assertTrue(np.array_equal(sensor.data_timestamps(), expected.data_timestamps()))
+            self.assertTrue(np.array_equal(stored, expected.data_timestamps()))
+            self.assertEqual(sensor.sample_interval_s, expected.sample_interval_s)
+
     def test_is_sample_interval_invalid(self):
         self.assertFalse(self.even_sensor.is_sample_interval_invalid())
         self.even_sensor.append_data(
@@ -212,6 +262,101 @@ class SensorDataTest(unittest.TestCase):
         self.even_sensor.sort_by_data_timestamps(False)
         self.assertEqual(self.even_sensor.data_timestamps()[1], 160)
 
+    def test_array_storage(self):
+        timestamps = np.array([10., 20., 30., 40.])
+        sensor = SensorData("test", {"timestamps": timestamps, "unaltered_timestamps": timestamps,
+                                     "microphone": np.array([1., 2., 3., 4.])}, SensorType.AUDIO)
+        self.assertTrue(sensor.is_sorted())
+        self.assertIs(sensor.data_timestamps(), sensor.data_timestamps())
+        self.assertFalse(sensor.data_timestamps().flags.writeable)
+        self.assertFalse(sensor.samples().flags.writeable)
+        self.assertEqual((1, 4), sensor.samples().shape)
+        data_df = sensor.data_df
+        self.assertEqual(4, data_df.shape[0])
+        self.assertTrue(np.shares_memory(data_df["microphone"].to_numpy(), sensor.columns()["microphone"]))
+        self.assertIs(timestamps, sensor._get_columns()["timestamps"])
+        data_df["microphone"] = [5., 6., 7., 8.]
+        np.testing.assert_array_equal([1., 2., 3., 4.], sensor.get_data_channel("microphone"))
+        sensor.data_df = data_df
+        np.testing.assert_array_equal([5., 6., 7., 8.], sensor.get_data_channel("microphone"))
+
+    def test_data_df_keeps_storage(self):
+        expected = self.even_sensor.get_data_channel("microphone").copy()
+        self.even_sensor.set_channel_dtype(np.int16, .5)
+        with tempfile.TemporaryDirectory() as scratch_dir:
+            self.even_sensor.spill_to_disk(SpillPolicy(scratch_dir, 64))
+            spilled = self.even_sensor.spilled_columns()
+            data_df = self.even_sensor.data_df
+            np.testing.assert_array_equal(data_df["microphone"], expected)
+            self.assertEqual(self.even_sensor.columns()["microphone"].dtype, np.int16)
+            self.assertEqual(self.even_sensor.channel_scales, {"microphone": .5, "test_data": .5})
+            self.assertEqual(self.even_sensor.spilled_columns(), spilled)
+            del data_df
+
+    def test_sorted_data_not_reordered(self):
+        timestamps = np.array([10., 20., 30., 40.])
+        values = np.array([1., 2., 3., 4.])
+        sensor = SensorData("test", {"timestamps": timestamps, "values": values})
+        self.assertIs(values, sensor._get_columns()["values"])
+        unsorted = SensorData("test", {"timestamps": timestamps[::-1], "values": values})
+        np.testing.assert_array_equal([4., 3., 2., 1.], unsorted.get_data_channel("values"))
+
+    def test_take_samples(self):
+        self.even_sensor.take_samples(slice(2, 5))
+        np.testing.assert_array_equal([60., 80., 100.], self.even_sensor.data_timestamps())
+        self.assertEqual(3, self.even_sensor.data_df.shape[0])
+
+    def test_insert_dataless_timestamps(self):
+        self.uneven_sensor.insert_dataless_timestamps(np.array([200., 0., 50.]))
+        np.testing.assert_array_equal([0, 14, 25, 31, 50, 65, 74, 83, 97, 111, 120, 200],
+                                      self.uneven_sensor.data_timestamps())
+        self.assertEqual(9, len(self.uneven_sensor.get_valid_data_channel_values("barometer")))
+        self.assertTrue(np.isnan(self.uneven_sensor.get_data_channel("test_data")[-1]))
+
+    def test_set_channel_dtype(self):
+        self.uneven_sensor.set_channel_dtype(np.float32)
+        self.assertEqual(self.uneven_sensor.columns()["barometer"].dtype, np.float32)
+        self.assertEqual(self.uneven_sensor.data_timestamps().dtype, np.float64)
+        self.uneven_sensor.insert_dataless_timestamps(np.array([200.]))
+        self.assertEqual(self.uneven_sensor.columns()["barometer"].dtype, np.float32)
+        self.assertTrue(np.isnan(self.uneven_sensor.get_data_channel("barometer")[-1]))
+
+    def test_integer_channels(self):
+        self.even_sensor.set_channel_dtype(np.int16, .5)
+        self.assertEqual(self.even_sensor.channel_scales, {"microphone": .5, "test_data": .5})
+        self.assertEqual(self.even_sensor.columns()["microphone"].dtype, np.int16)
+        self.even_sensor.insert_dataless_timestamps(np.array([200.]))
+        microphone = self.even_sensor.get_data_channel("microphone")
+        self.assertEqual(microphone.dtype, np.float64)
+        np.testing.assert_array_equal(microphone[:3], [10., 20., 15.])
+        self.assertTrue(np.isnan(microphone[-1]))
+        self.assertTrue(np.isnan(self.even_sensor.samples()[1, -1]))
+        self.assertEqual(self.even_sensor.data_df["microphone"].dtype, np.float64)
+        self.assertEqual(self.even_sensor.channel_scales, {"microphone": .5, "test_data": .5})
+        self.assertEqual(self.even_sensor.columns()["microphone"].dtype, np.int16)
+
+    def test_dtype_policy(self):
+        policy = DtypePolicy.reduced()
+        self.assertEqual(policy.dtype_for(SensorType.ACCELEROMETER), np.float32)
+        self.assertEqual(policy.dtype_for(SensorType.LOCATION), np.float64)
+        self.assertEqual(policy.dtype_for(SensorType.AUDIO), np.int16)
+        self.assertEqual(policy.audio_dtype_for([np.array([-.5, 0., np.nan])]), np.int16)
+        self.assertEqual(policy.audio_dtype_for([np.array([2.]), np.array([.1], dtype=np.float32)]), np.float32)
+        self.assertEqual(policy.audio_dtype_for([np.array([.5]), np.array([.1])]), np.float64)
+        expected = self.even_sensor.get_data_channel("microphone").copy()
+        policy.apply(self.even_sensor)
+        self.assertEqual(self.even_sensor.columns()["microphone"].dtype, np.float32)
+        np.testing.assert_array_equal(self.even_sensor.get_data_channel("microphone"), expected)
+        self.assertEqual(len(policy.apply(self.even_sensor).errors.get()), 1)
+        DtypePolicy(audio_dtype="int16", audio_scale=1.).apply(self.even_sensor)
+        self.assertEqual(self.even_sensor.columns()["microphone"].dtype, np.int16)
+        np.testing.assert_array_equal(self.even_sensor.get_data_channel("microphone"), expected)
+        self.assertEqual(DtypePolicy.from_dict(policy.to_dict()), policy)
+        with self.assertRaises(ValueError):
+            DtypePolicy({"ACCELEROMETER": "int16"})
+        with self.assertRaises(ValueError):
+            DtypePolicy(audio_dtype="uint8")
+
     def test_create_read_update_audio_sensor(self):
         audio_sensor = SensorData(
             "test_audio",
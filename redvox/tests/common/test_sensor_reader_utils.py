@@ -7,6 +7,8 @@ import pandas as pd
 import numpy as np
 
 import redvox.tests as tests
+import redvox.api1000.proto.redvox_api_m_pb2 as api_m
+from redvox.api1000.wrapped_redvox_packet.station_information import NetworkType
 from redvox.common.io import index_unstructured, ReadFilter
 from redvox.common.sensor_data import SensorType
 from redvox.common import sensor_reader_utils as sdru
@@ -55,3 +57,66 @@ class ReaderTests(unittest.TestCase):
     def test_load_sensor_failure(self):
         pressure = sdru.load_apim_pressure(self.apim_files[0])
         self.assertIsNone(pressure)
+
+    def test_load_sensors_from_list(self):
+        audio, gaps = sdru.load_apim_audio_from_list(self.apim_files)
+        sensors = sdru.load_apim_sensors_from_list(self.apim_files, gaps)
+        self.assertEqual([s.type for s in sensors], [SensorType.BEST_LOCATION, SensorType.LOCATION])
+        location_list = sdru.load_apim_location_from_list(self.apim_files, gaps)
+        self.assertEqual(sensors[1].name, location_list.name)
+        self.assertEqual(sensors[1].num_samples(), 3)
+        self.assertAlmostEqual(sensors[1].sample_rate_hz, location_list.sample_rate_hz)
+        self.assertTrue(sensors[1].data_df.equals(location_list.data_df))
+        best_location_list = sdru.load_apim_best_location_from_list(self.apim_files, gaps)
+        self.assertTrue(sensors[0].data_df.equals(best_location_list.data_df))
+
+    def test_load_selected_sensors_from_list(self):
+        audio, gaps = sdru.load_apim_audio_from_list(self.apim_files)
+        sensors = sdru.load_apim_sensors_from_list(self.apim_files, gaps, sensor_types=[SensorType.LOCATION])
+        self.assertEqual([s.type for s in sensors], [SensorType.LOCATION])
+        self.assertEqual(sdru.skipped_sensor_fields(), set())
+        skipped = sdru.skipped_sensor_fields([SensorType.LOCATION, SensorType.BEST_LOCATION])
+        self.assertNotIn("location", skipped)
+        self.assertNotIn("audio", skipped)
+        self.assertIn("accelerometer", skipped)
+        self.assertEqual(sdru.list_sensor_types_in_packets(self.apim_files),
+                         [SensorType.BEST_LOCATION, SensorType.LOCATION])
+        location = sdru.load_apim_sensor_from_list(self.apim_files, gaps, SensorType.LOCATION)
+        self.assertTrue(location.data_df.equals(sensors[0].data_df))
+
+
+class PaddedFieldsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.packet = api_m.RedvoxPacketM()
+        self.packet.sensors.audio.sample_rate = 80.
+        self.packet.sensors.audio.samples.values[:] = [0.] * 320
+        self.timestamps = [1e6, 2e6, 3e6]
+
+    def test_location_padding(self):
+        loc = self.packet.sensors.location
+        loc.timestamps.timestamps[:] = self.timestamps
+        loc.latitude_samples.values[:] = [19., 19.5, 20.]
+        loc.longitude_samples.values[:] = [-155., -155.5, -156.]
+        loc.altitude_samples.values[:] = [10.]
+        loc.location_providers[:] = [api_m.RedvoxPacketM.Sensors.Location.LocationProvider.GPS] * 2
+        location = sdru.load_apim_location_from_list([self.packet], [])
+        self.assertEqual(location.num_samples(), 3)
+        self.assertEqual(location.get_data_channel("latitude")[2], 20.)
+        self.assertEqual(location.get_data_channel("altitude")[0], 10.)
+        self.assertTrue(np.isnan(location.get_data_channel("altitude")[1:]).all())
+        self.assertTrue(np.isnan(location.get_data_channel("speed")).all())
+        self.assertEqual(location.get_data_channel("location_provider"), ["GPS", "GPS", "UNKNOWN"])
+        single_location = sdru.load_apim_location(self.packet)
+        self.assertTrue(np.isnan(single_location.data_df["location_provider"][2]))
+
+    def test_health_padding(self):
+        metrics = self.packet.station_information.station_metrics
+        metrics.timestamps.timestamps[:] = self.timestamps
+        metrics.battery.values[:] = [90., 89.]
+        health = sdru.load_apim_health_from_list([self.packet], [])
+        self.assertEqual(health.num_samples(), 3)
+        self.assertEqual(health.get_data_channel("battery_charge_remaining")[1], 89.)
+        self.assertTrue(np.isnan(health.get_data_channel("battery_charge_remaining")[2]))
+        self.assertEqual(health.get_data_channel("network_type"), [NetworkType.UNKNOWN_NETWORK.name] * 3)
+        single_health = sdru.load_apim_health(self.packet)
+        self.assertTrue(single_health.data_df["network_type"].isna().all())
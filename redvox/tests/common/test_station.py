@@ -3,6 +3,7 @@ tests for station
 """
 import unittest
 import contextlib
+import tempfile
 
 import numpy as np
 
@@ -10,7 +11,7 @@ import redvox.tests as tests
 from redvox.common import api_reader
 from redvox.common.io import ReadFilter
 from redvox.common.station import Station
-from redvox.common.sensor_data import SensorType
+from redvox.common.sensor_data import SensorType, DtypePolicy, SpillPolicy
 from redvox.common.sensor_reader_utils import get_empty_sensor_data
 
 
@@ -71,6 +72,72 @@ class StationTest(unittest.TestCase):
         health_sensor = self.apim_station.health_sensor()
         self.assertIsNone(health_sensor)
 
+    def test_apim_station_dtype_policy(self):
+        with contextlib.redirect_stdout(None):
+            reader = api_reader.ApiReader(
+                tests.TEST_DATA_DIR,
+                False,
+                ReadFilter(extensions={".rdvxm"}, station_ids={"0000000001"}),
+                dtype_policy=DtypePolicy.reduced(),
+            )
+            station = reader.get_station_by_id("0000000001")[0]
+        audio_sensor = station.audio_sensor()
+        self.assertEqual(audio_sensor.columns()["microphone"].dtype, np.int16)
+        np.testing.assert_array_equal(audio_sensor.get_data_channel("microphone"),
+                                      self.apim_station.audio_sensor().get_data_channel("microphone"))
+        self.assertEqual(station.location_sensor().columns()["latitude"].dtype, np.float64)
+
+    def test_apim_station_sensor_types(self):
+        with contextlib.redirect_stdout(None):
+            reader = api_reader.ApiReader(
+                tests.TEST_DATA_DIR,
+                False,
+                ReadFilter(extensions={".rdvxm"}, station_ids={"0000000001"}),
+            )
+            station = reader.get_stations(sensor_types=[SensorType.PRESSURE])[0]
+        self.assertEqual(station.get_station_sensor_types(), [SensorType.AUDIO])
+        self.assertEqual(station.audio_sensor().num_samples(), self.apim_station.audio_sensor().num_samples())
+        self.assertEqual(station.timesync_analysis.get_best_latency(), 1296.0)
+
+    def test_apim_station_lazy(self):
+        with contextlib.redirect_stdout(None):
+            reader = api_reader.ApiReader(
+                tests.TEST_DATA_DIR,
+                False,
+                ReadFilter(extensions={".rdvxm"}, station_ids={"0000000001"}),
+            )
+            stations = reader.get_stations(lazy=True)
+            stations += reader.get_stations()
+        station, updated = stations[0], stations[1]
+        self.assertEqual(station._unbuilt_sensor_types, [SensorType.BEST_LOCATION, SensorType.LOCATION])
+        self.assertEqual(station.get_station_sensor_types(),
+                         [SensorType.AUDIO, SensorType.BEST_LOCATION, SensorType.LOCATION])
+        self.assertIsNone(station.accelerometer_sensor())
+        station.update_timestamps()
+        updated.update_timestamps()
+        self.assertTrue(station.location_sensor().data_df.equals(updated.location_sensor().data_df))
+        self.assertEqual(station._unbuilt_sensor_types, [SensorType.BEST_LOCATION])
+        self.assertEqual(len(station.data), 3)
+        self.assertTrue(station.best_location_sensor().data_df.equals(updated.best_location_sensor().data_df))
+        self.assertEqual(len(station._lazy_packets), 0)
+
+    def test_apim_station_spill_policy(self):
+        with contextlib.redirect_stdout(None), tempfile.TemporaryDirectory() as scratch_dir:
+            reader = api_reader.ApiReader(
+                tests.TEST_DATA_DIR,
+                False,
+                ReadFilter(extensions={".rdvxm"}, station_ids={"0000000001"}),
+                spill_policy=SpillPolicy(scratch_dir, 2 ** 10),
+            )
+            station = reader.get_stations()[0]
+            audio = station.audio_sensor()
+            self.assertEqual(audio.spilled_columns(), ["timestamps", "unaltered_timestamps", "microphone"])
+            self.assertEqual(station.location_sensor().spilled_columns(), [])
+            station.update_timestamps()
+            self.assertEqual(len(audio.spilled_columns()), 3)
+            expected = Station(reader._read_files_in_index(reader.files_index[0])).update_timestamps()
+            self.assertTrue(audio.data_df.equals(expected.audio_sensor().data_df))
+
     def test_check_key(self):
         empty_apim_station = Station([])
         with contextlib.redirect_stdout(None):
@@ -4,6 +4,7 @@ import redvox.tests as tests
 from redvox.common.io import ReadFilter
 from redvox.common.api_reader import ApiReader
 from redvox.common import station_utils as su
+from redvox.common.offset_model import OffsetModel
 
 
 class StationMetadataTest(unittest.TestCase):
@@ -32,6 +33,18 @@ class StationPacketMetadataTest(unittest.TestCase):
         self.assertEqual(metadata[0].packet_start_mach_timestamp, 1597189452945991.0)
 
 
+    def test_update_packet_metadata_timestamps(self):
+        files = ApiReader(self.input_dir, read_filter=self.station_filter).read_files_by_id("0000000001")
+        model = OffsetModel.empty_model()
+        model.slope = 1e-6
+        model.intercept = 100.
+        expected = [su.StationPacketMetadata(p) for p in files]
+        for packet in expected:
+            packet.update_timestamps(model)
+        metadata = [su.StationPacketMetadata(p) for p in files]
+        su.update_packet_metadata_timestamps(metadata, model)
+        self.assertEqual([m.__dict__ for m in metadata], [m.__dict__ for m in expected])
+
 class StationKeyTest(unittest.TestCase):
     def test_init_key(self):
         key = su.StationKey("test_id", "test_uuid", 0.0)
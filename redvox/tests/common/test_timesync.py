@@ -6,6 +6,7 @@ import contextlib
 import numpy as np
 import redvox.tests as tests
 from redvox.common import timesync as ts
+from redvox.common import tri_message_stats as tms
 from redvox.common import api_reader
 from redvox.common.io import ReadFilter
 
@@ -37,6 +38,47 @@ class TimesyncTest(unittest.TestCase):
         self.assertEqual(self.time_sync_analysis.get_latencies()[0], 69664.0)
         self.assertEqual(self.time_sync_analysis.get_offsets()[0], -22906528.0)
 
+    def test_time_sync_exchanges(self):
+        exchanges = self.time_sync_analysis.exchanges
+        self.assertEqual(exchanges.num_packets, 3)
+        self.assertEqual(exchanges.exchanges.shape, (len(exchanges.packet_index), 6))
+        for index, tsd in enumerate(self.time_sync_analysis.timesync_data):
+            stats = tms.TriMessageStats("test", *tsd.time_sync_exchanges_list)
+            self.assertEqual(exchanges.best_latency[index], stats.best_latency)
+            self.assertEqual(exchanges.best_offset[index], stats.best_offset)
+            self.assertEqual(exchanges.best_latency_index[index], stats.best_latency_index)
+            self.assertEqual(exchanges.best_latency_array_index[index], stats.best_latency_array_index)
+            self.assertAlmostEqual(exchanges.mean_latency[index], np.mean([*stats.latency1, *stats.latency3]), 6)
+            self.assertAlmostEqual(exchanges.offset_std[index], np.std([*stats.offset1, *stats.offset3]), 6)
+        self.assertTrue(np.array_equal(self.time_sync_analysis.get_best_latency_timestamps(),
+                                       [tsd.get_best_latency_timestamp()
+                                        for tsd in self.time_sync_analysis.timesync_data]))
+
+    def test_time_sync_exchanges_without_best_latency(self):
+        exchanges = ts.TimeSyncExchanges(np.array([[1., 5., 9., 0., 2., 8.], [1., 5., 9., 1., 2., 7.],
+                                                   [0., 2., 4., 0., 2., 4.]]), np.array([0, 0, 2]), 3)
+        self.assertTrue(np.array_equal(exchanges.num_exchanges, [2, 0, 1]))
+        self.assertEqual(exchanges.best_latency[0], 0.5)
+        self.assertEqual(exchanges.best_latency_array_index[0], 3)
+        self.assertEqual(exchanges.best_latency_index[0], 1)
+        self.assertEqual(exchanges.best_offset[0], 2.5)
+        self.assertTrue(np.isnan(exchanges.best_latency[1]))
+        self.assertTrue(np.isnan(exchanges.mean_latency[1]))
+        # all of the latencies of the last packet are 0
+        self.assertTrue(np.isnan(exchanges.best_latency[2]))
+        self.assertEqual(exchanges.best_offset[2], 0.0)
+
+    def test_fit_analysis_offset_models(self):
+        with contextlib.redirect_stdout(None):
+            result = api_reader.ApiReader(tests.TEST_DATA_DIR, structured_dir=False,
+                                          read_filter=ReadFilter(station_ids={"1637680001", "0000000001"}))
+            analyses = [ts.TimeSyncAnalysis().from_raw_packets(result.read_files_by_id(station_id))
+                        for station_id in ["1637680001", "0000000001"]]
+        self.assertFalse(any(tsa.is_offset_model_fit() for tsa in analyses))
+        ts.fit_analysis_offset_models(analyses)
+        self.assertTrue(all(tsa.is_offset_model_fit() for tsa in analyses))
+        self.assertEqual(analyses[1].offset_model.intercept, analyses[1].get_offset_model().intercept)
+
     def test_find_bad_packets(self):
         self.assertEqual(len(self.time_sync_analysis.get_bad_packets()), 0)
 
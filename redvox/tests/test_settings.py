@@ -46,3 +46,33 @@ class TestSettings(TestCase):
         settings.set_parallelism_enabled(False)
         self.assertFalse(settings.is_parallelism_enabled())
 
+
+    def test_pool_size(self):
+        self.assertEqual(os.cpu_count(), settings.get_pool_size())
+        settings.set_pool_size(3)
+        self.assertEqual(3, settings.get_pool_size())
+        settings.set_pool_size(None)
+        self.assertRaises(ValueError, settings.set_pool_size, 0)
+
+    def test_pool_size_env(self):
+        os.environ[settings.REDVOX_POOL_SIZE_ENV] = "5"
+        try:
+            self.assertEqual(5, settings.get_pool_size())
+            os.environ[settings.REDVOX_POOL_SIZE_ENV] = "five"
+            self.assertIsNone(settings.pool_size_env())
+        finally:
+            del os.environ[settings.REDVOX_POOL_SIZE_ENV]
+
+    def test_pool_type(self):
+        self.assertEqual(settings.POOL_TYPE_PROCESS, settings.get_pool_type())
+        settings.set_pool_type(settings.POOL_TYPE_THREAD)
+        self.assertEqual(settings.POOL_TYPE_THREAD, settings.get_pool_type())
+        settings.set_pool_type(None)
+        self.assertRaises(ValueError, settings.set_pool_type, "fiber")
+
+    def test_pool_start_method(self):
+        self.assertIsNone(settings.get_pool_start_method())
+        settings.set_pool_start_method("spawn")
+        self.assertEqual("spawn", settings.get_pool_start_method())
+        settings.set_pool_start_method(None)
+        self.assertRaises(ValueError, settings.set_pool_start_method, "teleport")